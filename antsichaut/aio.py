@@ -0,0 +1,82 @@
+"""Send independent GitHub requests concurrently from an event loop."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+    import requests
+
+    from antsichaut.github import GitHubClient
+
+T = TypeVar("T")
+
+
+class AsyncEngine:
+    """Schedule the requests of a shared client on an asyncio event loop.
+
+    The requests are sent over the pooled session of the client, so
+    connections are reused and retries and rate limits are handled as for
+    every other request. The blocking calls run on an executor with one
+    thread per request in flight, so the number of threads is bounded by
+    the limit and not by the number of requests.
+    """
+
+    def __init__(self, client: GitHubClient, limit: int = 4) -> None:
+        """Initialize the engine.
+
+        :param client: The client to send the requests with
+        :param limit: The maximum number of requests in flight
+        """
+        self.client = client
+        self.limit = max(limit, 1)
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def run(self, main: Callable[[], Awaitable[T]]) -> T:
+        """Run a coroutine from synchronous code.
+
+        :param main: The coroutine function to run
+        :return: The result of the coroutine
+        """
+        return asyncio.run(self._run(main))
+
+    async def _run(self, main: Callable[[], Awaitable[T]]) -> T:
+        """Set up the executor and the limit on the running loop.
+
+        :param main: The coroutine function to run
+        :return: The result of the coroutine
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.limit)
+        loop.set_default_executor(executor)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        try:
+            return await main()
+        finally:
+            self._semaphore = None
+            executor.shutdown(wait=False)
+
+    async def get(self, url: str) -> requests.Response:
+        """Send a GET request once a slot is free.
+
+        :param url: The URL to request
+        :return: The response
+        """
+        if self._semaphore is None:
+            msg = "AsyncEngine.get must be awaited inside AsyncEngine.run"
+            raise RuntimeError(msg)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.client.get, url)
+
+    async def get_all(self, urls: Iterable[str]) -> list[requests.Response]:
+        """Send GET requests concurrently.
+
+        :param urls: The URLs to request
+        :return: The responses in the order of the URLs
+        """
+        return list(await asyncio.gather(*(self.get(url) for url in urls)))
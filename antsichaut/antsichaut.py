@@ -2,16 +2,53 @@
 """The antsichaut module."""
 from __future__ import annotations
 
+import asyncio
+import math
 import re
-from functools import cached_property
-from importlib.metadata import version as _version
+import sys
+import threading
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import cached_property, lru_cache
+from http import HTTPStatus
 from pathlib import Path
-from typing import Any, Optional, Sequence
-
-import configargparse
-import requests
-from ruamel.yaml import YAML
-from single_source import get_version
+from typing import TYPE_CHECKING, Any, Optional, Sequence, TypeVar
+
+from antsichaut.aio import AsyncEngine
+from antsichaut.cache import DEFAULT_CACHE_SIZE, ResponseCache
+from antsichaut.changelog import (
+    ChangelogLayout,
+    ChangelogSnapshot,
+    ChangesIndex,
+    PullRequestIndex,
+    changelog_digest,
+    changelog_yaml,
+    file_key,
+    new_yaml,
+    normalize,
+    render_changes,
+    sort_changes,
+    to_plain,
+    version_key,
+)
+from antsichaut.github import GitHubClient
+from antsichaut.messages import report
+from antsichaut.models import PullRequest
+from antsichaut.profiling import Profiler
+from antsichaut.releases import Release, ReleaseIndex, ReleaseWindows
+from antsichaut.rules import TRIVIAL_SECTION, Classifier
+from antsichaut.state import STATE_FILENAME, Watermark
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Iterator, Mapping, MutableMapping
+
+    import configargparse
+    import requests
+    from ruamel.yaml import YAML
+
+    from antsichaut.fleet import FleetEntry
 
 ChLogType = Optional[
     dict[
@@ -27,6 +64,99 @@ ChLogType = Optional[
 ]
 
 
+# The search API never returns more than this many results for one query
+SEARCH_RESULT_LIMIT = 1000
+SEARCH_PAGE_SIZE = 100
+
+# A window of merge dates as (start, end) timestamps, an empty end is open
+MergeWindow = tuple[str, str]
+
+T = TypeVar("T")
+
+
+def _parse_timestamp(value: str) -> datetime | None:
+    """Parse a GitHub timestamp.
+
+    :param value: The timestamp, e.g. 2021-05-01T10:00:00Z
+    :return: The parsed timestamp or None if it can not be parsed
+    """
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _format_timestamp(value: datetime) -> str:
+    """Format a timestamp the way GitHub search qualifiers expect it.
+
+    :param value: The timestamp
+    :return: The formatted timestamp
+    """
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _trim_item(item: dict[str, Any]) -> PullRequest:
+    """Reduce a search result to the fields antsichaut uses.
+
+    :param item: The search result of one pull request
+    :return: The pull request
+    """
+    return PullRequest(
+        number=item["number"],
+        title=item["title"],
+        url=item["html_url"],
+        labels=(label["name"] for label in item["labels"]),
+        merged_at=item.get("pull_request", {}).get("merged_at"),
+        author=(item.get("user") or {}).get("login"),
+    )
+
+
+@dataclass
+class SearchPage:
+    """One page of search results, reduced to what antsichaut uses."""
+
+    status_code: int
+    total_count: int = 0
+    items: list[PullRequest] = field(default_factory=list)
+    next_url: str | None = None
+    last_url: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Check whether the search succeeded.
+
+        :return: Whether the status code is no error
+        """
+        return self.status_code < HTTPStatus.BAD_REQUEST
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> SearchPage:
+        """Trim a search response, the payload is not kept.
+
+        :param response: The response of the search
+        :return: The page
+        """
+        if not response.ok:
+            return cls(response.status_code)
+        data = response.json()
+        return cls(
+            response.status_code,
+            data.get("total_count", 0),
+            [_trim_item(item) for item in data.get("items", ())],
+            response.links.get("next", {}).get("url"),
+            response.links.get("last", {}).get("url"),
+        )
+
+
+async def _resolved(value: T) -> T:
+    """Wrap a value that is already known in an awaitable.
+
+    :param value: The value
+    :return: The value
+    """
+    return value
+
+
 class ChangelogCIBase:
     """Base Class for antsichaut."""
 
@@ -42,30 +172,78 @@ class ChangelogCIBase:
         group_config: list[dict[str, Sequence[str]]],
         filename: str = "changelogs/changelog.yaml",
         token: str | None = None,
+        max_workers: int = 4,
+        cache_dir: str | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        backend: str = "rest",
+        incremental: bool = False,
+        client: GitHubClient | None = None,
+        clone_dir: str = ".",
+        backfill: bool = False,
+        output: str = "changelog",
+        tokens: Sequence[str] = (),
     ) -> None:
         # pylint: disable=too-many-arguments
         self.repository = repository
         self.filename = Path(filename)
         self.token = token
+        self.tokens = tokens
         self.since_version = since_version
         self.to_version = to_version
         self.group_config = group_config
+        self.max_workers = max_workers
+        self.backend = backend
+        self.incremental = incremental
+        self.clone_dir = clone_dir
+        self.backfill = backfill
+        self.output = output
+        self._watermark: Watermark | None = None
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if client is None:
+            cache = ResponseCache(cache_dir, max_size=cache_size) if cache_dir else None
+            client = GitHubClient(
+                token=token,
+                pool_size=max_workers,
+                cache=cache,
+                tokens=tokens,
+            )
+        # several instances may share one client, its session and its cache
+        self.client = client
+        self.engine = AsyncEngine(self.client, limit=max_workers)
+        self.profiler = Profiler(self.client.stats)
         self._string_data: ChLogType = None
+        self._loaded_changelog: tuple[str, Any] | None = None
+        self._changelog_text: str | None = None
+        self._layout: ChangelogLayout | None = None
+        self._partial = False
+        self._recorded: PullRequestIndex | None = None
+        self._target_version: str | None = None
+        # the sections of the PRs classified while they were fetched
+        self._classified: dict[int, str | None] = {}
         self._sorted_string_data: ChLogType = None
 
     @cached_property
-    def _get_request_headers(self) -> dict[str, str]:
-        """Get headers for GitHub API request.
+    def release_index(self) -> ReleaseIndex:
+        """Get the index of all published releases.
 
-        :return: The constructed headers
+        The releases are listed once per run, all release lookups are
+        answered from the index.
+
+        :return: The release index
         """
-        headers = {"Accept": "application/vnd.github.v3+json"}
-        # if the user adds `GITHUB_TOKEN` add it to API Request
-        # required for `private` repositories
-        if self.token:
-            headers["authorization"] = f"Bearer {self.token}"
+        return self.engine.run(
+            lambda: ReleaseIndex.fetch_async(self.engine, self.github_api_url, self.repository),
+        )
+
+    def _get_release(self, release_version: str) -> Release | None:
+        """Get a specific release.
 
-        return headers
+        :param release_version: The version of the release, or latest
+        :return: The release, or None if there is no such release
+        """
+        if release_version == "latest":
+            return self.release_index.latest
+        return self.release_index.get(release_version)
 
     def _get_release_id(self, release_version: str) -> str:
         """Get ID of a specific release.
@@ -73,89 +251,137 @@ class ChangelogCIBase:
         :param release_version: The version of the release
         :return: The release ID
         """
-        url = f"{self.github_api_url}/repos/{self.repository}/releases/tags/{release_version}"
-
-        response = requests.get(url, headers=self._get_request_headers, timeout=10)
-
-        release_id = ""
-
-        if response.ok:
-            response_data = response.json()
-            # get the published date of the latest release
-            release_id = response_data["id"]
-        else:
-            # if there is no previous release API will return 404 Not Found
-            msg = (
-                f"Could not find any release id for "
-                f"{self.repository}, status code: {response.status_code}"
-            )
-            print(msg)
-        return release_id
+        release = self._get_release(release_version)
+        if release is None:
+            # if there is no previous release the index does not contain it
+            msg = f"Could not find any release id for {self.repository}"
+            report(msg, failure=True)
+            return ""
+        return str(release.id)
 
     def _get_release_date(self, release_version: str) -> str:
-        """Using GitHub API gets latest release date.
+        """Get the publication date of a release from the release index.
 
-        :param release_version: The version of the release
+        :param release_version: The version of the release, or latest
         :return: The release date
         """
-        if release_version == "latest":
-            _version = release_version
-        else:
-            _version = self._get_release_id(release_version)
+        release = self._get_release(release_version)
+        if release is None:
+            msg = f"Could not find any release id for {self.repository}"
+            report(msg, failure=True)
+            return ""
+        return release.published_at
 
-        url = f"{self.github_api_url}/repos/{self.repository}/releases/{_version}"
+    @cached_property
+    def classifier(self) -> Classifier:
+        """Get the rules assigning PRs to changelog sections.
 
-        response = requests.get(url, headers=self._get_request_headers, timeout=10)
+        :return: The classifier built from the group config
+        """
+        return Classifier(self.group_config)
 
-        published_date = ""
+    def _get_pr_index(self, text: str, data: Any) -> PullRequestIndex:
+        """Get the index of all PRs recorded in the changelog.
 
-        if response.ok:
-            response_data = response.json()
-            # get the published date of the latest release
-            published_date = response_data["published_at"]
-        else:
-            # if there is no previous release API will return 404 Not Found
-            msg = (
-                f"Could not find any previous release for "
-                f"{self.repository}, status code: {response.status_code}"
-            )
-            print(msg)
+        With a cache directory, the index is saved with the hash of the
+        changelog file and loaded instead of built while the file is unchanged.
 
-        return published_date
+        :param text: The content of the changelog file
+        :param data: The full changelog structure
+        :return: The index
+        """
+        path = self._cache_file(".json")
+        if path is None:
+            return self._build_pr_index(data)
+        digest = changelog_digest(text)
+        index = PullRequestIndex.load(path, digest)
+        if index is None:
+            index = self._build_pr_index(data)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            index.save(path, digest)
+        return index
+
+    def _build_pr_index(self, data: Any) -> PullRequestIndex:
+        """Build the index of all PRs recorded in the changelog.
+
+        :param data: The parsed changelog, only used if the layout is not recognized
+        :return: The index
+        """
+        pull_requests = self._layout.pull_requests if self._layout else None
+        if pull_requests is None:
+            return PullRequestIndex.from_data(data)
+        return PullRequestIndex.from_numbers(
+            (release_version, (n for numbers in sections.values() for n in numbers))
+            for release_version, sections in pull_requests.items()
+        )
 
     def _write_changelog(self) -> None:
-        """Write changelog to the changelog file."""
+        """Write changelog to the changelog file.
 
-        yaml = YAML()
-        yaml.explicit_start = True
-        yaml.indent(sequence=4, offset=2)
-        yaml.dump(self._string_data, self.filename)
+        If the layout of the file is recognized, only the changes of the
+        target release are rewritten and the rest of the file is kept.
+        """
+
+        yaml = changelog_yaml()
+        text = self._splice_changelog(yaml)
+        if text is None:
+            data = self._string_data
+            if self._partial and self._changelog_text is not None and data:
+                # only the newest release was parsed, merge it into the whole file
+                full: Any = new_yaml().load(self._changelog_text)
+                self._sort_by_semver(full)
+                full["releases"].update(data["releases"])
+                data = full
+            yaml.dump(data, self.filename)
+            return
+        with self.filename.open("w", encoding="utf-8") as file:
+            file.write(text)
+
+    def _splice_changelog(self, yaml: YAML) -> str | None:
+        """Splice the changes of the target release into the loaded file.
+
+        Runs only change the target release, so the result is identical
+        to a full dump.
+
+        :param yaml: The YAML instance configured for the full dump
+        :return: The new content of the file, or None to fall back to a full dump
+        """
+        layout = self._layout
+        if layout is None or self._target_version is None or not self._string_data:
+            return None
+        release = self._string_data["releases"][self._target_version]
+        changes = render_changes(yaml, self._target_version, release["changes"])
+        return layout.splice(
+            order=layout.order,
+            version=self._target_version,
+            changes=changes,
+            changes_first=next(iter(release)) == "changes",
+        )
 
     @staticmethod
-    def _get_changelog_line(item: dict[str, str]) -> str:
+    def _get_changelog_line(item: PullRequest | Mapping[str, Any]) -> str:
         """Generate each line of changelog.
 
         :param item: The item to generate the line for
-        :return: The generated line
+        :return: The generated line, cached on a PullRequest
         """
+        if isinstance(item, PullRequest):
+            return item.line
         return f"{item['title']} ({item['url']})"
 
-    def get_changes_after_last_release(self) -> list[dict[str, str]]:
-        """Get all the merged pull request.
+    def _get_search_url(self, window: MergeWindow, page: int = 1) -> str:
+        """Build the search URL for one window of merge dates.
 
-        Only after specified release, optionally until specified release.
-
-        :return: The list of pull requests
+        :param window: The merge dates to search in
+        :param page: The page of the search results
+        :return: The search URL
         """
-        since_release_date = self._get_release_date(self.since_version)
-
-        merged_date_filter = (
-            f"merged:{since_release_date}..{self._get_release_date(self.to_version)}"
-            if self.to_version
-            else f"merged:>={since_release_date}"
-        )
-
-        url = (
+        start, end = window
+        merged_date_filter = f"merged:{start}..{end}" if end else f"merged:>={start}"
+        if self._watermark:
+            # PRs merged after the watermark and retitled PRs recorded before
+            merged_date_filter += f"+updated:>={self._watermark.merged_at}"
+        return (
             f"{self.github_api_url}/search/issues"
             f"?q=repo:{self.repository}+"
             "is:pr+"
@@ -163,67 +389,275 @@ class ChangelogCIBase:
             "sort:author-date-asc+"
             f"{merged_date_filter}"
             "&sort=merged"
-            "&per_page=100"
+            f"&per_page={SEARCH_PAGE_SIZE}"
+            f"&page={page}"
         )
 
-        items = []
+    async def _search(self, url: str) -> requests.Response:
+        """Run one search request.
+
+        :param url: The search URL
+        :return: The response
+        """
+        return await self.engine.get(url)
+
+    @staticmethod
+    def _split_window(window: MergeWindow) -> list[MergeWindow]:
+        """Split a window of merge dates into two halves.
+
+        :param window: The window to split
+        :return: The two halves, or nothing if the window can not be split
+        """
+        start = _parse_timestamp(window[0])
+        end = _parse_timestamp(window[1]) if window[1] else datetime.now(timezone.utc)
+        if start is None or end is None:
+            return []
+        middle = start + (end - start) / 2
+        middle = middle.replace(microsecond=0)
+        if middle <= start or middle + timedelta(seconds=1) > end:
+            return []
+        return [
+            (_format_timestamp(start), _format_timestamp(middle)),
+            (_format_timestamp(middle + timedelta(seconds=1)), _format_timestamp(end)),
+        ]
+
+    async def _plan_shards(self, window: MergeWindow) -> list[tuple[MergeWindow, SearchPage]]:
+        """Split a window until no shard exceeds the search result limit.
+
+        The first page of every shard is kept, already trimmed, so it does
+        not need to be requested again.
+
+        :param window: The full window of merge dates
+        :return: The shards in date order with their first page
+        """
+        shards: list[tuple[MergeWindow, SearchPage]] = []
+        pending = [window]
+        while pending:
+            pages = await asyncio.gather(
+                *(self._search_page(self._get_search_url(w)) for w in pending),
+            )
+            split: list[MergeWindow] = []
+            for current, page in zip(pending, pages):
+                too_large = page.total_count > SEARCH_RESULT_LIMIT
+                halves = self._split_window(current) if too_large else []
+                if halves:
+                    split.extend(halves)
+                    continue
+                if too_large:
+                    report(f"More than {SEARCH_RESULT_LIMIT} pull requests merged in {current}")
+                shards.append((current, page))
+            pending = split
+        return sorted(shards, key=lambda shard: shard[0][0])
+
+    def _page_sources(
+        self,
+        shards: list[tuple[MergeWindow, SearchPage]],
+    ) -> Iterator[Awaitable[SearchPage] | AsyncIterator[SearchPage]]:
+        """List the requests for the pages of all shards in date order.
+
+        If the first page of a shard advertises the last page, every other
+        page is one request, otherwise the ``next`` links are followed.
+
+        :param shards: The shards with their first page
+        :yield: Awaitables for single pages, or iterators over chained pages, in order
+        """
+        for window, first_page in shards:
+            yield _resolved(first_page)
+            if first_page.last_url:
+                total = min(first_page.total_count, SEARCH_RESULT_LIMIT)
+                count = math.ceil(total / SEARCH_PAGE_SIZE)
+                for page in range(2, count + 1):
+                    yield self._search_page(self._get_search_url(window, page))
+            elif first_page.next_url:
+                yield self._follow_next(first_page.next_url)
+
+    async def _search_page(self, url: str) -> SearchPage:
+        """Run the search request for one page and trim it.
+
+        :param url: The search URL
+        :return: The page
+        """
+        return SearchPage.from_response(await self._search(url))
+
+    async def _follow_next(self, url: str | None) -> AsyncIterator[SearchPage]:
+        """Follow the ``next`` links of a shard without a ``last`` link.
+
+        Every page depends on the link of the previous one, so the pages
+        are requested and yielded one at a time.
+
+        :param url: The URL of the second page
+        :yield: The following pages in order
+        """
+        while url:
+            page = await self._search_page(url)
+            yield page
+            url = page.next_url
+
+    async def _iter_window(self, window: MergeWindow) -> AsyncIterator[SearchPage]:
+        """Stream the search result pages of a window of merge dates.
 
-        response = requests.get(url, headers=self._get_request_headers, timeout=10)
+        The pages are yielded in date order. Up to the limit of the engine,
+        the following pages are in flight while the current one is
+        processed. Pages are trimmed as they arrive, only the first page of
+        every shard is kept until the stream reaches it.
 
-        if response.ok:
-            response_data = response.json()
+        :param window: The window of merge dates
+        :yield: The pages in date order
+        """
+        shards = await self._plan_shards(window)
+        ahead: deque[asyncio.Future[SearchPage]] = deque()
+        for source in self._page_sources(shards):
+            if isinstance(source, AsyncIterator):
+                # the pages of a chain follow everything already requested
+                while ahead:
+                    yield await ahead.popleft()
+                async for page in source:
+                    yield page
+                continue
+            ahead.append(asyncio.ensure_future(source))
+            if len(ahead) > self.engine.limit:
+                yield await ahead.popleft()
+        while ahead:
+            yield await ahead.popleft()
+
+    async def _stream_changes(self, window: MergeWindow) -> list[PullRequest]:
+        """Fetch and classify the PRs of a window page by page.
+
+        Every page is classified as soon as it arrives, while the next
+        pages are still downloading.
+
+        :param window: The window of merge dates
+        :return: The list of pull requests
+        """
+        items: list[PullRequest] = []
+        seen: set[int] = set()
+        pages = 0
+        failed = found = False
+        async for search_page in self._iter_window(window):
+            pages += 1
+            if not search_page.ok:
+                msg = (
+                    f"Could not get pull requests for "
+                    f"{self.repository} from GitHub API. "
+                    f"response status code: {search_page.status_code}"
+                )
+                report(msg, failure=True)
+                failed = True
+                continue
             # `total_count` represents the number of
             # pull requests returned by the API call
-            if response_data["total_count"] > 0:
-                for item in response_data["items"]:
-                    data = {
-                        "title": item["title"],
-                        "number": item["number"],
-                        "url": item["html_url"],
-                        "labels": [label["name"] for label in item["labels"]],
-                    }
-                    items.append(data)
-            else:
-                print("No pull request found")
-        else:
-            msg = (
-                f"Could not get pull requests for "
-                f"{self.repository} from GitHub API. "
-                f"response status code: {response.status_code}"
+            found = found or search_page.total_count > 0
+            # shards do not overlap, but a PR can move between pages
+            page = []
+            for item in search_page.items:
+                if item.number not in seen:
+                    seen.add(item.number)
+                    page.append(item)
+            sections = self.classifier.classify(page)
+            self._classified.update(zip((item.number for item in page), sections))
+            items.extend(page)
+
+        if pages and not failed and not found:
+            report("No pull request found")
+        return items
+
+    @property
+    def state_file(self) -> Path:
+        """Get the path of the state file of incremental runs.
+
+        :return: The path next to the changelog file
+        """
+        return self.filename.parent / STATE_FILENAME
+
+    def _load_watermark(self) -> Watermark | None:
+        """Load the watermark of the previous incremental run.
+
+        :return: The watermark, or None if a full refresh is needed
+        """
+        if not self.incremental or self.backfill:
+            return None
+        watermark = Watermark.load(self.state_file)
+        if watermark and watermark.matches(self.repository, self.since_version, self.to_version):
+            return watermark
+        return None
+
+    def _save_watermark(self, changes: Sequence[PullRequest | Mapping[str, Any]]) -> None:
+        """Save the newest merged PR processed in this run.
+
+        :param changes: The list of PRs
+        """
+        if not self.incremental or self.backfill:
+            return
+        watermark = self._watermark or Watermark(
+            repository=self.repository,
+            since_version=self.since_version,
+            to_version=self.to_version,
+            merged_at="",
+            number=0,
+        )
+        watermark.advance(changes)
+        watermark.save(self.state_file)
+
+    def get_changes_after_last_release(self) -> list[PullRequest]:
+        """Get all the merged pull request.
+
+        Only after specified release, optionally until specified release.
+        Incremental runs only ask for PRs updated after the watermark.
+        Windows with more results than the search API returns are split into
+        date shards. All independent requests are sent concurrently by the
+        asyncio engine, the pages are trimmed and classified as they arrive.
+        The graphql backend
+        resolves the releases and the first page of PRs in one query, the git
+        backend reads the PR numbers from the history of a local clone.
+
+        :return: The list of pull requests
+        """
+        self._watermark = self._load_watermark()
+        if self.backend in {"graphql", "git"}:
+            # pylint: disable=import-outside-toplevel
+            from antsichaut.gitlog import GitBackend
+            from antsichaut.graphql import GraphQLBackend
+
+            graphql = GraphQLBackend(self.client, self.github_api_url, self.repository)
+            backend = graphql if self.backend == "graphql" else GitBackend(graphql, self.clone_dir)
+            return backend.get_changes(
+                self.since_version,
+                self.to_version,
+                updated_since=self._watermark.merged_at if self._watermark else "",
             )
-            print(msg)
 
-        return items
+        since_release_date = self._get_release_date(self.since_version)
+        to_release_date = self._get_release_date(self.to_version) if self.to_version else ""
+
+        return self.engine.run(
+            lambda: self._stream_changes((since_release_date, to_release_date)),
+        )
 
     def remove_outdated(
         self,
-        changes: list[dict[str, str]],
+        changes: Sequence[PullRequest | Mapping[str, Any]],
         data: dict[str, dict[str, dict[str, dict[str, list[str]]]]],
         new_version: str,
+        index: ChangesIndex | None = None,
     ) -> None:
         """Remove outdate changes from changelog.
 
-        Walk through the existing changelog looking for each PR.
-        If the PR is found in a given line, but the title has changed,
-        remove the line from the changelog. Rather than exit early,
-        continue to walk through the changelog to ensure that all
+        Look up each PR in the index of the release. If the PR is found,
+        but the title has changed, remove the line from the changelog.
+        All lines of the PR are checked to ensure that all outdated
         changes are removed.
 
         :param changes: list of PRs
         :param data: existing changelog data
         :param new_version: new version of the package to be released
+        :param index: the index of the release changes, built if not given
         """
-        current_changes = data["releases"][new_version]["changes"]
+        release_index = index or ChangesIndex(data["releases"][new_version]["changes"])
         for pull_request in changes:
-            new_entry = self._get_changelog_line(pull_request)
-            url = pull_request["url"]
-            for change_type, changes_of_type in current_changes.items():
-                change_list = reversed(list(enumerate(changes_of_type)))
-                for idx, current_entry in change_list:
-                    url_found = url in current_entry
-                    not_full_match = new_entry != current_entry
-                    if url_found and not_full_match:
-                        del current_changes[change_type][idx]
+            release_index.remove_outdated(
+                int(pull_request["number"]),
+                self._get_changelog_line(pull_request),
+            )
 
     @staticmethod
     def _sort_by_semver(data: ChLogType) -> ChLogType:
@@ -237,121 +671,207 @@ class ChangelogCIBase:
         data["releases"] = dict(
             sorted(
                 data["releases"].items(),
-                key=lambda t: [int(v) for v in t[0].split(".")],
+                key=lambda t: version_key(t[0]),
                 reverse=True,
             ),
         )
         return data
 
-    def parse_changelog(  # noqa: C901, PLR0912
+    def _load_changelog(self) -> tuple[str, Any]:
+        """Read and parse the changelog file.
+
+        If the file is in the layout antsichaut writes and the entries of
+        the older releases are already sorted, only the newest release is
+        parsed. The other releases are only scanned line by line.
+
+        :return: The content of the file and the parsed changelog
+        """
+        yaml = new_yaml()
+
+        with self.filename.open(encoding="utf-8") as file:
+            text = file.read()
+        self._layout = ChangelogLayout.scan(text)
+        newest = self._layout.load_newest(yaml) if self._layout else None
+        self._partial = newest is not None
+        if newest is not None:
+            return text, {"releases": newest}
+        return text, yaml.load(text)
+
+    def parse_changelog(
         self,
-        changes: list[dict[str, str]],
+        changes: Sequence[PullRequest | Mapping[str, Any]],
     ) -> Any:
         """Parse the pull requests data and return a string.
 
         :param changes: The list of PRs
         :return: A dictionary representing the complete changelog
         """
-        # pylint: disable=too-many-branches
-        yaml = YAML()
-
-        changelog = Path("changelogs/changelog.yaml")
-        with changelog.open(encoding="utf-8") as file:
-            data = yaml.load(file)
+        text, data = self._loaded_changelog or self._load_changelog()
+        self._loaded_changelog = None
+        self._changelog_text = text
 
         # get the new version from the changelog.yaml
         # by using the last item in the list of releases
         data = self._sort_by_semver(data)
         new_version = next(iter(data["releases"].keys()))
+        self._target_version = new_version
+
+        # add changes-key to the release dict, incremental runs keep the
+        # changes recorded by the previous runs
+        release = dict(data)["releases"][new_version]
+        if not (self._watermark and "changes" in release):
+            release.insert(0, "changes", {})
+
+        self._recorded = self._get_pr_index(text, data)
+        self._apply_changes(
+            changes,
+            dict(data)["releases"][new_version]["changes"],
+            self._recorded,
+            new_version,
+        )
+        return data
 
-        # add changes-key to the release dict
-        dict(data)["releases"][new_version].insert(0, "changes", {})
+    def _apply_changes(
+        self,
+        changes: Sequence[PullRequest | Mapping[str, Any]],
+        release_changes: MutableMapping[str, Any],
+        recorded: PullRequestIndex,
+        new_version: str,
+    ) -> None:
+        """Add the pull requests to the changes of the new release.
 
-        # Remove outdated changes from changelog
-        self.remove_outdated(
-            changes=changes,
-            data=data,
-            new_version=new_version,
-        )
+        :param changes: The list of PRs
+        :param release_changes: The changes of the new release, by section
+        :param recorded: The index of all PRs recorded in the changelog
+        :param new_version: The version of the new release
+        """
+        # PRs recorded under an older release are never added again
+        pull_requests = [
+            pull_request
+            for pull_request in map(PullRequest.coerce, changes)
+            if recorded.release_of(pull_request.number) in (None, new_version)
+        ]
 
-        leftover_changes = []
+        # one index of the release changes serves all lookups of this run
+        index = ChangesIndex(release_changes)
 
-        skip_labels = self.group_config.pop(
-            next(i for i, d in enumerate(self.group_config) if d["title"] == "skip_changelog"),
-        )["labels"]
+        # Remove outdated changes from changelog
+        for pull_request in pull_requests:
+            index.remove_outdated(pull_request.number, pull_request.line)
 
-        for pull_request in changes:
+        classified = [(pull_request, self._section(pull_request)) for pull_request in pull_requests]
+        # all changes without a matching rule go to the trivial section last
+        classified.sort(key=lambda pair: pair[1] == TRIVIAL_SECTION)
+
+        for pull_request, change_type in classified:
             # if a PR contains a skip changelog label, ignore it entirely
             # do not add it to the changelog
-            if any(label in pull_request["labels"] for label in skip_labels):
-                break
-
-            for config in self.group_config:
-                if any(label in pull_request["labels"] for label in config["labels"]):
-                    change_type = config["title"]
-
-                    # add the new change section if it does not exist yet
-                    if change_type not in dict(data)["releases"][new_version]["changes"]:
-                        dict(data)["releases"][new_version]["changes"].update(
-                            {change_type: []},
-                        )
-
-                    cl_entry = self._get_changelog_line(pull_request)
-
-                    # if the pr is already in the dict, do not add it, just remove it
-                    # from the list of pull_requests
-                    if cl_entry in dict(data)["releases"][new_version]["changes"][change_type]:
-                        break
-
-                    # if there is no change of this change_type yet, add a new list
-                    if not dict(data)["releases"][new_version]["changes"][change_type]:
-                        dict(data)["releases"][new_version]["changes"][change_type] = [
-                            cl_entry,
-                        ]
-                        break
-                    # if there is a change of this change_type, append to the list
-                    dict(data)["releases"][new_version]["changes"][change_type].append(
-                        cl_entry,
-                    )
-                    break
-            else:
-                leftover_changes.append(pull_request)
+            if change_type is None:
+                index.discard(pull_request.number)
                 continue
 
-        # all other changes without labels go to the trivial section
-        change_type = "trivial"
-        for pull_request in leftover_changes:
-            if change_type not in dict(data)["releases"][new_version]["changes"]:
-                dict(data)["releases"][new_version]["changes"].update({change_type: []})
+            # if the pr is already in the section, it is not added again,
+            # entries in other sections are removed
+            index.add(change_type, pull_request.line, pull_request.number)
 
-            cl_entry = self._get_changelog_line(pull_request)
+    def _section(self, pull_request: PullRequest) -> str | None:
+        """Find the section of a PR, classified while it was fetched if possible.
 
-            # if the pr is already in the dict, do not add it, just remove it
-            # from the list of pull_requests
-            if cl_entry in dict(data)["releases"][new_version]["changes"][change_type]:
-                continue
-            if not dict(data)["releases"][new_version]["changes"][change_type]:
-                dict(data)["releases"][new_version]["changes"][change_type] = [cl_entry]
-            # if there is a change of this change_type, append to the list
-            else:
-                dict(data)["releases"][new_version]["changes"][change_type].append(cl_entry)
-
-        return data
+        :param pull_request: The PR
+        :return: The section, or None if the PR is skipped
+        """
+        if pull_request.number in self._classified:
+            return self._classified[pull_request.number]
+        return self.classifier.section(pull_request)
 
     def _sort_by_pr(self) -> None:
-        """Sort changelog by PR number."""
-        if not self._string_data or "releases" not in self._string_data:
+        """Sort the changes of the target release by PR number.
+
+        The changes index already inserts new entries in order, so this
+        only checks the target release. Older releases are not touched,
+        ``antsichaut-normalize`` sorts them once.
+        """
+        if not self._string_data or self._target_version is None:
             return
-        for release_changes in self._string_data["releases"].values():
-            if "changes" not in release_changes:
-                continue
-            for changes in release_changes["changes"].values():
-                if not isinstance(changes, list):
-                    continue
-                changes.sort(
-                    key=self._extract_pr_number_from_url,
-                    reverse=True,
-                )
+        release = self._string_data["releases"].get(self._target_version) or {}
+        if release.get("changes"):
+            sort_changes(release["changes"])
+
+    @property
+    def snapshot_file(self) -> Path | None:
+        """Get the path of the saved model of the changelog file.
+
+        :return: The path in the cache directory, or None without a cache directory
+        """
+        return self._cache_file(".marshal")
+
+    def _cache_file(self, suffix: str) -> Path | None:
+        """Get the path of a file the cache directory keeps for the changelog file.
+
+        :param suffix: The suffix of the file
+        :return: The path in the cache directory, or None without a cache directory
+        """
+        if self.cache_dir is None:
+            return None
+        name = changelog_digest(str(self.filename.resolve()))[:16]
+        return self.cache_dir / f"changelog-{name}{suffix}"
+
+    def _is_unchanged(self, changes: Sequence[PullRequest]) -> bool:
+        """Check with the saved model whether the changelog stays as it is.
+
+        The changes of the new release are rebuilt from the saved model,
+        without parsing the changelog file.
+
+        :param changes: The list of PRs
+        :return: Whether the changelog file would be written unchanged
+        """
+        path = self.snapshot_file
+        snapshot = ChangelogSnapshot.load(path, self.filename) if path else None
+        if snapshot is None or snapshot.changes is None:
+            return False
+        if self._watermark:
+            release_changes = to_plain(snapshot.changes)
+        elif snapshot.changes_first:
+            release_changes = {}
+        else:
+            # the changes are moved to the top of the release
+            return False
+        self._apply_changes(
+            changes,
+            release_changes,
+            PullRequestIndex(snapshot.pull_requests),
+            snapshot.version,
+        )
+        sort_changes(release_changes)
+        return list(release_changes.items()) == list(snapshot.changes.items())
+
+    def _save_snapshot(self) -> None:
+        """Save the model of the written changelog file for later runs."""
+        path, data = self.snapshot_file, self._string_data
+        if path is None or not data or self._recorded is None or self._target_version is None:
+            return
+        release = data["releases"][self._target_version]
+        changes = to_plain(release["changes"])
+        self._recorded.replace_release(
+            self._target_version,
+            (
+                self._extract_pr_number_from_url(entry)
+                for entries in changes.values()
+                if isinstance(entries, list)
+                for entry in entries
+            ),
+        )
+        order = self._layout.order if self._layout else list(data["releases"])
+        snapshot = ChangelogSnapshot(
+            key=file_key(self.filename),
+            order=order,
+            pull_requests=self._recorded.to_dict(),
+            version=self._target_version,
+            changes=changes,
+            changes_first=next(iter(release)) == "changes",
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        snapshot.save(path)
 
     @staticmethod
     def _extract_pr_number_from_url(url: str) -> int:
@@ -365,27 +885,241 @@ class ChangelogCIBase:
             return int(match.group(1))
         return 0
 
-    def run(self) -> None:
-        """Entrypoint."""
-        changes = self.get_changes_after_last_release()
-        # exit the method if there are no changes found
-        if not changes:
-            return
+    def load_target_release(self) -> PullRequestIndex:
+        """Load the changelog to add PRs to its newest release as they come.
+
+        Unlike a run, the changes already recorded for the newest release
+        are kept.
+
+        :return: The index of all PRs recorded in the changelog
+        """
+        return self._load_target()[2]
+
+    def _load_target(self) -> tuple[Any, str, PullRequestIndex]:
+        """Load the changelog and its newest release.
 
-        self._string_data = self.parse_changelog(changes)
+        :return: The changelog structure, the newest version and the index of all PRs
+        """
+        text, data = self._load_changelog()
+        self._sort_by_semver(data)
+        version: str = next(iter(data["releases"]))
+        release = data["releases"][version]
+        if "changes" not in release:
+            release.insert(0, "changes", {})
+        recorded = self._get_pr_index(text, data)
+        self._string_data = data
+        self._target_version = version
+        self._changelog_text = text
+        self._recorded = recorded
+        return data, version, recorded
+
+    def write_pull_requests(self, pull_requests: Sequence[PullRequest]) -> None:
+        """Add PRs to the loaded newest release and write the changelog.
+
+        The layout of the written file is scanned again, so the next write
+        can be spliced as well.
+
+        :param pull_requests: The PRs
+        """
+        data: Any = self._string_data
+        version, recorded = self._target_version, self._recorded
+        if recorded is None or version is None or not data:
+            data, version, recorded = self._load_target()
+        release = data["releases"][version]
+        self._apply_changes(pull_requests, release["changes"], recorded, version)
         self._sort_by_pr()
         self._write_changelog()
+        self._save_snapshot()
+        self._changelog_text = self.filename.read_text(encoding="utf-8")
+        self._layout = ChangelogLayout.scan(self._changelog_text)
+
+    def _release_windows(self, data: Any) -> ReleaseWindows | None:
+        """Build the release windows of a backfill.
+
+        The windows are bounded by the published releases between
+        ``since_version`` and ``to_version`` that are in the changelog.
+        Without ``to_version``, changes merged after the last release go to
+        the newest release of the changelog if it is not published yet.
+
+        :param data: The full changelog structure, sorted by version
+        :return: The windows, or None if a release is not published
+        """
+        since = self._get_release(self.since_version)
+        to = self._get_release(self.to_version) if self.to_version else None
+        if since is None or (self.to_version and to is None):
+            report(f"Could not find any release id for {self.repository}", failure=True)
+            return None
+        end = to.published_at if to else self.release_index.dates[-1]
+        versions = {str(version): version for version in data["releases"]}
+        bounds = [(since.published_at, since.tag)]
+        published = set()
+        for release in self.release_index.between(since.published_at, end)[1:]:
+            version = versions.get(release.tag, versions.get(release.tag.lstrip("v")))
+            if version is not None:
+                bounds.append((release.published_at, version))
+                published.add(str(version))
+        newest = next(iter(data["releases"]))
+        unreleased = None if self.to_version or str(newest) in published else newest
+        return ReleaseWindows(bounds, unreleased)
+
+    def _backfill_changelog(
+        self,
+        changes: Sequence[PullRequest],
+        text: str,
+        data: Any,
+    ) -> Any:
+        """Add the pull requests of many releases to the changelog at once.
+
+        Every PR is assigned to its release by the date it was merged.
+        Changes recorded before are kept.
+
+        :param changes: The list of PRs of all releases
+        :param text: The content of the changelog file
+        :param data: The full changelog structure
+        :return: The changelog structure with the changes of every release
+        """
+        data = self._sort_by_semver(data)
+        windows = self._release_windows(data)
+        if windows is None:
+            return data
+        buckets: dict[Any, list[PullRequest]] = {}
+        for pull_request in changes:
+            release_version = windows.release_of(pull_request.merged_at or "")
+            if release_version is not None:
+                buckets.setdefault(release_version, []).append(pull_request)
+        skipped = len(changes) - sum(map(len, buckets.values()))
+        if skipped:
+            report(f"{skipped} pull requests are not in a release of the changelog")
+
+        recorded = self._get_pr_index(text, data)
+        for release_version, pull_requests in buckets.items():
+            release = data["releases"][release_version]
+            if "changes" not in release:
+                release.insert(0, "changes", {})
+            self._apply_changes(pull_requests, release["changes"], recorded, release_version)
+            sort_changes(release["changes"])
+        return data
 
+    def _run_backfill(self) -> int:
+        """Fill the changes of all releases of a range in one run.
 
+        The releases are listed once and the PRs of the whole range are
+        fetched in one pass, then the changelog is loaded and written once.
+
+        :return: The number of pull requests found
+        """
+        with self.profiler.phase("release lookup"):
+            _ = self.release_index
+        with self.profiler.phase("search fetch"):
+            changes = self.get_changes_after_last_release()
+        if not changes:
+            return 0
+        with self.profiler.phase("changelog load"):
+            text = self.filename.read_text(encoding="utf-8")
+            data = new_yaml().load(text)
+        with self.profiler.phase("classification"):
+            self._string_data = self._backfill_changelog(changes, text, data)
+        with self.profiler.phase("_write_changelog"):
+            # many releases changed, the file is dumped in full
+            self._layout, self._partial = None, False
+            self._write_changelog()
+        return len(changes)
+
+    @property
+    def fragments_dir(self) -> Path:
+        """Get the directory of the changelog fragments.
+
+        :return: The fragments directory next to the changelog file
+        """
+        return self.filename.parent / "fragments"
+
+    def _run_fragments(self) -> int:
+        """Write one fragment per new PR instead of the changelog.
+
+        The changelog file is not read, existing fragments are found by
+        their file names, so the cost only depends on the new PRs.
+
+        :return: The number of pull requests found
+        """
+        # pylint: disable=import-outside-toplevel
+        from antsichaut.fragments import write_fragments
+
+        if self.backend == "rest":
+            with self.profiler.phase("release lookup"):
+                _ = self.release_index
+        with self.profiler.phase("search fetch"):
+            changes = self.get_changes_after_last_release()
+        if not changes:
+            return 0
+        with self.profiler.phase("_write_fragments"):
+            entries = []
+            for pull_request in map(PullRequest.coerce, changes):
+                section = self._section(pull_request)
+                if section is not None:
+                    entries.append((pull_request.number, section, pull_request.line))
+            written = write_fragments(self.fragments_dir, entries, workers=self.max_workers)
+        report(f"Wrote {len(written)} changelog fragments to {self.fragments_dir}")
+        self._save_watermark(changes)
+        return len(changes)
+
+    def run(self) -> int:
+        """Entrypoint.
+
+        Every phase of the run is measured by the profiler.
+
+        :return: The number of pull requests found
+        """
+        if self.backfill:
+            return self._run_backfill()
+        if self.output == "fragments":
+            return self._run_fragments()
+        if self.backend == "rest":
+            with self.profiler.phase("release lookup"):
+                _ = self.release_index
+        with self.profiler.phase("search fetch"):
+            changes = self.get_changes_after_last_release()
+        # exit the method if there are no changes found
+        if not changes:
+            return 0
+
+        with self.profiler.phase("changelog load"):
+            # nothing to write if the saved model shows no new changes
+            if self._is_unchanged(changes):
+                self._save_watermark(changes)
+                return len(changes)
+            self._loaded_changelog = self._load_changelog()
+        with self.profiler.phase("classification"):
+            self._string_data = self.parse_changelog(changes)
+        with self.profiler.phase("_sort_by_pr"):
+            self._sort_by_pr()
+        with self.profiler.phase("_write_changelog"):
+            self._write_changelog()
+            self._save_snapshot()
+        self._save_watermark(changes)
+        return len(changes)
+
+
+@lru_cache(maxsize=None)
 def version() -> str:
     """Return the version of this package.
 
+    In a source checkout the version is read from pyproject.toml, an
+    installed package answers from its metadata without single_source.
+
     :return: the version of this package
     :raises TypeError: if the version is not a string
     """
-    __version__ = get_version(__name__, Path(__file__).parent.parent)
+    # pylint: disable=import-outside-toplevel
+    root = Path(__file__).parent.parent
+    __version__ = None
+    if (root / "pyproject.toml").is_file():
+        from single_source import get_version
+
+        __version__ = get_version(__name__, root)
     if not __version__:  # pragma: no cover
         # Only works when package is installed
+        from importlib.metadata import version as _version
+
         __version__ = _version("antsichaut")
     if not isinstance(__version__, str):
         err = "Unable to detect version"
@@ -393,8 +1127,29 @@ def version() -> str:
     return __version__
 
 
-def main() -> None:
-    """Entrypoint."""
+def _build_parser() -> configargparse.ArgParser:
+    """Build the parser for the command line arguments.
+
+    :return: The parser
+    """
+    # pylint: disable=import-outside-toplevel
+    import argparse
+
+    import configargparse
+
+    class _VersionAction(argparse.Action):
+        """Print the version, worked out only if the option is given."""
+
+        def __call__(
+            self,
+            parser: argparse.ArgumentParser,
+            namespace: argparse.Namespace,  # noqa: ARG002
+            values: str | Sequence[Any] | None,  # noqa: ARG002
+            option_string: str | None = None,  # noqa: ARG002
+        ) -> None:
+            print(version())
+            parser.exit()
+
     parser = configargparse.ArgParser(
         default_config_files=[".antsichaut.yaml"],
         config_file_parser_class=configargparse.YAMLConfigFileParser,
@@ -407,7 +1162,7 @@ def main() -> None:
         type=str,
         help="the github-repository in the form of owner/repo-name",
         env_var="GITHUB_REPOSITORY",
-        required=True,
+        required=False,
     )
     parser.add(
         "--github_token",
@@ -416,12 +1171,24 @@ def main() -> None:
         env_var="GITHUB_TOKEN",
         required=True,
     )
+    parser.add(
+        "--github_tokens",
+        dest="github_tokens",
+        type=str,
+        action="append",
+        help=(
+            "more tokens to access github, requests are spread over all tokens "
+            "by their remaining rate limit"
+        ),
+        env_var="GITHUB_TOKENS",
+        required=False,
+    )
     parser.add(
         "--since_version",
         type=str,
         help="the version to fetch PRs since",
         env_var="SINCE_VERSION",
-        required=True,
+        required=False,
     )
     parser.add(
         "--to_version",
@@ -505,11 +1272,268 @@ def main() -> None:
         env_var="SKIP_CHANGELOG_LABELS",
         required=False,
     )
-    parser.add("--version", action="version", version=version())
+    parser.add(
+        "--max_workers",
+        type=int,
+        default=4,
+        help="the number of concurrent requests to GitHub",
+        env_var="MAX_WORKERS",
+        required=False,
+    )
+    parser.add(
+        "--cache_dir",
+        "--cache-dir",
+        dest="cache_dir",
+        type=str,
+        help="a directory to cache GitHub API responses in",
+        env_var="CACHE_DIR",
+        required=False,
+    )
+    parser.add(
+        "--cache_size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+        help="the maximum size of the response cache in MiB",
+        env_var="CACHE_SIZE",
+        required=False,
+    )
+    parser.add(
+        "--backend",
+        type=str,
+        choices=["rest", "graphql", "git"],
+        default="rest",
+        help=(
+            "the GitHub API to fetch releases and PRs with, "
+            "git reads the PR numbers from a local clone"
+        ),
+        env_var="BACKEND",
+        required=False,
+    )
+    parser.add(
+        "--clone_dir",
+        type=str,
+        default=".",
+        help="the local clone the git backend reads the history of",
+        env_var="CLONE_DIR",
+        required=False,
+    )
+    parser.add(
+        "--output",
+        type=str,
+        choices=["changelog", "fragments"],
+        default="changelog",
+        help=(
+            "update changelog.yaml, or write one fragment per PR to "
+            "changelogs/fragments and leave changelog.yaml alone"
+        ),
+        env_var="OUTPUT",
+        required=False,
+    )
+    parser.add(
+        "--backfill",
+        action="store_true",
+        help=(
+            "fill the changes of every release between since_version and "
+            "to_version in one run, instead of only the newest release"
+        ),
+        env_var="BACKFILL",
+        required=False,
+    )
+    parser.add(
+        "--serve",
+        action="store_true",
+        help=(
+            "keep running and update the changelog from pull_request webhooks, "
+            "since_version is not needed"
+        ),
+        env_var="SERVE",
+        required=False,
+    )
+    parser.add(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="the address to listen for webhooks on",
+        env_var="HOST",
+        required=False,
+    )
+    parser.add(
+        "--port",
+        type=int,
+        default=8080,
+        help="the port to listen for webhooks on",
+        env_var="PORT",
+        required=False,
+    )
+    parser.add(
+        "--debounce",
+        type=float,
+        default=2.0,
+        help="the seconds without webhooks before the changelog is written",
+        env_var="DEBOUNCE",
+        required=False,
+    )
+    parser.add(
+        "--webhook_secret",
+        type=str,
+        help="the secret to verify the signature of webhooks with",
+        env_var="WEBHOOK_SECRET",
+        required=False,
+    )
+    parser.add(
+        "--incremental",
+        action="store_true",
+        help=(
+            "only fetch PRs updated since the previous run, "
+            "the state is kept next to the changelog"
+        ),
+        env_var="INCREMENTAL",
+        required=False,
+    )
+    parser.add(
+        "--profile",
+        type=str,
+        help=(
+            "print the time, requests and rate limit budget of every phase, "
+            "'table' prints a table, a path ending in .json writes JSON"
+        ),
+        env_var="PROFILE",
+        required=False,
+    )
+    parser.add(
+        "--cprofile",
+        type=str,
+        help="write cProfile statistics of the whole run to this file",
+        env_var="CPROFILE",
+        required=False,
+    )
+    parser.add(
+        "--manifest",
+        type=str,
+        help=(
+            "a YAML file listing repositories, changelog paths, versions and "
+            "label overrides, to update all of them in one run"
+        ),
+        env_var="MANIFEST",
+        required=False,
+    )
+    parser.add(
+        "--fleet_workers",
+        type=int,
+        default=4,
+        help="the number of repositories of the manifest processed at the same time",
+        env_var="FLEET_WORKERS",
+        required=False,
+    )
+    parser.add(
+        "--rate_limit_reserve",
+        type=int,
+        default=0,
+        help="the part of the rate limit left unused, requests wait for the reset below it",
+        env_var="RATE_LIMIT_RESERVE",
+        required=False,
+    )
+    parser.add("--version", action=_VersionAction, nargs=0, help="show the version and exit")
+    return parser
+
+
+def _run(cl_cib: ChangelogCIBase, args: configargparse.Namespace) -> None:
+    """Run antsichaut and report the profile if requested.
+
+    :param cl_cib: The configured ChangelogCIBase
+    :param args: The command line arguments
+    """
+    if args.cprofile:
+        # pylint: disable=import-outside-toplevel
+        import cProfile
+
+        profile = cProfile.Profile()
+        profile.runcall(cl_cib.run)
+        profile.dump_stats(args.cprofile)
+    else:
+        cl_cib.run()
+
+    if args.profile == "table":
+        print(cl_cib.profiler.table())
+    elif args.profile:
+        cl_cib.profiler.write_json(Path(args.profile))
+
+
+def _serve(cl_cib: ChangelogCIBase, args: configargparse.Namespace) -> None:
+    """Update the changelog from webhooks until interrupted.
+
+    :param cl_cib: The configured ChangelogCIBase
+    :param args: The command line arguments
+    """
+    # pylint: disable=import-outside-toplevel
+    from antsichaut.daemon import ChangelogDaemon
+
+    daemon = ChangelogDaemon(cl_cib, debounce=args.debounce, secret=args.webhook_secret)
+    daemon.start(args.host, args.port)
+    host, port = daemon.address
+    print(f"Listening for webhooks on http://{host}:{port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+
+
+def _run_fleet(args: configargparse.Namespace, group_config: list[dict[str, Any]]) -> None:
+    """Update the changelogs of all repositories of the manifest.
+
+    All repositories share one HTTP session, the response cache and the
+    rate limit budget.
+
+    :param args: The command line arguments
+    :param group_config: The group config, before the overrides of each repository
+    :raises SystemExit: if the run failed for any repository
+    """
+    # pylint: disable=import-outside-toplevel
+    from antsichaut.fleet import format_results, load_manifest, run_fleet
+
+    entries = load_manifest(Path(args.manifest))
+    cache_size = args.cache_size * 1024 * 1024
+    cache = ResponseCache(args.cache_dir, max_size=cache_size) if args.cache_dir else None
+    client = GitHubClient(
+        token=args.github_token,
+        pool_size=args.fleet_workers * args.max_workers,
+        cache=cache,
+        reserve=args.rate_limit_reserve,
+        tokens=args.github_tokens or (),
+    )
+
+    def build(entry: FleetEntry) -> ChangelogCIBase:
+        return ChangelogCIBase(
+            entry.repository,
+            entry.since_version,
+            entry.to_version,
+            entry.group_config(group_config),
+            filename=entry.filename,
+            token=args.github_token,
+            max_workers=args.max_workers,
+            cache_dir=args.cache_dir,
+            backend=args.backend,
+            clone_dir=entry.clone_dir,
+            incremental=args.incremental,
+            backfill=args.backfill,
+            output=args.output,
+            client=client,
+        )
+
+    results = run_fleet(entries, build, workers=args.fleet_workers)
+    print(format_results(results))
+    if not all(result.ok for result in results):
+        raise SystemExit(1)
 
-    # Execute the parse_args() method
-    args = parser.parse_args()
 
+def _group_config(args: configargparse.Namespace) -> list[dict[str, Any]]:
+    """Build the group config from the label arguments.
+
+    :param args: The command line arguments
+    :return: The group config
+    """
     # set defaults if the labels are undefined
     # setting them with argparse does not work, because
     # with argparse you can only append to the defaults, not override them
@@ -530,12 +1554,7 @@ def main() -> None:
     if not args.skip_changelog_labels:
         args.skip_changelog_labels = ["skip_changelog", "skip-changelog", "skipchangelog"]
 
-    repository = args.repository
-    since_version = args.since_version
-    to_version = args.to_version
-    token = args.github_token
-
-    group_config = [
+    return [
         {"title": "major_changes", "labels": args.major_changes_labels},
         {"title": "minor_changes", "labels": args.minor_changes_labels},
         {"title": "breaking_changes", "labels": args.breaking_changes_labels},
@@ -545,15 +1564,68 @@ def main() -> None:
         {"title": "bugfixes", "labels": args.bugfixes_labels},
         {"title": "skip_changelog", "labels": args.skip_changelog_labels},
     ]
+
+
+def main() -> None:
+    """Entrypoint."""
+    # answer without loading the parser, the action starts a new process every run
+    if sys.argv[1:] == ["--version"]:
+        print(version())
+        return
+    parser = _build_parser()
+
+    # Execute the parse_args() method
+    args = parser.parse_args()
+    if not args.manifest and not (args.repository and (args.since_version or args.serve)):
+        parser.error("--repository and --since_version are required without --manifest")
+    if args.profile and args.profile != "table" and not args.profile.endswith(".json"):
+        parser.error("--profile must be 'table' or a path ending in .json")
+
+    group_config = _group_config(args)
+    if args.manifest:
+        _run_fleet(args, group_config)
+        return
+
     cl_cib = ChangelogCIBase(
-        repository,
-        since_version,
-        to_version,
+        args.repository,
+        args.since_version or "",
+        args.to_version,
         group_config,
-        token=token,
+        token=args.github_token,
+        max_workers=args.max_workers,
+        cache_dir=args.cache_dir,
+        cache_size=args.cache_size * 1024 * 1024,
+        backend=args.backend,
+        incremental=args.incremental,
+        clone_dir=args.clone_dir,
+        backfill=args.backfill,
+        output=args.output,
+        tokens=args.github_tokens or (),
     )
+    if args.serve:
+        _serve(cl_cib, args)
+        return
     # Run Changelog CI
-    cl_cib.run()
+    _run(cl_cib, args)
+
+
+def normalize_main() -> None:
+    """Entrypoint to sort all releases of a changelog once."""
+    import configargparse  # pylint: disable=import-outside-toplevel
+
+    parser = configargparse.ArgParser(
+        description="sort the entries of all releases by PR number and rewrite the changelog",
+        formatter_class=configargparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add(
+        "filename",
+        nargs="?",
+        default="changelogs/changelog.yaml",
+        help="the changelog to normalize",
+    )
+    args = parser.parse_args()
+    if normalize(Path(args.filename)):
+        print(f"Normalized {args.filename}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""A persistent on-disk cache for GitHub API responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_CACHE_SIZE = 50 * 1024 * 1024
+
+# Other files in the cache directory, e.g. the saved PR index, are never evicted
+ENTRY_PREFIX = "response-"
+
+
+class CachedResponse:
+    """A response read from the cache."""
+
+    def __init__(self, url: str, data: dict[str, Any]) -> None:
+        """Initialize the cached response.
+
+        :param url: The URL of the response
+        :param data: The stored response data
+        """
+        self.url = url
+        self.headers: dict[str, str] = data["headers"]
+        self.body: str = data["body"]
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Get the headers for a conditional request.
+
+        :return: The conditional request headers
+        """
+        validators = {}
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+        return validators
+
+    def to_response(self) -> requests.Response:
+        """Build a response object from the cached data.
+
+        :return: The response
+        """
+        # pylint: disable=import-outside-toplevel
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+
+        response = Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = "utf-8"
+        response._content = self.body.encode("utf-8")  # noqa: SLF001
+        return response
+
+
+class ResponseCache:
+    """Store GitHub API responses with their validators on disk.
+
+    Entries are evicted least recently used first once the cache grows
+    beyond its size limit. The entries are listed once, later writes keep
+    the order and the total size up to date.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """Initialize the cache.
+
+        :param directory: The directory to store the responses in
+        :param max_size: The maximum size of the cache in bytes
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # the size of every entry, least recently used first
+        self._entries: OrderedDict[str, int] | None = None
+        self._size = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        """Get the file of a cached URL.
+
+        :param url: The URL
+        :return: The path of the cache entry
+        """
+        return self.directory / f"{ENTRY_PREFIX}{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Look up a response.
+
+        :param url: The URL of the response
+        :return: The cached response, or None if the URL is not cached
+        """
+        path = self._path(url)
+        try:
+            with path.open(encoding="utf-8") as file:
+                data = json.load(file)
+            self._touch(path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if self._entries is not None and path.name in self._entries:
+                self._entries.move_to_end(path.name)
+        return CachedResponse(url, data)
+
+    def put(self, url: str, response: requests.Response) -> None:
+        """Store a response if it can be revalidated.
+
+        :param url: The URL of the response
+        :param response: The response
+        """
+        if "ETag" not in response.headers and "Last-Modified" not in response.headers:
+            return
+        data = {
+            "headers": dict(response.headers),
+            "body": response.text,
+        }
+        path = self._path(url)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=self.directory,
+            suffix=".tmp",
+            delete=False,
+        ) as file:
+            json.dump(data, file)
+        size = Path(file.name).stat().st_size
+        with self._lock:
+            entries = self._list_entries()
+            Path(file.name).replace(path)
+            self._touch(path)
+            self._size += size - entries.pop(path.name, 0)
+            entries[path.name] = size
+            self._evict(entries)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Record the use of an entry for the eviction.
+
+        The file system may store coarse timestamps, so the modification
+        time is set explicitly.
+
+        :param path: The path of the cache entry
+        """
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _list_entries(self) -> OrderedDict[str, int]:
+        """List the entries on disk the first time they are needed.
+
+        :return: The size of every entry, least recently used first
+        """
+        if self._entries is None:
+            found = []
+            for path in self.directory.glob(f"{ENTRY_PREFIX}*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime_ns, path.name, stat.st_size))
+            self._entries = OrderedDict((name, size) for _mtime, name, size in sorted(found))
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def _evict(self, entries: OrderedDict[str, int]) -> None:
+        """Remove the least recently used entries beyond the size limit.
+
+        :param entries: The size of every entry, least recently used first
+        """
+        while entries and self._size > self.max_size:
+            name, size = entries.popitem(last=False)
+            (self.directory / name).unlink(missing_ok=True)
+            self._size -= size
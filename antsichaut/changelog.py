@@ -0,0 +1,896 @@
+"""Indexes over the entries of changelog.yaml."""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import io
+import json
+import marshal
+import re
+import tempfile
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, MutableMapping, Sequence
+
+    from ruamel.yaml import YAML
+
+# Every changelog line ends with the URL of its PR in parentheses
+PR_NUMBER = re.compile(r"pull/(\d+)\)")
+
+# The keys of releases and of their changes in a block style changelog.yaml
+RELEASE_KEY = re.compile(r"^  (?P<quote>['\"]?)(?P<version>[\w.+-]+)(?P=quote):\n$")
+CHANGES_KEY = re.compile(r"^    changes:")
+SECTION_KEY = re.compile(r"^      (?P<section>\w+):(?P<value>.*)\n$")
+
+# Any mapping key without its indentation, with its inline value
+MAPPING_KEY = re.compile(r"^(?P<key>[\w.+-]+|'[^']*'|\"[^\"]*\"):(?: (?P<value>.*))?$")
+
+# Scalars every ruamel.yaml version dumps exactly like this, on lines short
+# enough not to be wrapped: plain text and versions, quoted dates and numbers
+PLAIN_SCALAR = re.compile(
+    r"[A-Za-z](?:[\x20-\x22\x24-\x7e]*[\x21-\x22\x24-\x7e])?|\d+\.\d+\.\d+[\w.+-]*",
+)
+QUOTED_SCALAR = re.compile(r"'(?:\d{4}-\d\d-\d\d|\d+(?:\.\d+)?)?'")
+NOT_STRINGS = frozenset(("true", "false", "null", "yes", "no", "on", "off", "y", "n"))
+DUMP_WIDTH = 80
+
+# Changed whenever the fields of a saved snapshot change
+SNAPSHOT_FORMAT = 1
+
+
+def extract_pr_number(entry: str) -> int:
+    """Extract the PR number from a changelog line.
+
+    :param entry: The changelog line
+    :return: The PR number, or 0 if the line does not link a PR
+    """
+    match = PR_NUMBER.search(entry)
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+def version_key(version: str) -> list[int]:
+    """Build a key to sort versions by semver.
+
+    :param version: The version
+    :return: The sort key
+    """
+    return [int(v) for v in version.split(".")]
+
+
+def changelog_digest(text: str) -> str:
+    """Hash the content of a changelog file.
+
+    :param text: The content of the file
+    :return: The hex digest of the content
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PullRequestIndex:
+    """The release every PR in changelog.yaml is recorded under."""
+
+    def __init__(self, releases: Mapping[int, str]) -> None:
+        """Initialize the index.
+
+        :param releases: The version of the release of every PR number
+        """
+        self._releases = dict(releases)
+
+    @classmethod
+    def from_data(cls, data: Mapping[str, Any]) -> PullRequestIndex:
+        """Build the index in one pass over all releases.
+
+        A PR listed under several releases is indexed under the oldest.
+
+        :param data: The full changelog structure
+        :return: The index
+        """
+        return cls.from_numbers(
+            (
+                release_version,
+                (
+                    extract_pr_number(entry)
+                    for entries in ((release or {}).get("changes") or {}).values()
+                    if isinstance(entries, list)
+                    for entry in entries
+                ),
+            )
+            for release_version, release in (data.get("releases") or {}).items()
+        )
+
+    @classmethod
+    def from_numbers(cls, releases: Iterable[tuple[str, Iterable[int]]]) -> PullRequestIndex:
+        """Build the index from the PR numbers of every release.
+
+        A PR listed under several releases is indexed under the oldest.
+
+        :param releases: The version of every release with its PR numbers
+        :return: The index
+        """
+        index: dict[int, str] = {}
+        for release_version, numbers in releases:
+            for number in numbers:
+                if not number:
+                    continue
+                known = index.get(number)
+                if known is None or version_key(release_version) < version_key(known):
+                    index[number] = release_version
+        return cls(index)
+
+    @classmethod
+    def load(cls, path: Path, digest: str) -> PullRequestIndex | None:
+        """Load a saved index.
+
+        :param path: The path of the saved index
+        :param digest: The hash of the changelog file the index must be built from
+        :return: The index, or None if it can not be read or the file changed
+        """
+        try:
+            with path.open(encoding="utf-8") as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(saved, dict) or saved.get("digest") != digest:
+            return None
+        return cls(
+            {
+                number: release
+                for release, numbers in saved["releases"].items()
+                for number in numbers
+            },
+        )
+
+    def save(self, path: Path, digest: str) -> None:
+        """Save the index compactly, grouped by release.
+
+        :param path: The path to save the index to
+        :param digest: The hash of the changelog file the index was built from
+        """
+        grouped: dict[str, list[int]] = {}
+        for number, release in self._releases.items():
+            grouped.setdefault(release, []).append(number)
+        with path.open("w", encoding="utf-8") as file:
+            json.dump({"digest": digest, "releases": grouped}, file, separators=(",", ":"))
+
+    def __contains__(self, number: int) -> bool:
+        """Check whether a PR is recorded under any release.
+
+        :param number: The PR number
+        :return: Whether the PR is in the changelog
+        """
+        return number in self._releases
+
+    def __len__(self) -> int:
+        """Return the number of recorded PRs.
+
+        :return: The number of PRs
+        """
+        return len(self._releases)
+
+    def release_of(self, number: int) -> str | None:
+        """Find the release a PR is recorded under.
+
+        :param number: The PR number
+        :return: The version of the release, or None if the PR is not recorded
+        """
+        return self._releases.get(number)
+
+    def to_dict(self) -> dict[int, str]:
+        """Get the release of every PR.
+
+        :return: The version of the release by PR number
+        """
+        return dict(self._releases)
+
+    def replace_release(self, release_version: str, numbers: Iterable[int]) -> None:
+        """Record the PRs of a release again after its changes were rewritten.
+
+        PRs recorded under an older release stay there.
+
+        :param release_version: The version of the release
+        :param numbers: The PR numbers now listed under the release
+        """
+        for number, release in list(self._releases.items()):
+            if release == release_version:
+                del self._releases[number]
+        for number in numbers:
+            known = self._releases.get(number)
+            if number and (known is None or version_key(release_version) < version_key(known)):
+                self._releases[number] = release_version
+
+
+def _sort_section(entries: list[Any]) -> list[int]:
+    """Sort the entries of one section by PR number, newest first.
+
+    The PR number of every entry is extracted once. Entries without a PR
+    go last, entries with the same PR keep their order.
+
+    :param entries: The entries of the section, sorted in place
+    :return: The negated PR number of every entry, in ascending order
+    """
+    keys = [-extract_pr_number(entry) for entry in entries]
+    if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+        order = sorted(range(len(entries)), key=keys.__getitem__)
+        entries[:] = [entries[i] for i in order]
+        keys = [keys[i] for i in order]
+    return keys
+
+
+def sort_changes(changes: Mapping[str, Any]) -> bool:
+    """Sort the entries of every section of a release by PR number.
+
+    :param changes: The changes of the release, by section
+    :return: Whether any entry moved
+    """
+    moved = False
+    for entries in changes.values():
+        if isinstance(entries, list):
+            before = list(entries)
+            _sort_section(entries)
+            moved = moved or entries != before
+    return moved
+
+
+class ChangesIndex:
+    """Index the changes of one release by PR number.
+
+    Every section is kept sorted by PR number, newest first, the order
+    antsichaut writes. The PR numbers of the entries are kept in a
+    parallel list of keys, so the entries of a PR are found and new
+    entries are inserted by binary search.
+    """
+
+    def __init__(self, changes: MutableMapping[str, Any]) -> None:
+        """Build the index in one pass over the changes.
+
+        Sections that are not sorted yet are sorted once.
+
+        :param changes: The changes of the release, by section
+        """
+        self.changes = changes
+        # the negated PR numbers of every section, in ascending order
+        self._keys: dict[str, list[int]] = {}
+        self._sections: dict[int, set[str]] = {}
+        for section, entries in self.changes.items():
+            if not isinstance(entries, list):
+                continue
+            self._keys[section] = _sort_section(entries)
+            for key in self._keys[section]:
+                if key:
+                    self._sections.setdefault(-key, set()).add(section)
+
+    def __contains__(self, number: int) -> bool:
+        """Check whether a PR is in the release.
+
+        :param number: The PR number
+        :return: Whether the release has an entry for the PR
+        """
+        return number in self._sections
+
+    def remove_outdated(self, number: int, entry: str) -> None:
+        """Remove the entries of a PR that differ from its current line.
+
+        :param number: The PR number
+        :param entry: The current changelog line of the PR
+        """
+        for section in list(self._sections.get(number, ())):
+            self._select(section, number, lambda entries: [e for e in entries if e == entry])
+
+    def discard(self, number: int) -> None:
+        """Remove all entries of a PR.
+
+        :param number: The PR number
+        """
+        for section in list(self._sections.get(number, ())):
+            self._select(section, number, lambda _entries: [])
+
+    def add(self, section: str, entry: str, number: int) -> bool:
+        """Add the entry of a PR unless it is already there.
+
+        Entries of the PR in other sections, e.g. after its labels changed,
+        or with another title are removed.
+
+        :param section: The section of the entry
+        :param entry: The changelog line
+        :param number: The PR number
+        :return: Whether the entry was added
+        """
+        found = False
+        for current in list(self._sections.get(number, ())):
+            if current == section:
+                kept = self._select(current, number, lambda e: [entry] if entry in e else [])
+                found = bool(kept)
+            else:
+                self._select(current, number, lambda _entries: [])
+        if found:
+            return False
+
+        # add the new change section if it does not exist yet
+        if not self.changes.get(section):
+            self.changes[section] = []
+            self._keys[section] = []
+        keys = self._keys[section]
+        position = bisect.bisect_right(keys, -number)
+        keys.insert(position, -number)
+        self.changes[section].insert(position, entry)
+        self._sections.setdefault(number, set()).add(section)
+        return True
+
+    def _select(
+        self,
+        section: str,
+        number: int,
+        select: Callable[[list[str]], list[str]],
+    ) -> list[str]:
+        """Replace the entries of a PR in one section by a selection of them.
+
+        :param section: The section
+        :param number: The PR number
+        :param select: Selects the entries to keep
+        :return: The kept entries
+        """
+        keys = self._keys[section]
+        entries = self.changes[section]
+        start = bisect.bisect_left(keys, -number)
+        end = bisect.bisect_right(keys, -number)
+        kept = select(list(entries[start:end]))
+        entries[start:end] = kept
+        keys[start:end] = [-number] * len(kept)
+        if not kept:
+            self._sections[number].discard(section)
+            if not self._sections[number]:
+                del self._sections[number]
+        return kept
+
+
+def new_yaml(typ: str | None = None) -> YAML:
+    """Create a YAML instance.
+
+    ruamel.yaml is only imported once a run parses or writes YAML, runs
+    answered from the snapshot and ``--version`` start without it.
+
+    :param typ: The type of the loader, round trip by default
+    :return: The YAML instance
+    """
+    # pylint: disable=import-outside-toplevel
+    from ruamel.yaml import YAML
+
+    return YAML(typ=typ)
+
+
+def changelog_yaml() -> YAML:
+    """Get the YAML instance changelog.yaml is written with.
+
+    :return: The YAML instance
+    """
+    yaml = new_yaml()
+    yaml.explicit_start = True
+    yaml.indent(sequence=4, offset=2)
+    return yaml
+
+
+def normalize(path: Path) -> bool:
+    """Sort all releases and the entries of every release once.
+
+    Runs only keep the release they update sorted, this brings older
+    files into the same order. The whole file is rewritten.
+
+    :param path: The path of the changelog file
+    :return: Whether the file changed
+    """
+    text = path.read_text(encoding="utf-8")
+    yaml = changelog_yaml()
+    data = yaml.load(text)
+    data["releases"] = dict(
+        sorted((data.get("releases") or {}).items(), key=lambda t: version_key(t[0]), reverse=True),
+    )
+    for release in data["releases"].values():
+        sort_changes((release or {}).get("changes") or {})
+    stream = io.StringIO()
+    yaml.dump(data, stream)
+    if stream.getvalue() == text:
+        return False
+    with path.open("w", encoding="utf-8") as file:
+        file.write(stream.getvalue())
+    return True
+
+
+def render_changes(yaml: YAML, version: str, changes: Any) -> list[str]:
+    """Dump the changes of one release like a full dump would.
+
+    The changes are dumped nested the same way as in the full file, so
+    indentation and line wrapping match.
+
+    :param yaml: The YAML instance configured like for the full dump
+    :param version: The version of the release
+    :param changes: The changes of the release
+    :return: The lines of the changes key and its value
+    """
+    stream = io.StringIO()
+    yaml.dump({"releases": {version: {"changes": changes}}}, stream)
+    lines = stream.getvalue().splitlines(keepends=True)
+    start = next(i for i, line in enumerate(lines) if CHANGES_KEY.match(line))
+    return lines[start:]
+
+
+class ChangelogLayout:
+    """The lines of every release in a changelog.yaml written by antsichaut.
+
+    Only files in the block style of a full dump are recognized: an explicit
+    document start, releases indented by two spaces, no comments, no blank
+    lines inside the releases and every scalar quoted and wrapped like a full
+    dump writes it.
+    """
+
+    def __init__(self, head: list[str], releases: dict[str, list[str]], tail: list[str]) -> None:
+        """Initialize the layout.
+
+        :param head: The lines up to and including the releases key
+        :param releases: The lines of every release, starting with its key
+        :param tail: The lines after the releases
+        """
+        self.head = head
+        self.releases = releases
+        self.tail = tail
+
+    @classmethod
+    def scan(cls, text: str) -> ChangelogLayout | None:
+        """Find the lines of every release without parsing the YAML.
+
+        :param text: The content of the changelog file
+        :return: The layout, or None if the layout is not recognized
+        """
+        lines = text.splitlines(keepends=True)
+        if (
+            "\r" in text
+            or not text.startswith("---\n")
+            or not text.endswith("\n")
+            or "releases:\n" not in lines
+            or any(line.lstrip().startswith("#") for line in lines)
+            or not _is_dump_layout(lines[1:])
+        ):
+            return None
+        start = lines.index("releases:\n")
+        end = next(
+            (i for i in range(start + 1, len(lines)) if not lines[i].startswith(" ")),
+            len(lines),
+        )
+
+        releases: dict[str, list[str]] = {}
+        current: list[str] | None = None
+        for line in lines[start + 1 : end]:
+            match = RELEASE_KEY.match(line)
+            if match:
+                current = releases.setdefault(match.group("version"), [])
+                if current:
+                    return None
+                current.append(line)
+            elif current is not None and line.startswith("    "):
+                current.append(line)
+            else:
+                return None
+        # the head, the releases and the tail are each checked like a file
+        regions = [lines[1 : start + 1], *(["releases:\n", *r] for r in releases.values())]
+        if all(map(_is_dumped, [*regions, ["releases:\n", *lines[end:]]])):
+            return cls(lines[: start + 1], releases, lines[end:])
+        return None
+
+    @property
+    def order(self) -> list[str]:
+        """Get the versions in the order of a full dump, newest first.
+
+        :return: The versions
+        """
+        return sorted(self.releases, key=version_key, reverse=True)
+
+    @cached_property
+    def pull_requests(self) -> dict[str, dict[str, list[int]]] | None:
+        """Find the PR numbers of the entries of every release without parsing.
+
+        :return: The PR number of every entry by release and section, 0 for
+            entries without a PR, or None if a release is not recognized
+        """
+        releases = {}
+        for release_version, lines in self.releases.items():
+            sections = self._sections(lines[1:])
+            if sections is None:
+                return None
+            releases[release_version] = sections
+        return releases
+
+    @staticmethod
+    def _sections(lines: list[str]) -> dict[str, list[int]] | None:
+        """Find the PR numbers of the entries in the changes of one release.
+
+        :param lines: The lines of the release without its key
+        :return: The PR numbers by section, or None if the changes are not recognized
+        """
+        start = next((i for i, line in enumerate(lines) if CHANGES_KEY.match(line)), None)
+        if start is None or lines[start] == "    changes: {}\n":
+            return {}
+        if lines[start] != "    changes:\n":
+            return None
+
+        sections: dict[str, list[int]] = {}
+        # the numbers of the current section, None for sections that are no list
+        numbers: list[int] | None = None
+        for line in lines[start + 1 :]:
+            if not line.startswith("      "):
+                break
+            match = SECTION_KEY.match(line)
+            if match:
+                value = match.group("value").strip()
+                if value.startswith(("[", "{")) and value != "[]":
+                    # the entries of a flow style section can not be read by line
+                    return None
+                section = match.group("section")
+                numbers = sections.setdefault(section, []) if value in ("", "[]") else None
+            elif numbers is None and line.startswith("        "):
+                # the wrapped value of a section that is no list, e.g. release_summary
+                continue
+            elif numbers is not None and line.startswith("        - "):
+                numbers.append(extract_pr_number(line))
+            elif numbers and line.startswith("          "):
+                # the URL of a wrapped entry is never split across lines
+                numbers[-1] = numbers[-1] or extract_pr_number(line)
+            else:
+                # e.g. entries at the indentation of their section
+                return None
+        return sections
+
+    def load_newest(self, yaml: YAML) -> dict[str, Any] | None:
+        """Parse only the newest release.
+
+        The other releases are never changed by a run, their PRs are read
+        from the lines of their entries.
+
+        :param yaml: The YAML instance to parse the release with
+        :return: The newest release by its version, or None if the whole
+            file needs to be parsed
+        """
+        newest = max(self.releases, key=version_key, default=None)
+        if newest is None or self.pull_requests is None:
+            return None
+        data = yaml.load("".join(["releases:\n", *self.releases[newest]]))
+        return {newest: next(iter(data["releases"].values()))}
+
+    def splice(
+        self,
+        order: Sequence[str],
+        version: str,
+        changes: list[str],
+        changes_first: bool,
+    ) -> str | None:
+        """Replace the changes of one release and keep everything else.
+
+        :param order: The versions of all releases in the order to write them
+        :param version: The version of the release to update
+        :param changes: The new lines of the changes key and its value
+        :param changes_first: Whether the changes are the first key of the release
+        :return: The new content of the file, or None if it can not be spliced
+        """
+        if sorted(order) != sorted(self.releases) or version not in self.releases:
+            return None
+        key, *body = self.releases[version]
+        start = next((i for i, line in enumerate(body) if CHANGES_KEY.match(line)), None)
+        if start is not None:
+            end = next(
+                (i for i in range(start + 1, len(body)) if not body[i].startswith("     ")),
+                len(body),
+            )
+            body = body[:start] + body[end:]
+        if changes_first:
+            start = 0
+        elif start is None:
+            return None
+
+        release = [key, *body[:start], *changes, *body[start:]]
+        lines = [line for v in order for line in (release if v == version else self.releases[v])]
+        return "".join([*self.head, *lines, *self.tail])
+
+
+def _is_dump_layout(lines: Iterable[str]) -> bool:
+    """Check that lines are indented exactly like a full dump.
+
+    ``changelog_yaml`` indents mappings by two spaces and puts the dash of
+    a sequence two spaces below its key. Lines copied by a splice must
+    already look like that, or the file would differ from a full dump.
+
+    :param lines: The lines after the document start
+    :return: Whether the lines are in the layout of a full dump
+    """
+    # the indentation and kind of the lines owning the following lines
+    owners: list[tuple[int, str]] = []
+    # the indentation of the previous line if it is a key without a value
+    opener: int | None = None
+    for line in lines:
+        content = line.lstrip(" ").rstrip("\n")
+        indent = len(line) - len(line.lstrip(" "))
+        is_item = content == "-" or content.startswith("- ")
+        if not content or (
+            opener is not None
+            and ((indent > opener and indent != opener + 2) or (indent == opener and is_item))
+        ):
+            # a blank line, or a block not opened two spaces deeper than its key
+            return False
+        while owners and owners[-1][0] >= indent:
+            owners.pop()
+        owner = owners[-1] if owners else None
+        key = MAPPING_KEY.match(content[2:] if is_item else content)
+        if key is None and not is_item:
+            # the wrapped part of a scalar
+            if owner is None or owner[1] == "opener":
+                return False
+            opener = None
+            continue
+        if (owner is None and (indent or is_item)) or (
+            owner is not None
+            and (indent != owner[0] + 2 or owner[1] == "key" or (is_item and owner[1] == "item"))
+        ):
+            return False
+        value = (key.group("value") or "") if key else content[2:]
+        if value.startswith(("[", "{")) and value not in ("[]", "{}"):
+            # flow style collections are written in block style
+            return False
+        kind = "item" if is_item else "key" if value else "opener"
+        owners.append((indent, kind))
+        opener = indent if kind == "opener" else None
+    return True
+
+
+def _is_dumped(lines: list[str]) -> bool:
+    """Check that lines are quoted and wrapped exactly like a full dump.
+
+    Lines of plain text, versions and quoted dates are known to be dumped
+    unchanged. Anything else, e.g. wrapped or quoted text or ``null``, is
+    read into builtin types and dumped again to compare.
+
+    :param lines: The lines of top-level keys, in the layout of a full dump
+    :return: Whether a full dump writes the same lines
+    """
+    if all(_is_dumped_line(line) for line in lines):
+        return True
+    try:
+        data = _read_block(lines)
+    except ValueError:
+        return False
+    stream = io.StringIO()
+    changelog_yaml().dump(data, stream)
+    return stream.getvalue() == "".join(["---\n", *lines])
+
+
+def _is_dumped_line(line: str) -> bool:
+    """Check that a line is written like a full dump without dumping it.
+
+    :param line: The line
+    :return: Whether the line is known to be dumped unchanged
+    """
+    if len(line) > DUMP_WIDTH or line.endswith(" \n"):
+        # a line that may have been wrapped
+        return False
+    content = line.rstrip("\n").strip(" ")
+    is_item = content == "-" or content.startswith("- ")
+    if is_item:
+        content = content[2:]
+    key = MAPPING_KEY.match(content)
+    if key is None:
+        # the wrapped part of a scalar is never known to be unchanged
+        return is_item and _is_dumped_scalar(content)
+    return _is_dumped_scalar(key.group("key")) and (
+        key.group("value") in (None, "[]", "{}") or _is_dumped_scalar(key.group("value"))
+    )
+
+
+def _is_dumped_scalar(text: str) -> bool:
+    """Check that a scalar on a short line is written like a full dump.
+
+    :param text: The scalar
+    :return: Whether the scalar is known to be dumped unchanged
+    """
+    if QUOTED_SCALAR.fullmatch(text):
+        return True
+    return (
+        PLAIN_SCALAR.fullmatch(text) is not None
+        and ": " not in text
+        and not text.endswith(":")
+        and text.lower() not in NOT_STRINGS
+    )
+
+
+def _read_block(lines: list[str]) -> dict[str, Any]:
+    """Read lines in the layout of a full dump into builtin types.
+
+    Only the block style a full dump writes is read, scalars are read as
+    strings. If the lines mean something else, dumping the result does not
+    give the same lines back.
+
+    :param lines: The lines of top-level keys
+    :return: The mapping
+    :raises ValueError: if the lines can not be read
+    """
+    # the indentation, kind and content of every line, items and their
+    # content are split into two rows
+    rows: list[tuple[int, str, str]] = []
+    for line in lines:
+        content = line.rstrip("\n").strip(" ")
+        indent = len(line) - len(line.lstrip(" "))
+        if content == "-" or content.startswith("- "):
+            rows.append((indent, "item", ""))
+            indent, content = indent + 2, content[2:]
+            if not content:
+                continue
+        rows.append((indent, "key" if MAPPING_KEY.match(content) else "text", content))
+    data, end = _read_node(rows, 0)
+    if end != len(rows) or not isinstance(data, dict):
+        raise ValueError("".join(lines))
+    return data
+
+
+def _read_node(rows: list[tuple[int, str, str]], start: int) -> tuple[Any, int]:
+    """Read the mapping, sequence or scalar starting at a row.
+
+    :param rows: The rows of the lines
+    :param start: The index of the first row of the node
+    :return: The value and the index of the row after it
+    """
+    indent, kind, _ = rows[start]
+    if kind == "text":
+        return _read_text(rows, start, [])
+    index = start
+    if kind == "item":
+        items = []
+        while index < len(rows) and rows[index][:2] == (indent, "item"):
+            item, index = _read_child(rows, index + 1, indent)
+            items.append(item)
+        return items, index
+    mapping = {}
+    while index < len(rows) and rows[index][:2] == (indent, "key"):
+        match = MAPPING_KEY.match(rows[index][2])
+        if match is None:
+            raise ValueError(rows[index][2])
+        if match.group("value") is None:
+            value, index = _read_child(rows, index + 1, indent)
+        else:
+            # a scalar on the line of its key
+            value, index = _read_text(rows, index + 1, [match.group("value")])
+        mapping[_scalar(match.group("key"))] = value
+    return mapping, index
+
+
+def _read_child(rows: list[tuple[int, str, str]], start: int, indent: int) -> tuple[Any, int]:
+    """Read the value of a key or item without an inline value.
+
+    :param rows: The rows of the lines
+    :param start: The index of the row after the key or item
+    :param indent: The indentation of the key or item
+    :return: The value, None if no deeper row follows, and the index of the row after it
+    """
+    if start < len(rows) and rows[start][0] > indent:
+        return _read_node(rows, start)
+    return None, start
+
+
+def _read_text(rows: list[tuple[int, str, str]], start: int, text: list[str]) -> tuple[Any, int]:
+    """Read a scalar and its wrapped parts, joined like YAML folds them.
+
+    :param rows: The rows of the lines
+    :param start: The index of the first row that may be a wrapped part
+    :param text: The parts of the scalar read so far
+    :return: The value and the index of the row after it
+    """
+    index = start
+    while index < len(rows) and rows[index][1] == "text":
+        text.append(rows[index][2])
+        index += 1
+    return _scalar(" ".join(text)), index
+
+
+def _scalar(text: str) -> Any:
+    """Read a scalar as a string, or an empty collection.
+
+    :param text: The scalar as written
+    :return: The value
+    :raises ValueError: if the scalar is quoted in a way that is not read
+    """
+    if text == "[]":
+        return []
+    if text == "{}":
+        return {}
+    if text[:1] in ("'", '"'):
+        inner = text[1:-1]
+        if len(text) == 1 or text[-1] != text[0] or text[0] in inner.replace("''", ""):
+            raise ValueError(text)
+        if text[0] == '"' and "\\" in inner:
+            # escape sequences are not read
+            raise ValueError(text)
+        return inner.replace("''", "'") if text[0] == "'" else inner
+    return text
+
+
+def to_plain(value: Any) -> Any:
+    """Copy parsed YAML into builtin types.
+
+    :param value: The parsed value
+    :return: The value built from dicts, lists and plain strings
+    """
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, str):
+        return str(value)
+    return value
+
+
+def file_key(path: Path) -> tuple[int, int, str]:
+    """Identify the content of a file.
+
+    :param path: The path of the file
+    :return: The size, the modification time in ns and the hash of the file
+    """
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns, hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@dataclass
+class ChangelogSnapshot:
+    """The parsed model of a changelog file, saved between runs.
+
+    The snapshot holds what a run needs to decide whether the file
+    changes: the order of the releases, the release of every PR and the
+    changes of the newest release. It is keyed by the size, modification
+    time and hash of the file it was taken from.
+    """
+
+    key: tuple[int, int, str]
+    order: list[str]
+    pull_requests: dict[int, str]
+    version: str
+    changes: dict[str, Any] | None
+    changes_first: bool
+
+    @classmethod
+    def load(cls, path: Path, changelog: Path) -> ChangelogSnapshot | None:
+        """Load the snapshot of a changelog file.
+
+        :param path: The path of the saved snapshot
+        :param changelog: The path of the changelog file
+        :return: The snapshot, or None if there is none or the file changed
+        """
+        try:
+            with path.open("rb") as file:
+                saved = marshal.load(file)  # noqa: S302 written by antsichaut itself
+            if saved.pop("format", None) != SNAPSHOT_FORMAT:
+                return None
+            snapshot = cls(**saved)
+            stat = changelog.stat()
+            # the size and modification time rule out most changes without
+            # reading the file
+            if snapshot.key[:2] != (stat.st_size, stat.st_mtime_ns):
+                return None
+            if snapshot.key != file_key(changelog):
+                return None
+        except (OSError, EOFError, ValueError, TypeError, AttributeError):
+            return None
+        return snapshot
+
+    def save(self, path: Path) -> None:
+        """Save the snapshot.
+
+        :param path: The path of the saved snapshot
+        """
+        try:
+            payload = marshal.dumps({"format": SNAPSHOT_FORMAT, **asdict(self)})
+        except ValueError:
+            # values that are no builtin types, e.g. dates, are not cached
+            return
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as file:
+            file.write(payload)
+        Path(file.name).replace(path)
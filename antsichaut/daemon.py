@@ -0,0 +1,246 @@
+"""Keep the changelog model in memory and update it from GitHub webhooks."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+from antsichaut.changelog import file_key
+from antsichaut.models import PullRequest
+
+if TYPE_CHECKING:
+    from antsichaut.antsichaut import ChangelogCIBase
+
+# The actions of pull_request events that change the changelog of a merged PR
+ACTIONS = frozenset(("closed", "labeled", "unlabeled", "edited"))
+
+
+def pull_request_of(event: str, payload: dict[str, Any]) -> PullRequest | None:
+    """Extract the merged pull request of a webhook payload.
+
+    :param event: The event name from the X-GitHub-Event header
+    :param payload: The webhook payload
+    :return: The pull request, or None if the event does not change the changelog
+    """
+    if event != "pull_request" or payload.get("action") not in ACTIONS:
+        return None
+    pull = payload.get("pull_request") or {}
+    if not pull.get("merged_at"):
+        return None
+    return PullRequest(
+        number=pull["number"],
+        title=pull["title"],
+        url=pull["html_url"],
+        labels=(label["name"] for label in pull.get("labels", ())),
+        merged_at=pull["merged_at"],
+        author=(pull.get("user") or {}).get("login"),
+    )
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """Check the HMAC signature GitHub sends with a payload.
+
+    :param secret: The webhook secret
+    :param body: The raw payload
+    :param signature: The X-Hub-Signature-256 header
+    :return: Whether the signature matches
+    """
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return signature is not None and hmac.compare_digest(expected, signature)
+
+
+class ChangelogDaemon:
+    """Apply webhook events to a changelog that stays parsed in memory.
+
+    The changelog and the index of recorded PRs are loaded once. Events
+    are queued per PR, a burst of events is written once it has been quiet
+    for the debounce delay, or after the maximum delay at the latest.
+    Writes are serialized, so the model is never changed concurrently. If
+    the file was changed by someone else, it is loaded again before the
+    next write.
+    """
+
+    def __init__(
+        self,
+        ccb: ChangelogCIBase,
+        debounce: float = 2.0,
+        max_delay: float = 30.0,
+        secret: str | None = None,
+    ) -> None:
+        """Initialize the daemon.
+
+        :param ccb: The configured ChangelogCIBase, it is not run
+        :param debounce: The seconds without events before a write
+        :param max_delay: The most seconds an event waits for a write
+        :param secret: The webhook secret to verify payloads with, optional
+        """
+        self.ccb = ccb
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.secret = secret
+        self.writes = 0
+        self._pending: dict[int, PullRequest] = {}
+        self._first_event = self._last_event = 0.0
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._key: tuple[int, int, str] | None = None
+        self._server: ThreadingHTTPServer | None = None
+        self._threads: list[threading.Thread] = []
+
+    def load(self) -> None:
+        """Parse the changelog and index the recorded PRs."""
+        self.ccb.load_target_release()
+        self._key = file_key(self.ccb.filename)
+
+    def handle(self, event: str, payload: dict[str, Any]) -> bool:
+        """Queue the pull request of one webhook event.
+
+        :param event: The event name from the X-GitHub-Event header
+        :param payload: The webhook payload
+        :return: Whether the event was queued
+        """
+        repository = (payload.get("repository") or {}).get("full_name")
+        pull_request = pull_request_of(event, payload)
+        if pull_request is None or repository != self.ccb.repository:
+            return False
+        with self._condition:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_event = now
+            self._last_event = now
+            # only the newest state of a PR matters
+            self._pending[pull_request.number] = pull_request
+            self._condition.notify()
+        return True
+
+    def flush(self) -> int:
+        """Write the queued events now.
+
+        :return: The number of PRs written
+        """
+        with self._write_lock:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._write(list(pending.values()))
+        return len(pending)
+
+    def _write(self, pull_requests: list[PullRequest]) -> None:
+        """Apply PRs to the model and write the changelog.
+
+        :param pull_requests: The PRs of the queued events
+        """
+        # the file was changed by someone else, e.g. a new release was added
+        if self._key is None or file_key(self.ccb.filename) != self._key:
+            self.load()
+        self.ccb.write_pull_requests(pull_requests)
+        self._key = file_key(self.ccb.filename)
+        self.writes += 1
+
+    def _writer(self) -> None:
+        """Write bursts of events once they are quiet, until stopped."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                while self._pending and not self._stopping:
+                    deadline = min(
+                        self._last_event + self.debounce,
+                        self._first_event + self.max_delay,
+                    )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Get the address the server listens on.
+
+        :return: The host and port
+        :raises RuntimeError: if the daemon was not started
+        """
+        if self._server is None:
+            msg = "ChangelogDaemon.address is only known after start"
+            raise RuntimeError(msg)
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Load the changelog and serve webhooks in background threads.
+
+        :param host: The host to listen on
+        :param port: The port to listen on, 0 picks a free one
+        """
+        self.load()
+        self._stopping = False
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+            threading.Thread(target=self._writer, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and write the queued events."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+def _handler(daemon: ChangelogDaemon) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler that passes webhooks to the daemon.
+
+    :param daemon: The daemon
+    :return: The request handler class
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        """Answer webhook deliveries."""
+
+        def do_POST(self) -> None:
+            """Verify and queue one webhook delivery."""
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+            signature = self.headers.get("X-Hub-Signature-256")
+            if daemon.secret and not verify_signature(daemon.secret, body, signature):
+                self.send_response(HTTPStatus.UNAUTHORIZED)
+            else:
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self.send_response(HTTPStatus.BAD_REQUEST)
+                else:
+                    event = self.headers.get("X-GitHub-Event", "")
+                    queued = daemon.handle(event, payload)
+                    self.send_response(HTTPStatus.ACCEPTED if queued else HTTPStatus.NO_CONTENT)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            """Do not log every delivery.
+
+            :param format: The format string
+            :param args: The format arguments
+            """
+            # pylint: disable=redefined-builtin
+
+    return Handler
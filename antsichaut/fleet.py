@@ -0,0 +1,168 @@
+"""Update the changelogs of many repositories in one invocation."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Any
+
+from antsichaut.changelog import new_yaml
+from antsichaut.messages import named_run
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from pathlib import Path
+
+    from antsichaut.antsichaut import ChangelogCIBase
+
+
+@dataclass
+class FleetEntry:
+    """One repository of the manifest."""
+
+    repository: str
+    since_version: str
+    to_version: str = ""
+    filename: str = "changelogs/changelog.yaml"
+    clone_dir: str = "."
+    labels: dict[str, list[str]] = field(default_factory=dict)
+    # why the entry of the manifest is invalid, it is reported instead of run
+    error: str | None = None
+
+    def group_config(self, defaults: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Apply the label overrides of the entry to the group config.
+
+        :param defaults: The group config of the command line
+        :return: The group config of the repository
+        """
+        return [
+            {**section, "labels": self.labels.get(section["title"], section["labels"])}
+            for section in defaults
+        ]
+
+
+@dataclass
+class FleetResult:
+    """The outcome of the run for one repository."""
+
+    repository: str
+    filename: str
+    pull_requests: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Check whether the run succeeded.
+
+        :return: Whether there was no error
+        """
+        return self.error is None
+
+
+def load_manifest(path: Path) -> list[FleetEntry]:
+    """Read the repositories of a manifest.
+
+    The manifest lists the repositories under ``repositories``, values
+    under ``defaults`` apply to all of them. Relative changelog paths and
+    clone directories are resolved against the directory of the manifest.
+    Invalid entries are returned with their error, so they fail without
+    stopping the others.
+
+    :param path: The path of the manifest
+    :return: The entries of the manifest
+    """
+    with path.open(encoding="utf-8") as file:
+        manifest = new_yaml("safe").load(file) or {}
+    defaults = manifest.get("defaults") or {}
+    entries = []
+    for index, repository in enumerate(manifest.get("repositories") or []):
+        values = {**defaults, **repository} if isinstance(repository, dict) else {}
+        error = _validate(values)
+        if error:
+            name = values.get("repository") or f"repositories[{index}]"
+            entry = FleetEntry(str(name), "", error=f"Invalid manifest entry: {error}")
+        else:
+            entry = FleetEntry(**values)
+        entry.to_version = entry.to_version or ""
+        entry.filename = str(path.parent / entry.filename)
+        entry.clone_dir = str(path.parent / entry.clone_dir)
+        entries.append(entry)
+    return entries
+
+
+def _validate(values: dict[str, Any]) -> str | None:
+    """Check the keys of one repository of the manifest.
+
+    :param values: The values of the repository, with the defaults
+    :return: The error, or None if the entry is valid
+    """
+    if not values:
+        return "not a mapping"
+    known = {item.name for item in fields(FleetEntry)} - {"error"}
+    missing = sorted(name for name in ("repository", "since_version") if not values.get(name))
+    if missing:
+        return f"missing {', '.join(missing)}"
+    unknown = sorted(set(values) - known)
+    if unknown:
+        return f"unknown keys {', '.join(unknown)}"
+    return None
+
+
+def _run_entry(
+    entry: FleetEntry,
+    build: Callable[[FleetEntry], ChangelogCIBase],
+) -> FleetResult:
+    """Run antsichaut for one repository.
+
+    :param entry: The repository
+    :param build: Builds the ChangelogCIBase of an entry
+    :return: The result, errors and failed requests are reported instead of raised
+    """
+    result = FleetResult(entry.repository, entry.filename)
+    if entry.error:
+        result.error = entry.error
+        return result
+    start = time.perf_counter()
+    with named_run(entry.repository) as failures:
+        try:
+            result.pull_requests = build(entry).run()
+        except Exception as exc:  # noqa: BLE001 pylint: disable=broad-exception-caught
+            # one failing repository does not abort the others
+            failures.append(f"{type(exc).__name__}: {exc}")
+    # a failed release or search request is reported, the run goes on without it
+    result.error = "; ".join(failures) or None
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run_fleet(
+    entries: Sequence[FleetEntry],
+    build: Callable[[FleetEntry], ChangelogCIBase],
+    workers: int = 4,
+) -> list[FleetResult]:
+    """Run antsichaut for many repositories on a bounded pool.
+
+    :param entries: The repositories
+    :param build: Builds the ChangelogCIBase of an entry
+    :param workers: The number of repositories processed at the same time
+    :return: The result of every entry, in the order of the entries
+    """
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        return list(executor.map(lambda entry: _run_entry(entry, build), entries))
+
+
+def format_results(results: Sequence[FleetResult]) -> str:
+    """Summarize the results, one line per repository.
+
+    :param results: The results of the fleet
+    :return: The summary
+    """
+    lines = []
+    for result in results:
+        outcome = f"{result.pull_requests} pull requests" if result.ok else result.error
+        lines.append(f"{result.repository} ({result.filename}): {outcome} [{result.seconds:.1f}s]")
+    failed = sum(not result.ok for result in results)
+    lines.append(f"{len(results) - failed} succeeded, {failed} failed")
+    return "\n".join(lines)
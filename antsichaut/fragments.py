@@ -0,0 +1,101 @@
+"""Write one changelog fragment per pull request."""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from antsichaut.changelog import changelog_yaml
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# Fragments named after a PR number, e.g. 12.yml or 12-fix-parser.yaml
+FRAGMENT_NAME = re.compile(r"^(\d+)(?:[-_.][^/]*)?\.ya?ml$")
+
+
+def existing_numbers(directory: Path) -> set[int]:
+    """Find the PRs that already have a fragment.
+
+    Only the file names are looked at, no fragment is parsed.
+
+    :param directory: The fragments directory
+    :return: The PR numbers
+    """
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return set()
+    numbers = set()
+    for entry in entries:
+        match = FRAGMENT_NAME.match(entry.name)
+        if match:
+            numbers.add(int(match.group(1)))
+    return numbers
+
+
+def render_fragment(section: str, line: str) -> str:
+    """Render the fragment of one PR.
+
+    :param section: The changelog section of the PR
+    :param line: The changelog line of the PR
+    :return: The content of the fragment
+    """
+    stream = io.StringIO()
+    changelog_yaml().dump({section: [line]}, stream)
+    return stream.getvalue()
+
+
+def write_fragment(directory: Path, number: int, content: str) -> Path:
+    """Write a fragment atomically.
+
+    The fragment is written to a temporary file first, so concurrent runs
+    and readers never see a partial fragment.
+
+    :param directory: The fragments directory
+    :param number: The PR number
+    :param content: The content of the fragment
+    :return: The path of the fragment
+    """
+    path = directory / f"{number}.yml"
+    with tempfile.NamedTemporaryFile(
+        "w",
+        encoding="utf-8",
+        dir=directory,
+        suffix=".tmp",
+        delete=False,
+    ) as file:
+        file.write(content)
+    Path(file.name).replace(path)
+    return path
+
+
+def write_fragments(
+    directory: Path,
+    entries: Iterable[tuple[int, str, str]],
+    workers: int = 4,
+) -> list[Path]:
+    """Write the fragments of the PRs that do not have one yet.
+
+    :param directory: The fragments directory
+    :param entries: The number, section and changelog line of every PR
+    :param workers: The number of fragments written at the same time
+    :return: The paths of the written fragments
+    """
+    existing = existing_numbers(directory)
+    new = [(number, section, line) for number, section, line in entries if number not in existing]
+    if not new:
+        return []
+    directory.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        return list(
+            executor.map(
+                lambda entry: write_fragment(directory, entry[0], render_fragment(*entry[1:])),
+                new,
+            ),
+        )
@@ -0,0 +1,274 @@
+"""A shared HTTP client for the GitHub API."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Callable
+
+from antsichaut.ratelimit import TokenPool, resource_of
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import requests
+
+    from antsichaut.cache import ResponseCache
+
+# Status codes worth retrying, GitHub answers 403 or 429 when rate limited
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RATE_LIMIT_STATUSES = frozenset({403, 429})
+
+
+@dataclass
+class RequestStats:
+    """Counters for the requests made during one run."""
+
+    requests: int = 0
+    retries: int = 0
+    rate_limit_waits: int = 0
+    wait_seconds: float = 0.0
+    cache_hits: int = 0
+    bytes_received: int = 0
+    rate_limit_remaining: int | None = None
+
+
+class GitHubClient:
+    """Pooled HTTP session with rate-limit-aware retries.
+
+    Requests are spread over all tokens by the rate limit each has left for
+    the API resource, so several tokens add up their budgets.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(  # noqa: PLR0913
+        self,
+        token: str | None = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        pool_size: int = 10,
+        timeout: float = 10,
+        sleep: Callable[[float], None] = time.sleep,
+        cache: ResponseCache | None = None,
+        reserve: int = 0,
+        tokens: Sequence[str] = (),
+    ) -> None:
+        """Initialize the client.
+
+        :param token: The token to access GitHub
+        :param retries: How often a failed request is retried
+        :param backoff: The base delay in seconds between retries
+        :param pool_size: The number of connections kept alive
+        :param timeout: The timeout in seconds for one request
+        :param sleep: The function used to wait
+        :param cache: The cache for responses, if any
+        :param reserve: The part of the rate limit left unused, requests wait
+            for the reset once only this many are remaining
+        :param tokens: More tokens to spread the requests over
+        """
+        # pylint: disable=too-many-arguments
+        self.token = token or next(iter(tokens), None)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats = RequestStats()
+        self.cache = cache
+        self.reserve = reserve
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.pool = TokenPool([self.token, *tokens], reserve)
+
+        # requests is only imported once a client is needed, not for --version
+        # pylint: disable=import-outside-toplevel
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Get headers for GitHub API request.
+
+        :return: The constructed headers
+        """
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        # if the user adds `GITHUB_TOKEN` add it to API Request
+        # required for `private` repositories
+        if self.token:
+            headers.update(_authorization(self.token))
+
+        return headers
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request.
+
+        Cached responses are revalidated with a conditional request.
+
+        :param url: The URL to request
+        :param kwargs: Additional arguments for the request
+        :return: The response
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached:
+            kwargs["headers"] = {**kwargs.get("headers", {}), **cached.validators}
+
+        response = self.request("GET", url, **kwargs)
+
+        if cached and response.status_code == HTTPStatus.NOT_MODIFIED:
+            self._count_cache_hit()
+            return cached.to_response()
+        if self.cache and response.status_code == HTTPStatus.OK:
+            self.cache.put(url, response)
+        return response
+
+    def _count_cache_hit(self) -> None:
+        """Count a response served from the cache."""
+        with self._lock:
+            self.stats.cache_hits += 1
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request.
+
+        :param url: The URL to request
+        :param kwargs: Additional arguments for the request
+        :return: The response
+        """
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request, retrying transient failures.
+
+        :param method: The HTTP method
+        :param url: The URL to request
+        :param kwargs: Additional arguments for the request
+        :return: The response
+        """
+        # pylint: disable=import-outside-toplevel
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+        resource = resource_of(url)
+        attempt = 0
+        while True:
+            token = self._acquire(resource)
+            try:
+                response = self.session.request(method, url, **self._authorize(token, kwargs))
+            except (requests.ConnectionError, requests.Timeout):
+                self.pool.release(token, resource, {}, limited=False, now=time.time())
+                if attempt >= self.retries:
+                    raise
+                self._retry(attempt)
+                attempt += 1
+                continue
+
+            with self._lock:
+                self.stats.requests += 1
+                self.stats.bytes_received += len(response.content)
+            limited = self._check_rate_limit(response, token, resource)
+            if attempt >= self.retries or not (limited or self._is_transient(response)):
+                return response
+            if not limited:
+                self._retry(attempt)
+            attempt += 1
+
+    @staticmethod
+    def _is_transient(response: requests.Response) -> bool:
+        """Check whether a failed response is worth retrying.
+
+        :param response: The response
+        :return: Whether the request should be retried
+        """
+        return response.status_code in RETRY_STATUSES
+
+    def _authorize(self, token: str | None, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Send a request with the token picked for it.
+
+        :param token: The token
+        :param kwargs: The arguments for the request
+        :return: The arguments with the authorization header
+        """
+        # the session sends the primary token already
+        if token is None or token == self.token:
+            return kwargs
+        return {**kwargs, "headers": {**kwargs.get("headers", {}), **_authorization(token)}}
+
+    def _check_rate_limit(
+        self,
+        response: requests.Response,
+        token: str | None,
+        resource: str,
+    ) -> bool:
+        """Read the rate limit headers of a response.
+
+        Remembers when the rate limit of the token resets, so following
+        requests use another token or wait instead of failing.
+
+        :param response: The response
+        :param token: The token the request was sent with
+        :param resource: The rate limit resource of the request
+        :return: Whether the request was rejected by the rate limit
+        """
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        retry_after = response.headers.get("Retry-After")
+        limited = response.status_code in RATE_LIMIT_STATUSES and bool(
+            retry_after or remaining == "0",
+        )
+        if remaining is not None:
+            with self._lock:
+                self.stats.rate_limit_remaining = int(remaining)
+        self.pool.release(token, resource, response.headers, limited=limited, now=time.time())
+        return limited
+
+    def _acquire(self, resource: str) -> str | None:
+        """Pick the token with the most headroom for a request.
+
+        If the budget of every token is used up, the request waits until
+        the first one resets. The budgets are shared by all threads using
+        the client.
+
+        :param resource: The rate limit resource of the request
+        :return: The token
+        """
+        token, delay = self.pool.acquire(resource, time.time())
+        if delay > 0:
+            self._wait(delay)
+        return token
+
+    def _wait(self, seconds: float) -> None:
+        """Wait for a rate limit to reset.
+
+        :param seconds: The seconds to wait
+        """
+        with self._lock:
+            self.stats.rate_limit_waits += 1
+            self.stats.wait_seconds += seconds
+        self._sleep(seconds)
+
+    def _retry(self, attempt: int) -> None:
+        """Wait with jittered exponential backoff before a retry.
+
+        :param attempt: The number of the failed attempt
+        """
+        # full jitter spreads out retries of concurrent requests
+        delay = random.uniform(0, self.backoff * 2**attempt)  # noqa: S311
+        with self._lock:
+            self.stats.retries += 1
+            self.stats.wait_seconds += delay
+        self._sleep(delay)
+
+
+def _authorization(token: str) -> dict[str, str]:
+    """Build the authorization header of a token.
+
+    :param token: The token
+    :return: The header
+    """
+    return {"authorization": f"Bearer {token}"}
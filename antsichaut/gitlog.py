@@ -0,0 +1,127 @@
+"""Find the merged pull requests of a release range in a local clone."""
+
+from __future__ import annotations
+
+import re
+import subprocess
+from typing import TYPE_CHECKING
+
+from antsichaut.graphql import pull_request_item
+from antsichaut.messages import report
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from antsichaut.graphql import GraphQLBackend
+    from antsichaut.models import PullRequest
+
+# The subject of a squash merge ends with the PR number, e.g. "Fix it (#12)"
+SQUASH_SUBJECT = re.compile(r"\(#(\d+)\)$")
+# The subject of a merge commit starts with the PR number
+MERGE_SUBJECT = re.compile(r"^Merge pull request #(\d+)\b")
+
+
+def pull_request_numbers(subjects: Iterable[str]) -> list[int]:
+    """Extract the PR numbers from commit subjects.
+
+    :param subjects: The commit subjects, oldest first
+    :return: The PR numbers without duplicates, oldest first
+    """
+    numbers: dict[int, None] = {}
+    for subject in subjects:
+        match = MERGE_SUBJECT.search(subject) or SQUASH_SUBJECT.search(subject.rstrip())
+        if match:
+            numbers[int(match.group(1))] = None
+    return list(numbers)
+
+
+def _git(git_dir: str, *args: str) -> str | None:
+    """Run a git command.
+
+    :param git_dir: The directory of the clone
+    :param args: The arguments of the git command
+    :return: The output, or None if the command failed
+    """
+    try:
+        result = subprocess.run(  # noqa: S603
+            ["git", "-C", git_dir, *args],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError as exc:
+        report(f"Could not run git: {exc}", failure=True)
+        return None
+    if result.returncode:
+        report(f"git {' '.join(args)} failed: {result.stderr.strip()}", failure=True)
+        return None
+    return result.stdout
+
+
+def commit_subjects(git_dir: str, since_version: str, to_version: str) -> list[str] | None:
+    """List the subjects of the commits between two tags.
+
+    :param git_dir: The directory of the clone
+    :param since_version: The tag to list commits since, or latest
+    :param to_version: The tag to list commits to, optional
+    :return: The subjects, oldest first, or None if git failed
+    """
+    if since_version == "latest":
+        latest = _git(git_dir, "describe", "--tags", "--abbrev=0")
+        if latest is None:
+            return None
+        since_version = latest.strip()
+    output = _git(
+        git_dir,
+        "log",
+        "--reverse",
+        "--format=%s",
+        f"{since_version}..{to_version or 'HEAD'}",
+    )
+    return None if output is None else output.splitlines()
+
+
+class GitBackend:
+    """Fetch the merged PRs of a release range from a local clone.
+
+    The commit history between the tags names the PRs, so no release or
+    search request is needed: the PRs are looked up by number with one
+    GraphQL query per 100 PRs. PRs merged without a merge commit or a
+    squash subject, e.g. rebase merges, cannot be found this way.
+    """
+
+    def __init__(self, graphql: GraphQLBackend, git_dir: str = ".") -> None:
+        """Initialize the backend.
+
+        :param graphql: The GraphQL backend to look up the PRs with
+        :param git_dir: The directory of the clone
+        """
+        self.graphql = graphql
+        self.git_dir = git_dir
+
+    def get_changes(
+        self,
+        since_version: str,
+        to_version: str,
+        updated_since: str = "",
+    ) -> list[PullRequest]:
+        """Get all pull requests merged between two tags.
+
+        :param since_version: The tag to fetch PRs since, or latest
+        :param to_version: The tag to fetch PRs to, optional
+        :param updated_since: Only fetch PRs updated since this date, optional
+        :return: The list of pull requests
+        """
+        subjects = commit_subjects(self.git_dir, since_version, to_version)
+        if subjects is None:
+            return []
+        nodes = self.graphql.get_pull_requests(pull_request_numbers(subjects))
+        merged = [
+            node
+            for node in nodes
+            if node["mergedAt"] is not None and node["updatedAt"] >= updated_since
+        ]
+        merged.sort(key=lambda node: (node["mergedAt"], node["number"]))
+        if not merged:
+            report("No pull request found")
+        return [pull_request_item(node) for node in merged]
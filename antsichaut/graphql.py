@@ -0,0 +1,232 @@
+"""Fetch releases and merged pull requests with the GitHub GraphQL API."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from antsichaut.messages import report
+from antsichaut.models import PullRequest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from antsichaut.github import GitHubClient
+
+PULL_REQUEST_NODE = """
+number
+title
+url
+mergedAt
+updatedAt
+author { login }
+labels(first: 100) { nodes { name } }
+"""
+
+PULL_REQUEST_FIELDS = f"""
+pageInfo {{ hasNextPage endCursor }}
+nodes {{ {PULL_REQUEST_NODE} }}
+"""
+
+PULL_REQUESTS = f"""
+pullRequests(
+  states: MERGED
+  first: 100
+  after: $cursor
+  orderBy: {{field: UPDATED_AT, direction: DESC}}
+) {{ {PULL_REQUEST_FIELDS} }}
+"""
+
+# The release dates and the first page of pull requests in one round trip
+RELEASES_AND_PULL_REQUESTS = f"""
+query(
+  $owner: String!
+  $name: String!
+  $since: String!
+  $to: String!
+  $latest: Boolean!
+  $withTo: Boolean!
+  $cursor: String
+) {{
+  repository(owner: $owner, name: $name) {{
+    since: release(tagName: $since) @skip(if: $latest) {{ publishedAt }}
+    latestRelease @include(if: $latest) {{ publishedAt }}
+    to: release(tagName: $to) @include(if: $withTo) {{ publishedAt }}
+    {PULL_REQUESTS}
+  }}
+}}
+"""
+
+MORE_PULL_REQUESTS = f"""
+query($owner: String!, $name: String!, $cursor: String) {{
+  repository(owner: $owner, name: $name) {{ {PULL_REQUESTS} }}
+}}
+"""
+
+# The number of pull requests looked up by number in one query
+PULL_REQUESTS_PER_QUERY = 100
+
+
+def pull_requests_by_number(numbers: Iterable[int]) -> str:
+    """Build a query for many pull requests, one alias per number.
+
+    :param numbers: The numbers of the pull requests
+    :return: The query
+    """
+    fields = "\n".join(
+        f"pr{number}: pullRequest(number: {number}) {{ {PULL_REQUEST_NODE} }}" for number in numbers
+    )
+    return f"""
+query($owner: String!, $name: String!) {{
+  repository(owner: $owner, name: $name) {{ {fields} }}
+}}
+"""
+
+
+class GraphQLBackend:
+    """Fetch merged pull requests between two releases with GraphQL.
+
+    Merged pull requests are listed by their last update, newest first.
+    A pull request is never updated before it is merged, so the listing
+    can stop at the first page that reaches back before the start of the
+    release window.
+    """
+
+    def __init__(self, client: GitHubClient, api_url: str, repository: str) -> None:
+        """Initialize the backend.
+
+        :param client: The client to send the queries with
+        :param api_url: The URL of the GitHub API
+        :param repository: The repository in the form of owner/repo-name
+        """
+        self.client = client
+        self.url = f"{api_url}/graphql"
+        self.repository = repository
+
+    def _query(
+        self,
+        query: str,
+        variables: dict[str, Any],
+        partial: bool = False,
+    ) -> dict[str, Any] | None:
+        """Run one query.
+
+        :param query: The query
+        :param variables: The variables of the query
+        :param partial: Accept the data of a query with errors, e.g. numbers
+            that are no pull requests
+        :return: The repository data, or None if the query failed
+        """
+        owner, _, name = self.repository.partition("/")
+        response = self.client.post(
+            self.url,
+            json={"query": query, "variables": {"owner": owner, "name": name, **variables}},
+        )
+        errors = response.json().get("errors") if response.ok else None
+        data = response.json().get("data") if response.ok else None
+        if not response.ok or data is None or (errors and not partial):
+            msg = (
+                f"Could not get pull requests for "
+                f"{self.repository} from GitHub GraphQL API. "
+                f"response status code: {response.status_code}"
+            )
+            report(msg, failure=True)
+            return None
+        repository: dict[str, Any] = data["repository"]
+        return repository
+
+    def get_changes(
+        self,
+        since_version: str,
+        to_version: str,
+        updated_since: str = "",
+    ) -> list[PullRequest]:
+        """Get all pull requests merged between two releases.
+
+        :param since_version: The version to fetch PRs since, or latest
+        :param to_version: The version to fetch PRs to, optional
+        :param updated_since: Only fetch PRs updated since this date, optional
+        :return: The list of pull requests
+        """
+        latest = since_version == "latest"
+        repository = self._query(
+            RELEASES_AND_PULL_REQUESTS,
+            {
+                "since": since_version,
+                "to": to_version or "",
+                "latest": latest,
+                "withTo": bool(to_version),
+                "cursor": None,
+            },
+        )
+        if repository is None:
+            return []
+
+        since_release = repository.get("latestRelease" if latest else "since")
+        if not since_release:
+            report(f"Could not find any release id for {self.repository}", failure=True)
+            return []
+        since_date = since_release["publishedAt"]
+        to_date = (repository.get("to") or {}).get("publishedAt", "") if to_version else ""
+        if to_version and not to_date:
+            report(f"Could not find any release id for {self.repository}", failure=True)
+            return []
+
+        oldest_update = max(since_date, updated_since)
+        nodes = []
+        pull_requests = repository["pullRequests"]
+        while True:
+            nodes.extend(pull_requests["nodes"])
+            page_info = pull_requests["pageInfo"]
+            reached_start = nodes and nodes[-1]["updatedAt"] < oldest_update
+            if reached_start or not page_info["hasNextPage"]:
+                break
+            repository = self._query(MORE_PULL_REQUESTS, {"cursor": page_info["endCursor"]})
+            if repository is None:
+                break
+            pull_requests = repository["pullRequests"]
+
+        merged = [
+            node
+            for node in nodes
+            if node["mergedAt"] >= since_date
+            and (not to_date or node["mergedAt"] <= to_date)
+            and node["updatedAt"] >= updated_since
+        ]
+        merged.sort(key=lambda node: (node["mergedAt"], node["number"]))
+        if not merged:
+            report("No pull request found")
+        return [pull_request_item(node) for node in merged]
+
+    def get_pull_requests(self, numbers: Sequence[int]) -> list[dict[str, Any]]:
+        """Look up pull requests by number.
+
+        Numbers that do not belong to a pull request, e.g. issues, are
+        skipped.
+
+        :param numbers: The numbers of the pull requests
+        :return: The nodes of the pull requests that exist
+        """
+        nodes: list[dict[str, Any]] = []
+        for start in range(0, len(numbers), PULL_REQUESTS_PER_QUERY):
+            chunk = numbers[start : start + PULL_REQUESTS_PER_QUERY]
+            repository = self._query(pull_requests_by_number(chunk), {}, partial=True)
+            if repository is None:
+                continue
+            nodes.extend(node for node in repository.values() if node)
+        return nodes
+
+
+def pull_request_item(node: dict[str, Any]) -> PullRequest:
+    """Convert a pull request node to the fields antsichaut uses.
+
+    :param node: The pull request node
+    :return: The pull request
+    """
+    return PullRequest(
+        number=node["number"],
+        title=node["title"],
+        url=node["url"],
+        labels=(label["name"] for label in node["labels"]["nodes"]),
+        merged_at=node["mergedAt"],
+        author=(node["author"] or {}).get("login"),
+    )
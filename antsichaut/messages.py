@@ -0,0 +1,47 @@
+"""Print the messages of a run, named by repository when several run at once."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# the repository of the current fleet run and the failures reported for it
+_RUN: ContextVar[tuple[str, list[str]] | None] = ContextVar("run", default=None)
+
+
+def report(message: str, failure: bool = False) -> None:
+    """Print a message of the current run.
+
+    :param message: The message
+    :param failure: Whether the run failed, e.g. a release or search request
+    """
+    run = _RUN.get()
+    if run is None:
+        print(message)
+        return
+    repository, failures = run
+    if failure:
+        failures.append(message)
+    print(f"{repository}: {message}")
+
+
+@contextmanager
+def named_run(repository: str) -> Iterator[list[str]]:
+    """Name the repository on the messages reported in the context.
+
+    The context variable is set in the thread of the run and copied into
+    the tasks of its event loop, so concurrent runs do not mix.
+
+    :param repository: The repository in the form of owner/repo-name
+    :return: The failures reported in the context
+    """
+    failures: list[str] = []
+    token = _RUN.set((repository, failures))
+    try:
+        yield failures
+    finally:
+        _RUN.reset(token)
@@ -0,0 +1,127 @@
+"""A compact record for the pull requests of a run."""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+# The fields of a pull request, in the order of the dict representation
+FIELDS = ("title", "number", "url", "labels", "merged_at", "author")
+
+
+class PullRequest:
+    """One pull request with the fields antsichaut uses.
+
+    Label names and authors repeat across many pull requests, so they are
+    interned and shared. The changelog line is rendered once, the label
+    bitmask is computed once by the classifier. Read access by key, e.g.
+    ``pull_request["number"]``, works as for the dicts used before.
+    """
+
+    __slots__ = ("_line", "author", "label_mask", "labels", "merged_at", "number", "title", "url")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        number: int | str,
+        title: str,
+        url: str,
+        labels: Iterable[str] = (),
+        merged_at: str | None = None,
+        author: str | None = None,
+    ) -> None:
+        """Initialize the pull request.
+
+        :param number: The number of the pull request
+        :param title: The title
+        :param url: The URL of the pull request page
+        :param labels: The label names
+        :param merged_at: The merge timestamp, optional
+        :param author: The login of the author, optional
+        """
+        # pylint: disable=too-many-arguments
+        self.number = int(number)
+        self.title = title
+        self.url = url
+        self.labels = tuple(sys.intern(label) for label in labels)
+        self.merged_at = merged_at
+        self.author = sys.intern(author) if author else author
+        # set by the classifier, the bits of the sections the labels match
+        self.label_mask: int | None = None
+        self._line: str | None = None
+
+    @classmethod
+    def coerce(cls, value: PullRequest | Mapping[str, Any]) -> PullRequest:
+        """Accept a pull request or its dict representation.
+
+        :param value: The pull request or a mapping with its fields
+        :return: The pull request
+        """
+        if isinstance(value, PullRequest):
+            return value
+        return cls(
+            number=value["number"],
+            title=value["title"],
+            url=value["url"],
+            labels=value.get("labels", ()),
+            merged_at=value.get("merged_at"),
+            author=value.get("author"),
+        )
+
+    @property
+    def line(self) -> str:
+        """Get the changelog line of the pull request.
+
+        :return: The line, rendered on first use
+        """
+        if self._line is None:
+            self._line = f"{self.title} ({self.url})"
+        return self._line
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the pull request to its dict representation.
+
+        :return: The fields of the pull request
+        """
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __getitem__(self, key: str) -> Any:
+        """Get a field by name.
+
+        :param key: The name of the field
+        :return: The value of the field
+        :raises KeyError: If there is no such field
+        """
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field by name, with a default.
+
+        :param key: The name of the field
+        :param default: The value if there is no such field
+        :return: The value of the field or the default
+        """
+        return self[key] if key in FIELDS else default
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the fields of two pull requests.
+
+        :param other: The other object
+        :return: Whether both have the same fields
+        """
+        if not isinstance(other, PullRequest):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Show the number and title.
+
+        :return: The representation
+        """
+        return f"PullRequest(number={self.number}, title={self.title!r})"
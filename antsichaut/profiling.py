@@ -0,0 +1,110 @@
+"""Per-phase timing and HTTP metrics of a run."""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from antsichaut.github import RequestStats
+
+
+@dataclass
+class PhaseMetrics:
+    """The measurements of one phase."""
+
+    name: str
+    seconds: float
+    requests: int
+    bytes_received: int
+    cache_hits: int
+    rate_limit_waits: int
+    rate_limit_remaining: int | None
+
+
+class Profiler:
+    """Record wall time and HTTP metrics for the phases of a run."""
+
+    def __init__(self, stats: RequestStats) -> None:
+        """Initialize the profiler.
+
+        :param stats: The counters of the HTTP client
+        """
+        self.stats = stats
+        self.phases: list[PhaseMetrics] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure one phase.
+
+        :param name: The name of the phase
+        :yield: Nothing, the phase runs in the context
+        """
+        before = replace(self.stats)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                PhaseMetrics(
+                    name=name,
+                    seconds=time.perf_counter() - start,
+                    requests=self.stats.requests - before.requests,
+                    bytes_received=self.stats.bytes_received - before.bytes_received,
+                    cache_hits=self.stats.cache_hits - before.cache_hits,
+                    rate_limit_waits=self.stats.rate_limit_waits - before.rate_limit_waits,
+                    rate_limit_remaining=self.stats.rate_limit_remaining,
+                ),
+            )
+
+    def to_dict(self) -> dict[str, object]:
+        """Summarize the run.
+
+        :return: The phases and the totals of the HTTP client
+        """
+        return {
+            "phases": [asdict(phase) for phase in self.phases],
+            "total_seconds": sum(phase.seconds for phase in self.phases),
+            "http": asdict(self.stats),
+        }
+
+    def write_json(self, path: Path) -> None:
+        """Write the summary as JSON.
+
+        :param path: The path of the JSON file
+        """
+        with path.open("w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+            file.write("\n")
+
+    def table(self) -> str:
+        """Format the summary as a table.
+
+        :return: The table
+        """
+        header = ("phase", "seconds", "requests", "bytes", "cache hits", "waits", "remaining")
+        rows = [
+            (
+                phase.name,
+                f"{phase.seconds:.3f}",
+                str(phase.requests),
+                str(phase.bytes_received),
+                str(phase.cache_hits),
+                str(phase.rate_limit_waits),
+                "-" if phase.rate_limit_remaining is None else str(phase.rate_limit_remaining),
+            )
+            for phase in self.phases
+        ]
+        total = sum(phase.seconds for phase in self.phases)
+        rows.append(("total", f"{total:.3f}", str(self.stats.requests), "", "", "", ""))
+        widths = [max(len(row[i]) for row in (header, *rows)) for i in range(len(header))]
+        return "\n".join(
+            "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+            for row in (header, *rows)
+        )
@@ -0,0 +1,130 @@
+"""Spread requests over several tokens by their remaining rate limit."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+# The documented hourly limits, assumed until a response reports the real one
+DEFAULT_LIMITS = {"core": 5000, "search": 30, "graphql": 5000}
+
+
+def resource_of(url: str) -> str:
+    """Guess the rate limit resource of a request before it is sent.
+
+    :param url: The URL of the request
+    :return: The resource, core, search or graphql
+    """
+    path = url.split("?", 1)[0]
+    if "/search/" in path:
+        return "search"
+    if path.endswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+@dataclass
+class Budget:
+    """The rate limit of one token for one resource."""
+
+    remaining: int | None = None
+    reset_at: float = 0.0
+    in_flight: int = 0
+
+
+class TokenPool:
+    """Track the rate limit of every token per API resource.
+
+    Each request goes to the token with the most requests left for its
+    resource, requests already in flight are counted against the token.
+    If every token is used up, the request waits for the earliest reset.
+    """
+
+    def __init__(self, tokens: Sequence[str | None], reserve: int = 0) -> None:
+        """Initialize the pool.
+
+        :param tokens: The tokens, None for anonymous requests
+        :param reserve: The part of the rate limit left unused
+        """
+        self.tokens = list(dict.fromkeys(tokens)) or [None]
+        self.reserve = reserve
+        self._budgets: dict[tuple[str | None, str], Budget] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, token: str | None, resource: str) -> Budget:
+        """Get the budget of a token for a resource.
+
+        :param token: The token
+        :param resource: The resource
+        :return: The budget
+        """
+        return self._budgets.setdefault((token, resource), Budget())
+
+    def _headroom(self, token: str | None, resource: str, now: float) -> tuple[int, float]:
+        """Rank a token for a request.
+
+        :param token: The token
+        :param resource: The resource
+        :param now: The current time
+        :return: A key that is larger for tokens with more headroom
+        """
+        budget = self.budget(token, resource)
+        if budget.reset_at > now:
+            # used up, the token that resets first ranks highest
+            return 0, -budget.reset_at
+        if budget.reset_at:
+            budget.remaining, budget.reset_at = None, 0.0
+        remaining = budget.remaining
+        if remaining is None:
+            remaining = DEFAULT_LIMITS.get(resource, DEFAULT_LIMITS["core"])
+        return 1, remaining - budget.in_flight
+
+    def acquire(self, resource: str, now: float) -> tuple[str | None, float]:
+        """Pick the token for a request.
+
+        :param resource: The resource of the request
+        :param now: The current time
+        :return: The token and the seconds to wait before sending the request
+        """
+        with self._lock:
+            token = max(self.tokens, key=lambda token: self._headroom(token, resource, now))
+            budget = self.budget(token, resource)
+            budget.in_flight += 1
+            return token, max(budget.reset_at - now, 0.0)
+
+    def release(
+        self,
+        token: str | None,
+        resource: str,
+        headers: Mapping[str, str],
+        limited: bool,
+        now: float,
+    ) -> None:
+        """Record the rate limit headers of a response.
+
+        :param token: The token the request was sent with
+        :param resource: The resource the request was acquired for
+        :param headers: The response headers, empty if the request failed
+        :param limited: Whether the request was rejected by the rate limit
+        :param now: The current time
+        """
+        # pylint: disable=too-many-arguments
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        with self._lock:
+            self.budget(token, resource).in_flight -= 1
+            budget = self.budget(token, headers.get("X-RateLimit-Resource", resource))
+            if remaining is not None:
+                budget.remaining = int(remaining)
+            if remaining is not None and int(remaining) <= self.reserve and reset:
+                # allow for clock skew between GitHub and this machine
+                budget.reset_at = max(budget.reset_at, float(reset) + 1)
+            elif limited and retry_after:
+                budget.reset_at = max(budget.reset_at, now + float(retry_after))
+            elif not limited and remaining is not None:
+                budget.reset_at = 0.0
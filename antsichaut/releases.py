@@ -0,0 +1,193 @@
+"""An index of the published releases of a repository."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+
+from antsichaut.aio import AsyncEngine
+from antsichaut.messages import report
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    import requests
+
+    from antsichaut.github import GitHubClient
+
+
+@dataclass(frozen=True)
+class Release:
+    """A published release."""
+
+    tag: str
+    id: int
+    published_at: str
+    prerelease: bool = False
+
+
+class ReleaseIndex:
+    """Look up releases by tag and publication date in memory."""
+
+    def __init__(self, releases: Iterable[Release]) -> None:
+        """Initialize the index.
+
+        :param releases: The published releases
+        """
+        self.releases = sorted(releases, key=lambda release: release.published_at)
+        self.dates = [release.published_at for release in self.releases]
+        self._by_tag = {release.tag: release for release in self.releases}
+
+    @classmethod
+    def fetch(cls, client: GitHubClient, api_url: str, repository: str) -> ReleaseIndex:
+        """Build the index from the paginated list of releases.
+
+        :param client: The client to send the requests with
+        :param api_url: The URL of the GitHub API
+        :param repository: The repository in the form of owner/repo-name
+        :return: The release index
+        """
+        engine = AsyncEngine(client)
+        return engine.run(lambda: cls.fetch_async(engine, api_url, repository))
+
+    @classmethod
+    async def fetch_async(
+        cls,
+        engine: AsyncEngine,
+        api_url: str,
+        repository: str,
+    ) -> ReleaseIndex:
+        """Build the index from the paginated list of releases.
+
+        If the first page links the last one, all other pages are requested
+        concurrently, otherwise the ``next`` links are followed. Drafts are
+        not published and therefore skipped.
+
+        :param engine: The engine to send the requests with
+        :param api_url: The URL of the GitHub API
+        :param repository: The repository in the form of owner/repo-name
+        :return: The release index
+        """
+        url = f"{api_url}/repos/{repository}/releases?per_page=100"
+        responses = [await engine.get(url)]
+        last = responses[0].links.get("last", {}).get("url") if responses[0].ok else None
+        if last:
+            count = int(parse_qs(urlsplit(last).query).get("page", ["1"])[0])
+            responses.extend(
+                await engine.get_all(f"{url}&page={page}" for page in range(2, count + 1)),
+            )
+        else:
+            while responses[-1].ok and "next" in responses[-1].links:
+                responses.append(await engine.get(responses[-1].links["next"]["url"]))
+        return cls(cls._parse(responses, repository))
+
+    @staticmethod
+    def _parse(responses: Iterable[requests.Response], repository: str) -> list[Release]:
+        """Read the published releases from the pages of the list.
+
+        :param responses: The pages of the list
+        :param repository: The repository in the form of owner/repo-name
+        :return: The published releases
+        """
+        releases: list[Release] = []
+        for response in responses:
+            if not response.ok:
+                msg = (
+                    f"Could not list the releases of "
+                    f"{repository}, status code: {response.status_code}"
+                )
+                report(msg, failure=True)
+                break
+            releases.extend(
+                Release(
+                    tag=release["tag_name"],
+                    id=release["id"],
+                    published_at=release["published_at"],
+                    prerelease=release.get("prerelease", False),
+                )
+                for release in response.json()
+                if release.get("published_at") and not release.get("draft", False)
+            )
+        return releases
+
+    def __len__(self) -> int:
+        """Return the number of releases.
+
+        :return: The number of releases
+        """
+        return len(self.releases)
+
+    def get(self, tag: str) -> Release | None:
+        """Find a release by its tag.
+
+        :param tag: The tag of the release
+        :return: The release, or None if there is no such release
+        """
+        return self._by_tag.get(tag)
+
+    @property
+    def latest(self) -> Release | None:
+        """Find the latest release, like the GitHub API does.
+
+        :return: The most recently published release that is not a prerelease
+        """
+        for release in reversed(self.releases):
+            if not release.prerelease:
+                return release
+        return None
+
+    def previous(self, tag: str) -> Release | None:
+        """Find the release published before another one.
+
+        :param tag: The tag of the release
+        :return: The previous release, or None if there is none
+        """
+        release = self.get(tag)
+        if release is None:
+            return None
+        position = self.releases.index(release)
+        return self.releases[position - 1] if position else None
+
+    def between(self, start: str, end: str) -> list[Release]:
+        """Find the releases published in a range of dates.
+
+        :param start: The start of the range, inclusive
+        :param end: The end of the range, inclusive
+        :return: The releases in order of publication
+        """
+        low = bisect.bisect_left(self.dates, start)
+        high = bisect.bisect_right(self.dates, end)
+        return self.releases[low:high]
+
+
+class ReleaseWindows:
+    """Assign merge dates to the release published next after them."""
+
+    def __init__(self, bounds: Sequence[tuple[str, str]], unreleased: str | None = None) -> None:
+        """Initialize the windows.
+
+        :param bounds: The publication dates and versions of the releases in
+            order of publication, the first release only opens the first window
+        :param unreleased: The version of changes merged after the last
+            release, optional
+        """
+        self.dates = [published_at for published_at, _version in bounds]
+        self.versions = [version for _published_at, version in bounds]
+        self.unreleased = unreleased
+
+    def release_of(self, merged_at: str) -> str | None:
+        """Find the release of a change.
+
+        A change merged at the publication date of a release is part of it.
+
+        :param merged_at: The merge date of the change
+        :return: The version, or None if the change is outside all windows
+        """
+        position = bisect.bisect_left(self.dates, merged_at)
+        if position == 0:
+            return None
+        if position == len(self.dates):
+            return self.unreleased
+        return self.versions[position]
@@ -0,0 +1,163 @@
+"""Assign pull requests to changelog sections."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any
+
+from antsichaut.models import PullRequest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+SKIP_SECTION = "skip_changelog"
+TRIVIAL_SECTION = "trivial"
+# The bit of a label mask set by skip labels, section bits follow it
+SKIP_BIT = 1
+
+
+class Classifier:
+    """A rule engine built once from the group config.
+
+    Every section of the group config may define ``labels``, a list of
+    ``title_patterns`` (regular expressions) and a list of ``authors``.
+    A pull request matching a rule of the ``skip_changelog`` section is
+    skipped. Otherwise it goes to the first section in the group config
+    with a matching rule, or to the trivial section if no rule matches.
+    """
+
+    def __init__(self, group_config: Sequence[Mapping[str, Any]]) -> None:
+        """Compile the rules of the group config.
+
+        :param group_config: The sections with their rules
+        """
+        self.sections: list[str] = []
+        self.skip_labels: frozenset[str] = frozenset()
+        self._skip_authors: frozenset[str] = frozenset()
+        self._skip_title: re.Pattern[str] | None = None
+        # inverted indexes to the position of the first matching section,
+        # labels map to a bitmask with one bit per section
+        self._labels: dict[str, int] = {}
+        self._masks: dict[tuple[str, ...], int] = {}
+        self._authors: dict[str, int] = {}
+        self._titles: list[tuple[int, re.Pattern[str]]] = []
+
+        for config in group_config:
+            title_pattern = self._compile(config.get("title_patterns", ()))
+            if config["title"] == SKIP_SECTION:
+                self.skip_labels = frozenset(config.get("labels", ()))
+                for label in self.skip_labels:
+                    self._labels[label] = self._labels.get(label, 0) | SKIP_BIT
+                self._skip_authors = frozenset(config.get("authors", ()))
+                self._skip_title = title_pattern
+                continue
+            position = len(self.sections)
+            self.sections.append(config["title"])
+            for label in config.get("labels", ()):
+                self._labels[label] = self._labels.get(label, 0) | 1 << (position + 1)
+            for author in config.get("authors", ()):
+                self._authors.setdefault(author, position)
+            if title_pattern:
+                self._titles.append((position, title_pattern))
+
+    @staticmethod
+    def _compile(patterns: Iterable[str]) -> re.Pattern[str] | None:
+        """Combine title patterns into one regular expression.
+
+        :param patterns: The regular expressions
+        :return: The combined regular expression, or None without patterns
+        """
+        patterns = list(patterns)
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+    def label_mask(self, labels: Iterable[str]) -> int:
+        """Get the bitmask of the sections a combination of labels matches.
+
+        Bit 0 is set by skip labels, bit ``n + 1`` by the labels of the
+        section at position ``n``. The masks are cached per combination.
+
+        :param labels: The label names
+        :return: The bitmask
+        """
+        labels = tuple(labels)
+        mask = self._masks.get(labels)
+        if mask is None:
+            mask = 0
+            for label in labels:
+                mask |= self._labels.get(label, 0)
+            self._masks[labels] = mask
+        return mask
+
+    def _fields(self, pull_request: PullRequest | Mapping[str, Any]) -> tuple[int, str, Any]:
+        """Get the fields the rules look at.
+
+        The label mask of a PullRequest is computed once and kept on it.
+
+        :param pull_request: The pull request
+        :return: The label mask, the title and the author
+        """
+        if isinstance(pull_request, PullRequest):
+            if pull_request.label_mask is None:
+                pull_request.label_mask = self.label_mask(pull_request.labels)
+            return pull_request.label_mask, pull_request.title, pull_request.author
+        mask = self.label_mask(pull_request["labels"])
+        return mask, pull_request["title"], pull_request.get("author")
+
+    def is_skipped(self, pull_request: PullRequest | Mapping[str, Any]) -> bool:
+        """Check whether a pull request is left out of the changelog.
+
+        :param pull_request: The pull request
+        :return: Whether the pull request matches a skip rule
+        """
+        mask, title, author = self._fields(pull_request)
+        return self._is_skipped(mask, title, author)
+
+    def _is_skipped(self, mask: int, title: str, author: Any) -> bool:
+        """Check the skip rules.
+
+        :param mask: The label mask
+        :param title: The title
+        :param author: The author
+        :return: Whether a skip rule matches
+        """
+        if mask & SKIP_BIT or author in self._skip_authors:
+            return True
+        return bool(self._skip_title and self._skip_title.search(title))
+
+    def section(self, pull_request: PullRequest | Mapping[str, Any]) -> str | None:
+        """Find the section of one pull request.
+
+        :param pull_request: The pull request
+        :return: The section, or None if the pull request is skipped
+        """
+        mask, title, author = self._fields(pull_request)
+        if self._is_skipped(mask, title, author):
+            return None
+        mask &= ~SKIP_BIT
+        if author in self._authors:
+            mask |= 1 << (self._authors[author] + 1)
+        lowest = mask & -mask
+        # the title patterns are in section order, the first match is the lowest
+        for position, pattern in self._titles:
+            bit = 1 << (position + 1)
+            if lowest and bit > lowest:
+                break
+            if pattern.search(title):
+                mask |= bit
+                break
+        if not mask:
+            return TRIVIAL_SECTION
+        return self.sections[(mask & -mask).bit_length() - 2]
+
+    def classify(
+        self,
+        pull_requests: Iterable[PullRequest | Mapping[str, Any]],
+    ) -> list[str | None]:
+        """Find the sections of a batch of pull requests.
+
+        :param pull_requests: The pull requests
+        :return: The section of every pull request, None for skipped ones
+        """
+        return [self.section(pull_request) for pull_request in pull_requests]
@@ -0,0 +1,71 @@
+"""The state persisted between incremental runs."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+
+    from antsichaut.models import PullRequest
+
+STATE_FILENAME = ".antsichaut-state.json"
+
+
+@dataclass
+class Watermark:
+    """The newest merged pull request recorded for a release window."""
+
+    repository: str
+    since_version: str
+    to_version: str
+    merged_at: str
+    number: int
+
+    @classmethod
+    def load(cls, path: Path) -> Watermark | None:
+        """Load the watermark from a state file.
+
+        :param path: The path of the state file
+        :return: The watermark, or None if there is no valid state file
+        """
+        try:
+            with path.open(encoding="utf-8") as file:
+                return cls(**json.load(file))
+        except (OSError, TypeError, ValueError):
+            return None
+
+    def save(self, path: Path) -> None:
+        """Save the watermark to a state file.
+
+        :param path: The path of the state file
+        """
+        with path.open("w", encoding="utf-8") as file:
+            json.dump(asdict(self), file, indent=2)
+            file.write("\n")
+
+    def matches(self, repository: str, since_version: str, to_version: str) -> bool:
+        """Check whether the watermark belongs to a release window.
+
+        :param repository: The repository
+        :param since_version: The version to fetch PRs since
+        :param to_version: The version to fetch PRs to
+        :return: Whether the watermark can be used for the window
+        """
+        return (self.repository, self.since_version, self.to_version) == (
+            repository,
+            since_version,
+            to_version,
+        )
+
+    def advance(self, changes: Iterable[PullRequest | Mapping[str, Any]]) -> None:
+        """Move the watermark to the newest merged pull request.
+
+        :param changes: The pull requests processed in this run
+        """
+        for change in changes:
+            merged = (change.get("merged_at") or "", int(change["number"]))
+            self.merged_at, self.number = max((self.merged_at, self.number), merged)
@@ -0,0 +1,188 @@
+"""Measure how antsichaut scales with the size of the changelog.
+
+The benchmark generates a synthetic ``changelog.yaml`` and serves the
+releases and merged pull requests from a local stand-in for the GitHub API.
+Every phase of a run is timed separately and its peak memory recorded.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.bench --releases 200 --entries 50 --pulls 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from antsichaut.antsichaut import ChangelogCIBase
+from tests.fake_github import FakeGitHub
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+LABELS = ("bug", "enhancement", "major", "deprecated", "documentation")
+GROUP_CONFIG = [
+    {"title": "major_changes", "labels": ["major", "breaking"]},
+    {"title": "minor_changes", "labels": ["minor", "enhancement"]},
+    {"title": "breaking_changes", "labels": ["major", "breaking"]},
+    {"title": "deprecated_features", "labels": ["deprecated"]},
+    {"title": "removed_features", "labels": ["removed"]},
+    {"title": "security_fixes", "labels": ["security"]},
+    {"title": "bugfixes", "labels": ["bug", "bugfix"]},
+    {"title": "skip_changelog", "labels": ["skip_changelog"]},
+]
+
+
+def _timestamp(minutes: int) -> str:
+    """Build a timestamp some minutes after the start of the history.
+
+    :param minutes: The minutes after the start
+    :return: The timestamp
+    """
+    return (START + timedelta(minutes=minutes)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def generate_changelog(path: Path, repository: str, releases: int, entries: int) -> None:
+    """Write a synthetic changelog.yaml.
+
+    :param path: The path of the changelog
+    :param repository: The repository the PRs belong to
+    :param releases: The number of releases
+    :param entries: The number of entries per release
+    """
+    # in the layout antsichaut writes, so runs take the splice path
+    lines = ["---", "ancestor:", "releases:"]
+    number = 0
+    for release in range(releases):
+        lines.extend((f"  1.{release}.0:", "    changes:"))
+        for section in ("bugfixes", "minor_changes", "trivial"):
+            lines.append(f"      {section}:")
+            count = entries // 3 or 1
+            # sorted by PR number like antsichaut writes them
+            for offset in range(count, 0, -1):
+                url = f"https://github.com/{repository}/pull/{number + offset}"
+                lines.append(f"        - Change number {number + offset} ({url})")
+            number += count
+        lines.append(f"    release_date: '{_timestamp(release * 60)[:10]}'")
+    # the release the run fills in
+    lines.extend((f"  1.{releases}.0:", "    release_date: '2030-01-01'"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def serve(fake_github: FakeGitHub, pulls: int, first_pull: int) -> None:
+    """Add the releases and merged pull requests of the run to the fake API.
+
+    :param fake_github: The fake API
+    :param pulls: The number of pull requests merged since the last release
+    :param first_pull: The number of the first pull request
+    """
+    fake_github.rate_limit = fake_github.rate_limit_remaining = 10**9
+    fake_github.add_release("1.0.0", _timestamp(0))
+    for offset in range(pulls):
+        number = first_pull + offset
+        labels = (LABELS[number % len(LABELS)],)
+        fake_github.add_pull(number, f"Change number {number}", _timestamp(offset + 1), labels)
+
+
+def measure(phase: Callable[[], Any]) -> tuple[Any, dict[str, float]]:
+    """Run one phase and measure it.
+
+    :param phase: The phase to run
+    :return: The result of the phase and its measurements
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = phase()
+    seconds = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"seconds": seconds, "peak_bytes": peak}
+
+
+def run(releases: int, entries: int, pulls: int, max_workers: int = 4) -> dict[str, Any]:
+    """Run all phases against a synthetic changelog.
+
+    :param releases: The number of releases in the changelog
+    :param entries: The number of entries per release
+    :param pulls: The number of pull requests merged since the last release
+    :param max_workers: The number of concurrent requests
+    :return: The results of the benchmark
+    """
+    fake_github = FakeGitHub()
+    fake_github.start()
+    cwd = Path.cwd()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            changelog = Path(directory) / "changelogs/changelog.yaml"
+            generate_changelog(changelog, fake_github.repository, releases, entries)
+            serve(fake_github, pulls, first_pull=releases * entries + 1)
+            ccb = ChangelogCIBase(
+                fake_github.repository,
+                "1.0.0",
+                "",
+                GROUP_CONFIG,
+                filename=str(changelog),
+                max_workers=max_workers,
+            )
+            ccb.github_api_url = fake_github.url
+
+            phases = {}
+            changes, phases["get_changes_after_last_release"] = measure(
+                ccb.get_changes_after_last_release,
+            )
+            ccb._string_data, phases["parse_changelog"] = measure(  # noqa: SLF001
+                lambda: ccb.parse_changelog(changes),
+            )
+            _, phases["_sort_by_pr"] = measure(ccb._sort_by_pr)  # noqa: SLF001
+            _, phases["_write_changelog"] = measure(ccb._write_changelog)  # noqa: SLF001
+            size = changelog.stat().st_size
+    finally:
+        os.chdir(cwd)
+        fake_github.stop()
+
+    return {
+        "parameters": {
+            "releases": releases,
+            "entries": entries,
+            "pulls": pulls,
+            "max_workers": max_workers,
+        },
+        "changelog_bytes": size,
+        "fetched_pulls": len(changes),
+        "requests": ccb.client.stats.requests,
+        "phases": phases,
+        "python": platform.python_version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main() -> None:
+    """Run the benchmark and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--releases", type=int, default=100, help="releases in the changelog")
+    parser.add_argument("--entries", type=int, default=30, help="entries per release")
+    parser.add_argument("--pulls", type=int, default=300, help="PRs since the last release")
+    parser.add_argument("--max_workers", type=int, default=4, help="concurrent requests")
+    parser.add_argument("--output", type=Path, help="the JSON file to write the results to")
+    args = parser.parse_args()
+
+    results = run(args.releases, args.entries, args.pulls, args.max_workers)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Shared fixtures for the tests."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tests.fake_github import FakeGitHub
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture(name="fake_github")
+def fixture_fake_github() -> Iterator[FakeGitHub]:
+    """Provide a running local stand-in for the GitHub API.
+
+    :yield: The fake API
+    """
+    fake = FakeGitHub()
+    fake.start()
+    yield fake
+    fake.stop()
@@ -0,0 +1,414 @@
+"""A minimal local stand-in for the GitHub API."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+SEARCH_RESULT_LIMIT = 1000
+RATE_LIMITED = {"message": "API rate limit exceeded"}
+
+
+def _in_range(value: str, qualifier: str) -> bool:
+    """Check a timestamp against a search range qualifier.
+
+    :param value: The timestamp to check
+    :param qualifier: The qualifier, e.g. ``>=start`` or ``start..end``
+    :return: Whether the timestamp is in the range
+    """
+    if qualifier.startswith(">="):
+        return value >= qualifier[2:]
+    if qualifier.startswith(">"):
+        return value > qualifier[1:]
+    start, _, end = qualifier.partition("..")
+    return start <= value <= end
+
+
+class FakeGitHub:
+    """Serve releases and merged pull requests like the GitHub API."""
+
+    def __init__(self, repository: str = "owner/repo") -> None:
+        """Initialize the fake API.
+
+        :param repository: The repository served by the fake API
+        """
+        self.repository = repository
+        self.releases: list[dict[str, Any]] = []
+        self.pulls: list[dict[str, Any]] = []
+        self.requests: list[str] = []
+        # responses returned before any real answer, as (status, headers)
+        self.failures: list[tuple[int, dict[str, str]]] = []
+        self.not_modified = 0
+        # the remaining requests reported in the rate limit headers
+        self.rate_limit = 5000
+        self.rate_limit_remaining = self.rate_limit
+        # limits enforced per token and resource, e.g. {"search": 30}
+        self.limits: dict[str, int] = {}
+        self.used: dict[tuple[str, str], int] = {}
+        self.limited = 0
+        self.reset_at = int(time.time()) + 3600
+        self._server: ThreadingHTTPServer | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the running server.
+
+        :return: The base URL
+        """
+        assert self._server
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def add_release(self, tag: str, published_at: str) -> dict[str, Any]:
+        """Add a published release.
+
+        :param tag: The tag name of the release
+        :param published_at: The date the release was published
+        :return: The release
+        """
+        release = {"id": len(self.releases) + 1, "tag_name": tag, "published_at": published_at}
+        self.releases.append(release)
+        return release
+
+    def add_pull(
+        self,
+        number: int,
+        title: str,
+        merged_at: str,
+        labels: tuple[str, ...] = (),
+        author: str = "octocat",
+    ) -> dict[str, Any]:
+        """Add a merged pull request.
+
+        :param number: The number of the pull request
+        :param title: The title of the pull request
+        :param merged_at: The date the pull request was merged
+        :param labels: The labels of the pull request
+        :param author: The login of the author
+        :return: The pull request
+        """
+        # pylint: disable=too-many-arguments
+        pull = {
+            "number": number,
+            "title": title,
+            "html_url": f"https://github.com/{self.repository}/pull/{number}",
+            "labels": [{"name": label} for label in labels],
+            "user": {"login": author},
+            "body": "",
+            "merged_at": merged_at,
+            "updated_at": merged_at,
+            "pull_request": {"merged_at": merged_at},
+        }
+        self.pulls.append(pull)
+        return pull
+
+    def start(self) -> str:
+        """Start serving on a free local port.
+
+        :return: The base URL of the server
+        """
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Dispatch requests to the fake API."""
+
+            def do_GET(self) -> None:
+                """Handle a GET request."""
+                fake.handle(self)
+
+            def do_POST(self) -> None:
+                """Handle a POST request."""
+                fake.handle_graphql(self)
+
+            def log_message(self, *args: Any) -> None:
+                """Do not log requests.
+
+                :param args: The log arguments
+                """
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_limits(self) -> None:
+        """Start a new rate limit window for all tokens."""
+        with self._lock:
+            self.used.clear()
+            self.reset_at = int(time.time()) + 3600
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> None:
+        """Answer one request.
+
+        :param handler: The request handler
+        """
+        with self._lock:
+            self.requests.append(handler.path)
+            failure = self.failures.pop(0) if self.failures else None
+        if failure:
+            self.respond(handler, failure[0], {"message": "failure"}, failure[1])
+            return
+        parts = urlsplit(handler.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        prefix = f"/repos/{self.repository}/releases"
+        status, body = 404, {"message": "Not Found"}
+        headers: dict[str, str] = {}
+        if parts.path == "/search/issues":
+            status, body, headers = self.search(parts.path, query)
+        elif parts.path == prefix:
+            status, body, headers = self.list_releases(parts.path, query)
+        elif parts.path.startswith(f"{prefix}/tags/"):
+            tag = parts.path[len(f"{prefix}/tags/") :]
+            status, body = self.release(lambda r: r["tag_name"] == tag)
+        elif parts.path == f"{prefix}/latest":
+            status, body = self.release(lambda r: r is self.releases[-1])
+        elif parts.path.startswith(f"{prefix}/"):
+            release_id = parts.path[len(f"{prefix}/") :]
+            status, body = self.release(lambda r: str(r["id"]) == release_id)
+        self.respond(handler, status, body, headers)
+
+    def handle_graphql(self, handler: BaseHTTPRequestHandler) -> None:
+        """Answer one GraphQL query.
+
+        Only the fields antsichaut asks for are resolved, the pull requests
+        are listed newest update first with the offset as cursor.
+
+        :param handler: The request handler
+        """
+        length = int(handler.headers.get("Content-Length", 0))
+        request = json.loads(handler.rfile.read(length))
+        query, variables = request["query"], request["variables"]
+        with self._lock:
+            self.requests.append(f"{handler.path} {query.split('(')[0].strip()}")
+            failure = self.failures.pop(0) if self.failures else None
+        if failure:
+            self.respond(handler, failure[0], {"message": "failure"}, failure[1])
+            return
+        repository: dict[str, Any] = {}
+
+        def published(tag: str) -> dict[str, str] | None:
+            for release in self.releases:
+                if release["tag_name"] == tag:
+                    return {"publishedAt": release["published_at"]}
+            return None
+
+        if "since: release" in query:
+            if variables["latest"]:
+                repository["latestRelease"] = {"publishedAt": self.releases[-1]["published_at"]}
+            else:
+                repository["since"] = published(variables["since"])
+            if variables["withTo"]:
+                repository["to"] = published(variables["to"])
+        if "pullRequests" in query:
+            pulls = sorted(self.pulls, key=lambda p: p["updated_at"], reverse=True)
+            offset = int(variables.get("cursor") or 0)
+            page = pulls[offset : offset + 100]
+            repository["pullRequests"] = {
+                "pageInfo": {
+                    "hasNextPage": offset + 100 < len(pulls),
+                    "endCursor": str(offset + 100),
+                },
+                "nodes": [_node(p) for p in page],
+            }
+        errors = self.resolve_aliases(query, repository)
+        body: dict[str, Any] = {"data": {"repository": repository}}
+        if errors:
+            body["errors"] = errors
+        self.respond(handler, HTTPStatus.OK, body, {})
+
+    def resolve_aliases(self, query: str, repository: dict[str, Any]) -> list[dict[str, Any]]:
+        """Resolve the pull requests a query looks up by number.
+
+        :param query: The query
+        :param repository: The repository data to add the pull requests to
+        :return: The errors for numbers that are no pull requests
+        """
+        errors = []
+        pulls_by_number = {p["number"]: p for p in self.pulls}
+        for alias, number in re.findall(r"(\w+): pullRequest\(number: (\d+)\)", query):
+            pull = pulls_by_number.get(int(number))
+            repository[alias] = _node(pull) if pull else None
+            if not pull:
+                errors.append({"type": "NOT_FOUND", "path": ["repository", alias]})
+        return errors
+
+    def respond(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        body: Any,
+        headers: dict[str, str],
+    ) -> None:
+        """Write a JSON response.
+
+        :param handler: The request handler
+        :param status: The status code
+        :param body: The JSON body
+        :param headers: Additional headers
+        """
+        payload = json.dumps(body).encode()
+        etag = f'"{hashlib.sha256(payload).hexdigest()}"'
+        if status == HTTPStatus.OK and handler.headers.get("If-None-Match") == etag:
+            with self._lock:
+                self.not_modified += 1
+            handler.send_response(HTTPStatus.NOT_MODIFIED)
+            handler.send_header("ETag", etag)
+            handler.end_headers()
+            return
+        resource = _resource(handler.path)
+        with self._lock:
+            if resource in self.limits:
+                limit, remaining = self.charge(handler, resource)
+                if remaining < 0:
+                    self.limited += 1
+                    status, body, remaining = HTTPStatus.FORBIDDEN, RATE_LIMITED, 0
+                    payload, headers = json.dumps(body).encode(), {}
+            else:
+                self.rate_limit_remaining = max(self.rate_limit_remaining - 1, 0)
+                limit, remaining = self.rate_limit, self.rate_limit_remaining
+        headers = {
+            "ETag": etag,
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(self.reset_at),
+            "X-RateLimit-Resource": resource,
+            "Content-Type": "application/json",
+            "Content-Length": str(len(payload)),
+            **headers,
+        }
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def charge(self, handler: BaseHTTPRequestHandler, resource: str) -> tuple[int, int]:
+        """Count a request against the limit of its token.
+
+        :param handler: The request handler
+        :param resource: The rate limit resource of the request
+        :return: The limit and the remaining requests, negative if exceeded
+        """
+        key = (handler.headers.get("Authorization", ""), resource)
+        limit = self.limits[resource]
+        if self.used.get(key, 0) >= limit:
+            return limit, -1
+        self.used[key] = self.used.get(key, 0) + 1
+        return limit, limit - self.used[key]
+
+    def release(self, match: Any) -> tuple[int, Any]:
+        """Find a release.
+
+        :param match: A predicate selecting the release
+        :return: The status code and body
+        """
+        for release in self.releases:
+            if match(release):
+                return 200, release
+        return 404, {"message": "Not Found"}
+
+    def list_releases(
+        self,
+        path: str,
+        query: dict[str, str],
+    ) -> tuple[int, Any, dict[str, str]]:
+        """List the releases, newest first.
+
+        :param path: The request path
+        :param query: The query parameters
+        :return: The status code, body and headers
+        """
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        releases = self.releases[::-1]
+        last = max(1, -(-len(releases) // per_page))
+        headers = {}
+        if page < last:
+            next_page = self.link(path, query, page + 1, "next")
+            headers["Link"] = f"{next_page}, {self.link(path, query, last, 'last')}"
+        return 200, releases[(page - 1) * per_page : page * per_page], headers
+
+    def search(self, path: str, query: dict[str, str]) -> tuple[int, Any, dict[str, str]]:
+        """Search merged pull requests.
+
+        :param path: The request path
+        :param query: The query parameters
+        :return: The status code, body and headers
+        """
+        terms = query.get("q", "").split()
+        pulls = self.pulls
+        for term in terms:
+            key, _, value = term.partition(":")
+            if key in ("merged", "updated"):
+                pulls = [p for p in pulls if _in_range(p[f"{key}_at"], value)]
+        pulls = sorted(pulls, key=lambda p: (p["merged_at"], p["number"]))
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        if (page - 1) * per_page >= SEARCH_RESULT_LIMIT:
+            message = "Only the first 1000 search results are available"
+            return 422, {"message": message}, {}
+        reachable = min(len(pulls), SEARCH_RESULT_LIMIT)
+        last = max(1, -(-reachable // per_page))
+        items = pulls[(page - 1) * per_page : page * per_page]
+        links = []
+        if page < last:
+            links.append(self.link(path, query, page + 1, "next"))
+            links.append(self.link(path, query, last, "last"))
+        headers = {"Link": ", ".join(links)} if links else {}
+        body = {"total_count": len(pulls), "incomplete_results": False, "items": items}
+        return 200, body, headers
+
+    def link(self, path: str, query: dict[str, str], page: int, rel: str) -> str:
+        """Build one entry of a Link header.
+
+        :param path: The request path
+        :param query: The query parameters
+        :param page: The page to link to
+        :param rel: The relation of the link
+        :return: The Link header entry
+        """
+        target = urlencode({**query, "page": page})
+        return f'<{self.url}{path}?{target}>; rel="{rel}"'
+
+
+def _resource(path: str) -> str:
+    """Get the rate limit resource of a request.
+
+    :param path: The request path
+    :return: The resource
+    """
+    if path.startswith("/search/"):
+        return "search"
+    if path.startswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+def _node(pull: dict[str, Any]) -> dict[str, Any]:
+    """Convert a pull request to a GraphQL node.
+
+    :param pull: The pull request as returned by the REST API
+    :return: The node
+    """
+    return {
+        "number": pull["number"],
+        "title": pull["title"],
+        "url": pull["html_url"],
+        "mergedAt": pull["merged_at"],
+        "updatedAt": pull["updated_at"],
+        "author": {"login": pull["user"]["login"]},
+        "labels": {"nodes": pull["labels"]},
+    }
@@ -0,0 +1,119 @@
+"""Tests for the asyncio fetch engine and the streaming search pipeline."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, cast
+
+import pytest
+
+from antsichaut.aio import AsyncEngine
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.github import GitHubClient
+from antsichaut.models import PullRequest
+from antsichaut.releases import ReleaseIndex
+
+if TYPE_CHECKING:
+    from tests.fake_github import FakeGitHub
+
+
+class _SlowClient:
+    """A client that records how many requests are in flight."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get(self, url: str) -> Any:
+        """Answer a request after a short delay.
+
+        :param url: The URL to request
+        :return: The URL
+        """
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        return url
+
+
+def test_limit() -> None:
+    """Ensure requests run concurrently up to the limit, results in order."""
+    client = _SlowClient()
+    engine = AsyncEngine(client, limit=3)  # type: ignore[arg-type]
+    urls = [f"/page/{page}" for page in range(10)]
+
+    responses = engine.run(lambda: engine.get_all(urls))
+
+    # the fake client answers with the URL instead of a response
+    assert cast("list[Any]", responses) == urls
+    expected_in_flight = 3
+    assert client.max_in_flight == expected_in_flight
+    with pytest.raises(RuntimeError):
+        engine.run(lambda: _outside(engine))
+
+
+async def _outside(engine: AsyncEngine) -> None:
+    """Await a request of another engine that is not running.
+
+    :param engine: The engine
+    """
+    await AsyncEngine(engine.client).get("/")
+
+
+def test_release_pages(fake_github: FakeGitHub) -> None:
+    """Ensure the pages of the release list are requested together.
+
+    :param fake_github: The fake API
+    """
+    count = 250
+    for number in range(count):
+        published_at = f"2023-01-01T00:{number // 60:02}:{number % 60:02}Z"
+        fake_github.add_release(f"1.{number}.0", published_at)
+    client = GitHubClient()
+
+    index = ReleaseIndex.fetch(client, fake_github.url, fake_github.repository)
+
+    assert len(index) == count
+    pages = [r for r in fake_github.requests if "/releases" in r]
+    expected_pages = 3
+    assert len(pages) == expected_pages
+    assert any("page=3" in page for page in pages)
+
+
+def test_stream_pages(fake_github: FakeGitHub, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Ensure search pages are classified before the last page is requested.
+
+    :param fake_github: The fake API
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    count = 250
+    for number in range(1, count + 1):
+        merged_at = f"2023-01-02T00:{number // 60:02}:{number % 60:02}Z"
+        fake_github.add_pull(number, f"Change {number}", merged_at, ("skip_changelog",))
+    group_config = [{"title": "skip_changelog", "labels": ["skip_changelog"]}]
+    ccb = ChangelogCIBase(fake_github.repository, "1.0.0", "", group_config, max_workers=1)
+    ccb.github_api_url = fake_github.url
+    requested_at_classify = []
+    classify = ccb.classifier.classify
+
+    def record(pull_requests: list[dict[str, Any]]) -> list[str | None]:
+        requested_at_classify.append(sum("page=3" in r for r in fake_github.requests))
+        return classify(pull_requests)
+
+    monkeypatch.setattr(ccb.classifier, "classify", record)
+
+    changes = ccb.get_changes_after_last_release()
+
+    assert [change["number"] for change in changes] == list(range(1, count + 1))
+    assert isinstance(changes[0], PullRequest)
+    assert requested_at_classify[0] == 0
+    expected_pages = 3
+    assert len(requested_at_classify) == expected_pages
+    assert ccb._section(changes[0]) is None
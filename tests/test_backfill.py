@@ -0,0 +1,88 @@
+"""Tests for filling the changes of many releases in one run."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from ruamel.yaml import YAML
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.releases import ReleaseWindows
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tests.fake_github import FakeGitHub
+
+CHANGELOG = """\
+releases:
+  1.0.0:
+    release_date: '2023-01-01'
+  1.1.0:
+    changes:
+      bugfixes:
+        - Change 1 (https://github.com/owner/repo/pull/1)
+    release_date: '2023-02-01'
+  1.2.0:
+    release_date: '2023-03-01'
+  1.3.0:
+    release_date: '2023-04-01'
+"""
+
+
+def test_release_windows() -> None:
+    """Ensure merge dates are assigned to the next release."""
+    windows = ReleaseWindows(
+        [("2023-01-01", "1.0.0"), ("2023-02-01", "1.1.0"), ("2023-03-01", "1.2.0")],
+        unreleased="1.3.0",
+    )
+
+    assert windows.release_of("2022-12-31") is None
+    assert windows.release_of("2023-01-15") == "1.1.0"
+    assert windows.release_of("2023-02-01") == "1.1.0"
+    assert windows.release_of("2023-02-02") == "1.2.0"
+    assert windows.release_of("2023-03-02") == "1.3.0"
+
+
+def test_backfill(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure one run fills every release of the range.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "changelogs").mkdir()
+    changelog = tmp_path / "changelogs/changelog.yaml"
+    changelog.write_text(CHANGELOG)
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_release("1.1.0", "2023-02-01T00:00:00Z")
+    # a release that is not in the changelog does not open a window
+    fake_github.add_release("1.2.0-rc1", "2023-02-15T00:00:00Z")
+    fake_github.add_release("1.2.0", "2023-03-01T00:00:00Z")
+    fake_github.add_pull(1, "Change 1", "2023-01-15T00:00:00Z", ("bug",))
+    fake_github.add_pull(2, "Change 2", "2023-02-01T00:00:00Z")
+    fake_github.add_pull(3, "Change 3", "2023-02-10T00:00:00Z")
+    fake_github.add_pull(4, "Change 4", "2023-02-20T00:00:00Z", ("bug",))
+    fake_github.add_pull(5, "Change 5", "2023-03-05T00:00:00Z")
+    group_config = [{"title": "bugfixes", "labels": ["bug"]}]
+    ccb = ChangelogCIBase(fake_github.repository, "1.0.0", "", group_config, backfill=True)
+    ccb.github_api_url = fake_github.url
+
+    expected_count = 5
+    assert ccb.run() == expected_count
+
+    releases = YAML().load(changelog)["releases"]
+    line = "Change {0} (https://github.com/owner/repo/pull/{0})".format
+    assert "changes" not in releases["1.0.0"]
+    assert releases["1.1.0"]["changes"] == {"bugfixes": [line(1)], "trivial": [line(2)]}
+    assert releases["1.2.0"]["changes"] == {"bugfixes": [line(4)], "trivial": [line(3)]}
+    assert releases["1.3.0"]["changes"] == {"trivial": [line(5)]}
+    assert sum("/search" in r for r in fake_github.requests) == 1
+    assert sum("/releases" in r for r in fake_github.requests) == 1
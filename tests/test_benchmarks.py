@@ -0,0 +1,20 @@
+"""Smoke test for the benchmark suite."""
+
+from __future__ import annotations
+
+from benchmarks.bench import run
+
+
+def test_benchmark_phases() -> None:
+    """Ensure every phase is measured on a small synthetic changelog."""
+    results = run(releases=3, entries=3, pulls=10)
+
+    assert set(results["phases"]) == {
+        "get_changes_after_last_release",
+        "parse_changelog",
+        "_sort_by_pr",
+        "_write_changelog",
+    }
+    assert all(phase["seconds"] >= 0 for phase in results["phases"].values())
+    expected_pulls = 10
+    assert results["fetched_pulls"] == expected_pulls
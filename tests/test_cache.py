@@ -0,0 +1,102 @@
+"""Tests for the on-disk response cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from antsichaut.cache import ResponseCache
+from antsichaut.github import GitHubClient
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import pytest
+
+    from tests.fake_github import FakeGitHub
+
+
+def test_release_list(fake_github: FakeGitHub, tmp_path: Path) -> None:
+    """Ensure cached pages of the release list are revalidated, not trusted.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    url = f"{fake_github.url}/repos/owner/repo/releases?per_page=100"
+
+    first = GitHubClient(cache=ResponseCache(tmp_path)).get(url)
+    client = GitHubClient(cache=ResponseCache(tmp_path))
+    second = client.get(url)
+    fake_github.add_release("1.1.0", "2023-02-01T00:00:00Z")
+    third = client.get(url)
+
+    assert second.json() == first.json()
+    assert fake_github.not_modified == 1
+    assert [release["tag_name"] for release in third.json()] == ["1.1.0", "1.0.0"]
+    assert client.stats.cache_hits == 1
+
+
+def test_revalidate(fake_github: FakeGitHub, tmp_path: Path) -> None:
+    """Ensure mutable responses are revalidated with their ETag.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    fake_github.add_pull(1, "Change 1", "2023-01-02T00:00:00Z")
+    url = f"{fake_github.url}/search/issues?q=repo:owner/repo&per_page=100"
+    client = GitHubClient(cache=ResponseCache(tmp_path))
+
+    first = client.get(url)
+    second = client.get(url)
+    fake_github.add_pull(2, "Change 2", "2023-01-03T00:00:00Z")
+    third = client.get(url)
+
+    assert second.json() == first.json()
+    assert fake_github.not_modified == 1
+    expected_count = 2
+    assert third.json()["total_count"] == expected_count
+    assert client.stats.cache_hits == 1
+
+
+def test_eviction(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure the least recently used entries are evicted first.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    for number in range(3):
+        fake_github.add_release(f"1.0.{number}", "2023-01-01T00:00:00Z")
+    index = tmp_path / "changelog-0123456789abcdef.json"
+    index.write_text("{}" * 1000)
+    cache = ResponseCache(tmp_path)
+    client = GitHubClient(cache=cache)
+    urls = [f"{fake_github.url}/repos/owner/repo/releases/{i}" for i in range(1, 4)]
+    patterns = []
+    glob = Path.glob
+
+    def listing(path: Path, pattern: str, *args: Any, **kwargs: Any) -> Iterator[Path]:
+        patterns.append(pattern)
+        return glob(path, pattern, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "glob", listing)
+
+    client.get(urls[0])
+    entry_size = sum(p.stat().st_size for p in tmp_path.iterdir() if p.name.startswith("response-"))
+    cache.max_size = entry_size * 2
+    client.get(urls[1])
+    client.get(urls[0])
+    client.get(urls[2])
+
+    assert cache.get(urls[0])
+    assert not cache.get(urls[1])
+    assert cache.get(urls[2])
+    # other files in the directory are neither counted nor evicted
+    assert index.exists()
+    # the directory is listed once, not on every write
+    assert patterns == ["response-*.json"]
@@ -0,0 +1,381 @@
+"""Tests for the indexes over changelog.yaml."""
+
+from __future__ import annotations
+
+import io
+from typing import TYPE_CHECKING
+
+import pytest
+from ruamel.yaml import YAML
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.changelog import ChangelogLayout, ChangesIndex, PullRequestIndex, normalize
+from antsichaut.github import GitHubClient
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fake_github import FakeGitHub
+
+
+def _line(number: int, title: str = "") -> str:
+    """Build a changelog line.
+
+    :param number: The PR number
+    :param title: The title, defaults to one derived from the number
+    :return: The changelog line
+    """
+    return f"{title or f'Change {number}'} (https://github.com/owner/repo/pull/{number})"
+
+
+def test_changes_index() -> None:
+    """Ensure duplicates, retitled and moved PRs are handled by the index."""
+    changes = {
+        "bugfixes": [_line(1), _line(12)],
+        "trivial": [_line(2), _line(3), _line(12)],
+    }
+    index = ChangesIndex(changes)
+    assert changes["bugfixes"] == [_line(12), _line(1)]
+
+    assert not index.add("bugfixes", _line(1), 1)
+    index.remove_outdated(2, _line(2, "Retitled"))
+    assert index.add("trivial", _line(2, "Retitled"), 2)
+    assert index.add("minor_changes", _line(3), 3)
+    assert not index.add("trivial", _line(12), 12)
+    index.discard(4)
+    assert index.add("trivial", _line(5), 5)
+    assert index.add("trivial", "No PR", 0)
+
+    assert changes == {
+        "bugfixes": [_line(1)],
+        "trivial": [_line(12), _line(5), _line(2, "Retitled"), "No PR"],
+        "minor_changes": [_line(3)],
+    }
+    moved, missing = 3, 4
+    assert moved in index
+    assert missing not in index
+
+
+def test_pull_request_index(tmp_path: Path) -> None:
+    """Ensure PRs are indexed under their oldest release and saved compactly.
+
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    data = {
+        "releases": {
+            "1.1.0": {"changes": {"trivial": [_line(3), _line(2)]}},
+            "1.0.10": {"changes": {"bugfixes": [_line(2)], "trivial": None}},
+            "1.0.9": {"release_date": "2023-01-01"},
+        },
+    }
+    index = PullRequestIndex.from_data(data)
+    index.save(tmp_path / "index.json", "digest")
+    loaded = PullRequestIndex.load(tmp_path / "index.json", "digest")
+
+    assert loaded
+    for current in (index, loaded):
+        assert current.release_of(2) == "1.0.10"
+        assert current.release_of(3) == "1.1.0"
+        assert current.release_of(1) is None
+    assert PullRequestIndex.load(tmp_path / "missing.json", "digest") is None
+    assert PullRequestIndex.load(tmp_path / "index.json", "changed") is None
+
+
+def test_skip_recorded_prs(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure PRs recorded under an older release are not added again.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "changelogs").mkdir()
+    changelog = tmp_path / "changelogs/changelog.yaml"
+    old_line = _line(1)
+    changelog.write_text(
+        f"releases:\n  1.0.0:\n    changes:\n      trivial:\n        - {old_line}\n"
+        "  1.1.0:\n    release_date: '2023-02-01'\n",
+    )
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(1, "Change 1", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(2, "Change 2", "2023-01-02T00:00:00Z")
+    for _ in range(2):
+        # a shared client does not create the cache directory
+        ccb = ChangelogCIBase(
+            fake_github.repository,
+            "1.0.0",
+            "",
+            [],
+            cache_dir=str(tmp_path / "cache"),
+            client=GitHubClient(),
+        )
+        ccb.github_api_url = fake_github.url
+        ccb.run()
+        fake_github.add_pull(3, "Change 3", "2023-01-03T00:00:00Z")
+
+    data = YAML().load(changelog)
+    assert data["releases"]["1.1.0"]["changes"] == {"trivial": [_line(3), _line(2)]}
+    # the index of the changed file replaces the saved one
+    assert len(list((tmp_path / "cache").glob("changelog-*.json"))) == 1
+
+
+def _run_on(fake_github: FakeGitHub, directory: Path, text: str) -> ChangelogCIBase:
+    """Run antsichaut on a changelog in a directory.
+
+    :param fake_github: The fake API
+    :param directory: The directory to run in
+    :param text: The content of the changelog
+    :return: The ChangelogCIBase that was run
+    """
+    (directory / "changelogs").mkdir(parents=True)
+    (directory / "changelogs/changelog.yaml").write_text(text)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(directory)
+        ccb = ChangelogCIBase(fake_github.repository, "1.0.0", "", [])
+        ccb.github_api_url = fake_github.url
+        ccb.run()
+    return ccb
+
+
+def test_partial_load_matches_full_dump(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure parsing and writing only the target release gives the same file.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    yaml = YAML()
+    yaml.explicit_start = True
+    yaml.indent(sequence=4, offset=2)
+    # a file written by an earlier run, already in the layout of a full dump
+    original = yaml.load(
+        "---\nancestor:\nreleases:\n"
+        "  1.0.0:\n    changes:\n      minor_changes:\n"
+        f"        - {_line(1, 'A title that is long enough to be wrapped by the dumper' * 2)}\n"
+        f"        - {_line(0)}\n"
+        "    release_date: '2023-01-01'\n"
+        "  1.1.0:\n    release_date: '2023-02-01'\n"
+        "    changes:\n      trivial:\n        - Stale entry\n",
+    )
+    text = io.StringIO()
+    yaml.dump(original, text)
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(2, ("A long title " * 10).strip(), "2023-01-02T00:00:00Z")
+    fake_github.add_pull(3, "Change 3", "2023-01-03T00:00:00Z")
+
+    partial = _run_on(fake_github, tmp_path / "partial", text.getvalue())
+    monkeypatch.setattr(ChangelogLayout, "scan", lambda _text: None)
+    full = _run_on(fake_github, tmp_path / "full", text.getvalue())
+
+    assert partial._partial
+    assert partial._string_data is not None
+    assert list(partial._string_data["releases"]) == ["1.1.0"]
+    assert not full._partial
+    written = (tmp_path / "partial/changelogs/changelog.yaml").read_text()
+    assert written == (tmp_path / "full/changelogs/changelog.yaml").read_text()
+    assert "Stale entry" not in written
+
+
+def test_partial_load_scan(tmp_path: Path) -> None:
+    """Ensure older releases are only scanned and left unsorted until normalized.
+
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    text = (
+        "---\nreleases:\n  1.0.0:\n    changes:\n      bugfixes:\n"
+        f"        - {_line(1)}\n        - {_line(2)}\n      release_summary: Text\n"
+        "  1.1.0:\n    changes: {}\n"
+    )
+    layout = ChangelogLayout.scan(text)
+    assert layout
+    assert layout.pull_requests == {
+        "1.0.0": {"bugfixes": [1, 2]},
+        "1.1.0": {},
+    }
+    assert layout.load_newest(YAML()) == {"1.1.0": {"changes": {}}}
+
+    changelog = tmp_path / "changelog.yaml"
+    changelog.write_text(text)
+    assert normalize(changelog)
+    assert not normalize(changelog)
+    data = YAML().load(changelog)
+    assert list(data["releases"]) == ["1.1.0", "1.0.0"]
+    assert data["releases"]["1.0.0"]["changes"]["bugfixes"] == [_line(2), _line(1)]
+
+
+def test_non_dump_release_matches_full_dump(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure an older release in another indentation is rewritten like a full dump.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    text = (
+        "---\nreleases:\n"
+        "  1.0.0:\n    changes:\n      trivial:\n          - x\n"
+        "    fragments:\n    - 1.yml\n"
+        "  1.1.0:\n    changes:\n      trivial:\n        - y\n"
+    )
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(2, "Change 2", "2023-01-02T00:00:00Z")
+
+    assert ChangelogLayout.scan(text) is None
+    spliced = _run_on(fake_github, tmp_path / "spliced", text)
+    monkeypatch.setattr(ChangelogLayout, "scan", lambda _text: None)
+    _run_on(fake_github, tmp_path / "full", text)
+
+    assert not spliced._partial
+    written = (tmp_path / "spliced/changelogs/changelog.yaml").read_text()
+    assert written == (tmp_path / "full/changelogs/changelog.yaml").read_text()
+    assert "        - x\n" in written
+    assert "      - 1.yml\n" in written
+
+
+def test_quoted_release_matches_full_dump(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure a file quoted like antsibull-changelog writes it is dumped in full.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    entry = _line(7, "Old fix")
+    dumped = (
+        "---\nancestor:\nreleases:\n"
+        f"  1.0.0:\n    changes:\n      bugfixes:\n        - {entry}\n"
+        "    release_date: '2021-01-01'\n"
+        "  1.1.0:\n    release_date: '2021-02-01'\n"
+    )
+    quoted = {
+        "ancestor:\n": "ancestor: null\n",
+        f"- {entry}\n": f"- '{entry}'\n",
+        "'2021-01-01'": '"2021-01-01"',
+    }
+    fake_github.add_release("1.0.0", "2021-01-01T00:00:00Z")
+    fake_github.add_pull(8, "Change 8", "2021-01-02T00:00:00Z")
+
+    assert _run_on(fake_github, tmp_path / "spliced", dumped)._partial
+    with monkeypatch.context() as patch:
+        patch.setattr(ChangelogLayout, "scan", lambda _text: None)
+        _run_on(fake_github, tmp_path / "full", dumped)
+    expected = (tmp_path / "full/changelogs/changelog.yaml").read_text()
+    assert (tmp_path / "spliced/changelogs/changelog.yaml").read_text() == expected
+
+    for number, (old, new) in enumerate(quoted.items()):
+        text = dumped.replace(old, new)
+        assert ChangelogLayout.scan(text) is None
+        assert not _run_on(fake_github, tmp_path / str(number), text)._partial
+        assert (tmp_path / f"{number}/changelogs/changelog.yaml").read_text() == expected
+
+
+def test_indentless_sections(fake_github: FakeGitHub, tmp_path: Path) -> None:
+    """Ensure PRs in sections of another layout are still found as recorded.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    lines = ["    changes:\n", "      bugfixes:\n", f"      - {_line(5)}\n"]
+    assert ChangelogLayout._sections(lines) is None
+    assert ChangelogLayout._sections(["    changes:\n", f"      bugfixes: [{_line(5)}]\n"]) is None
+    assert ChangelogLayout._sections(["    changes:\n", "      bugfixes: []\n"]) == {
+        "bugfixes": [],
+    }
+
+    # the default indentation of antsibull-changelog
+    text = (
+        "---\nreleases:\n"
+        f"  1.0.0:\n    changes:\n      bugfixes:\n      - {_line(5)}\n"
+        "  1.1.0:\n    changes: {}\n"
+    )
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(5, "Change 5", "2023-01-02T00:00:00Z")
+    fake_github.add_pull(6, "Change 6", "2023-01-03T00:00:00Z")
+
+    _run_on(fake_github, tmp_path, text)
+
+    data = YAML().load(tmp_path / "changelogs/changelog.yaml")
+    assert data["releases"]["1.1.0"]["changes"] == {"trivial": [_line(6)]}
+
+
+def test_layout_fallback() -> None:
+    """Ensure files in an unknown layout are not spliced."""
+    assert ChangelogLayout.scan("releases:\n  1.0.0:\n    changes: {}\n") is None
+    assert ChangelogLayout.scan("---\n# comment\nreleases:\n  1.0.0: {}\n") is None
+    assert ChangelogLayout.scan("---\nreleases: {1.0.0: {}}\n") is None
+    # blocks that are not indented like changelog_yaml dumps them
+    assert ChangelogLayout.scan("---\nreleases:\n  1.0.0:\n      release_date: x\n") is None
+    assert ChangelogLayout.scan("---\nreleases:\n  1.0.0:\n    fragments: [a, b]\n") is None
+    layout = ChangelogLayout.scan("---\nreleases:\n  1.0.0:\n    release_date: x\n")
+    assert layout
+    assert layout.splice(["1.0.0", "2.0.0"], "1.0.0", [], changes_first=True) is None
+
+
+def test_snapshot(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure a run without new changes does not parse the changelog again.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "changelogs").mkdir()
+    changelog = tmp_path / "changelogs/changelog.yaml"
+    changelog.write_text(
+        f"releases:\n  1.0.0:\n    changes:\n      trivial:\n        - {_line(1)}\n"
+        "  1.1.0:\n    release_date: '2023-02-01'\n",
+    )
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(2, "Change 2", "2023-01-02T00:00:00Z")
+
+    def run() -> ChangelogCIBase:
+        ccb = ChangelogCIBase(
+            fake_github.repository,
+            "1.0.0",
+            "",
+            [],
+            cache_dir=str(tmp_path / "cache"),
+        )
+        ccb.github_api_url = fake_github.url
+        ccb.run()
+        return ccb
+
+    first = run()
+    written = changelog.read_text()
+    assert first.snapshot_file
+    assert first.snapshot_file.exists()
+
+    def fail(*_args: object) -> None:
+        pytest.fail("the changelog was parsed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(YAML, "load", fail)
+        run()
+    assert changelog.read_text() == written
+
+    # a new PR and a changed file both need a full run
+    fake_github.add_pull(3, "Change 3", "2023-01-03T00:00:00Z")
+    run()
+    assert _line(3) in changelog.read_text()
+    changelog.write_text(changelog.read_text().replace(_line(3), "Edited"))
+    run()
+    assert _line(3) in changelog.read_text()
+    assert "Edited" not in changelog.read_text()
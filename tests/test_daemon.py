@@ -0,0 +1,125 @@
+"""Tests for updating the changelog from recorded webhook payloads."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import time
+from pathlib import Path
+
+import requests
+from ruamel.yaml import YAML
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.daemon import ChangelogDaemon
+
+WEBHOOK_DIR = Path(__file__).parent / "fixtures" / "webhooks"
+
+CHANGELOG = """\
+---
+releases:
+  1.0.0:
+    changes:
+      trivial:
+        - Old change (https://github.com/owner/repo/pull/1)
+    release_date: '2023-01-01'
+  1.1.0:
+    changes:
+      minor_changes:
+        - Feature (https://github.com/owner/repo/pull/5)
+    release_date: '2023-04-01'
+"""
+
+SECRET = "s3cret"  # noqa: S105
+
+GROUP_CONFIG = [
+    {"title": "breaking_changes", "labels": ["breaking"]},
+    {"title": "minor_changes", "labels": ["enhancement"]},
+    {"title": "bugfixes", "labels": ["bug"]},
+]
+
+
+def _deliver(url: str, name: str, secret: str = "") -> int:
+    """Send a recorded webhook payload.
+
+    :param url: The URL of the daemon
+    :param name: The name of the payload file
+    :param secret: The secret to sign the payload with, optional
+    :return: The response status code
+    """
+    body = (WEBHOOK_DIR / name).read_bytes()
+    headers = {"X-GitHub-Event": "pull_request", "Content-Type": "application/json"}
+    if secret:
+        digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        headers["X-Hub-Signature-256"] = f"sha256={digest}"
+    return requests.post(url, data=body, headers=headers, timeout=5).status_code
+
+
+def test_daemon(tmp_path: Path) -> None:
+    """Ensure a burst of webhooks is applied to the warm model in one write.
+
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    changelog = tmp_path / "changelog.yaml"
+    changelog.write_text(CHANGELOG)
+    ccb = ChangelogCIBase("owner/repo", "", "", GROUP_CONFIG, filename=str(changelog))
+    daemon = ChangelogDaemon(ccb, debounce=60, secret=SECRET)
+    daemon.start(port=0)
+    host, port = daemon.address
+    url = f"http://{host}:{port}/"
+    try:
+        accepted = 202
+        ignored = 204
+        unauthorized = 401
+        assert _deliver(url, "pull_request_merged.json", SECRET) == accepted
+        assert _deliver(url, "pull_request_labeled.json", SECRET) == accepted
+        assert _deliver(url, "pull_request_closed_unmerged.json", SECRET) == ignored
+        assert _deliver(url, "pull_request_merged.json", "wrong") == unauthorized
+        assert changelog.read_text() == CHANGELOG
+    finally:
+        daemon.stop()
+
+    assert daemon.writes == 1
+    releases = YAML().load(changelog)["releases"]
+    assert releases["1.1.0"]["changes"] == {
+        "minor_changes": ["Feature (https://github.com/owner/repo/pull/5)"],
+        "breaking_changes": ["Fix the parser (https://github.com/owner/repo/pull/7)"],
+    }
+    assert releases["1.0.0"]["changes"]["trivial"]
+
+    # the label is removed again, the next write moves the entry
+    payload = json.loads((WEBHOOK_DIR / "pull_request_merged.json").read_text())
+    payload["action"] = "unlabeled"
+    assert daemon.handle("pull_request", payload)
+    assert not daemon.handle("pull_request", {**payload, "repository": {"full_name": "a/b"}})
+    assert daemon.flush() == 1
+    releases = YAML().load(changelog)["releases"]
+    assert releases["1.1.0"]["changes"]["bugfixes"] == [
+        "Fix the parser (https://github.com/owner/repo/pull/7)",
+    ]
+    assert not releases["1.1.0"]["changes"]["breaking_changes"]
+
+
+def test_debounce(tmp_path: Path) -> None:
+    """Ensure a burst is written by the writer thread once it is quiet.
+
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    changelog = tmp_path / "changelog.yaml"
+    changelog.write_text(CHANGELOG)
+    ccb = ChangelogCIBase("owner/repo", "", "", GROUP_CONFIG, filename=str(changelog))
+    daemon = ChangelogDaemon(ccb, debounce=0.2)
+    daemon.start(port=0)
+    try:
+        for name in ("pull_request_merged.json", "pull_request_labeled.json"):
+            payload = json.loads((WEBHOOK_DIR / name).read_text())
+            assert daemon.handle("pull_request", payload)
+        deadline = time.monotonic() + 5
+        while not daemon.writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        daemon.stop()
+
+    assert daemon.writes == 1
+    assert "pull/7" in changelog.read_text()
@@ -0,0 +1,85 @@
+"""Tests for fetching merged pull requests."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from antsichaut.antsichaut import ChangelogCIBase
+
+if TYPE_CHECKING:
+    from tests.fake_github import FakeGitHub
+
+GROUP_CONFIG = [
+    {
+        "title": "skip_changelog",
+        "labels": ["skip_changelog", "skip-changelog", "skipchangelog"],
+    },
+]
+
+
+def _populate(fake_github: FakeGitHub, count: int) -> None:
+    """Add two releases and merged pull requests in between.
+
+    :param fake_github: The fake API
+    :param count: The number of pull requests
+    """
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    for number in range(1, count + 1):
+        merged_at = (start + timedelta(minutes=number)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        fake_github.add_pull(number, f"Change {number}", merged_at)
+    end = start + timedelta(minutes=count + 1)
+    fake_github.add_release("2.0.0", end.strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+
+def _ccb(fake_github: FakeGitHub) -> ChangelogCIBase:
+    """Create a ChangelogCIBase talking to the fake API.
+
+    :param fake_github: The fake API
+    :return: The ChangelogCIBase
+    """
+    ccb = ChangelogCIBase(
+        repository=fake_github.repository,
+        since_version="1.0.0",
+        to_version="2.0.0",
+        group_config=GROUP_CONFIG,
+    )
+    ccb.github_api_url = fake_github.url
+    return ccb
+
+
+def test_pagination(fake_github: FakeGitHub) -> None:
+    """Ensure all pages of the search results are fetched.
+
+    :param fake_github: The fake API
+    """
+    _populate(fake_github, 250)
+    changes = _ccb(fake_github).get_changes_after_last_release()
+
+    assert [int(change["number"]) for change in changes] == list(range(1, 251))
+    searches = [r for r in fake_github.requests if r.startswith("/search/")]
+    expected_pages = 3
+    assert len(searches) == expected_pages
+
+
+def test_date_shards(fake_github: FakeGitHub) -> None:
+    """Ensure windows above the search result limit are split into shards.
+
+    :param fake_github: The fake API
+    """
+    _populate(fake_github, 2500)
+    changes = _ccb(fake_github).get_changes_after_last_release()
+
+    assert [int(change["number"]) for change in changes] == list(range(1, 2501))
+
+
+def test_split_window() -> None:
+    """Ensure windows are split into adjacent halves without overlap."""
+    halves = ChangelogCIBase._split_window(("2023-01-01T00:00:00Z", "2023-01-03T00:00:00Z"))
+    assert halves == [
+        ("2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"),
+        ("2023-01-02T00:00:01Z", "2023-01-03T00:00:00Z"),
+    ]
+    assert not ChangelogCIBase._split_window(("2023-01-01T00:00:00Z", "2023-01-01T00:00:00Z"))
+    assert not ChangelogCIBase._split_window(("", ""))
@@ -0,0 +1,137 @@
+"""Tests for updating many repositories in one invocation."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from ruamel.yaml import YAML
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.fleet import FleetEntry, format_results, load_manifest, run_fleet
+from antsichaut.github import GitHubClient
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tests.fake_github import FakeGitHub
+
+CHANGELOG = """\
+---
+releases:
+  1.1.0:
+    release_date: '2023-02-01'
+"""
+
+MANIFEST = """\
+defaults:
+  since_version: 1.0.0
+repositories:
+  - repository: owner/repo
+    filename: one/changelogs/changelog.yaml
+    clone_dir: one
+    labels:
+      bugfixes: [fix]
+  - repository: owner/repo
+    filename: missing/changelogs/changelog.yaml
+  - repository: owner/repo
+    filename: two/changelogs/changelog.yaml
+    to_version:
+  - repository: owner/typo
+    labelz: {}
+  - filename: three/changelogs/changelog.yaml
+"""
+
+
+def test_fleet(fake_github: FakeGitHub, tmp_path: Path) -> None:
+    """Ensure every repository is run with one shared client.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    for name in ("one", "two"):
+        (tmp_path / name / "changelogs").mkdir(parents=True)
+        (tmp_path / name / "changelogs/changelog.yaml").write_text(CHANGELOG)
+    (tmp_path / "manifest.yaml").write_text(MANIFEST)
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(1, "Fix it", "2023-01-02T00:00:00Z", ("fix",))
+
+    entries = load_manifest(tmp_path / "manifest.yaml")
+    assert [entry.since_version for entry in entries[:3]] == ["1.0.0"] * 3
+    assert entries[2].to_version == ""
+    # the clones of the git backend are found relative to the manifest
+    assert entries[0].clone_dir == str(tmp_path / "one")
+    assert entries[2].clone_dir == str(tmp_path)
+    client = GitHubClient()
+    group_config = [{"title": "bugfixes", "labels": ["bug"]}]
+
+    def build(entry: FleetEntry) -> ChangelogCIBase:
+        ccb = ChangelogCIBase(
+            entry.repository,
+            entry.since_version,
+            entry.to_version,
+            entry.group_config(group_config),
+            filename=entry.filename,
+            client=client,
+        )
+        ccb.github_api_url = fake_github.url
+        return ccb
+
+    results = run_fleet(entries, build, workers=3)
+
+    # invalid entries of the manifest fail alone, like a failing run
+    assert [result.ok for result in results] == [True, False, True, False, False]
+    assert "FileNotFoundError" in str(results[1].error)
+    assert results[3].error == "Invalid manifest entry: unknown keys labelz"
+    assert results[4].repository == "repositories[4]"
+    assert results[4].error == "Invalid manifest entry: missing repository"
+    assert format_results(results).endswith("2 succeeded, 3 failed")
+    one = YAML().load(tmp_path / "one/changelogs/changelog.yaml")
+    two = YAML().load(tmp_path / "two/changelogs/changelog.yaml")
+    assert list(one["releases"]["1.1.0"]["changes"]) == ["bugfixes"]
+    assert list(two["releases"]["1.1.0"]["changes"]) == ["trivial"]
+    # the releases are listed once per repository over the shared session
+    assert client.stats.requests == sum(entry.error is None for entry in entries) * 2
+
+
+def test_fleet_failed_request(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Ensure a repository whose release is not found fails and is named in its messages.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param capsys: pytest fixture to capture the output
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(1, "Fix it", "2023-01-02T00:00:00Z", ("fix",))
+    entries = []
+    for name, since_version in (("one", "1.0.0"), ("two", "0.9.0")):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "changelog.yaml").write_text(CHANGELOG)
+        filename = str(tmp_path / name / "changelog.yaml")
+        entries.append(FleetEntry(fake_github.repository, since_version, filename=filename))
+    client = GitHubClient()
+
+    def build(entry: FleetEntry) -> ChangelogCIBase:
+        ccb = ChangelogCIBase(
+            entry.repository,
+            entry.since_version,
+            entry.to_version,
+            [],
+            filename=entry.filename,
+            client=client,
+        )
+        ccb.github_api_url = fake_github.url
+        return ccb
+
+    results = run_fleet(entries, build, workers=2)
+    message = f"Could not find any release id for {fake_github.repository}"
+    assert [result.error for result in results] == [None, message]
+    assert format_results(results).endswith("1 succeeded, 1 failed")
+    lines = capsys.readouterr().out.splitlines()
+    assert f"{fake_github.repository}: {message}" in lines
+    assert all(line.startswith(f"{fake_github.repository}: ") for line in lines)
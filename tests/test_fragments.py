@@ -0,0 +1,61 @@
+"""Tests for writing one changelog fragment per pull request."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from ruamel.yaml import YAML
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.fragments import existing_numbers
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tests.fake_github import FakeGitHub
+
+
+def test_fragments(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure new PRs get a fragment and existing fragments are kept.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    monkeypatch.chdir(tmp_path)
+    fragments = tmp_path / "changelogs/fragments"
+    fragments.mkdir(parents=True)
+    (fragments / "1-written-by-hand.yml").write_text("not: parsed: [\n")
+    (fragments / "notes.yml").write_text("---\n")
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(1, "Change 1", "2023-01-02T00:00:00Z", ("bug",))
+    fake_github.add_pull(2, "Fix: the parser", "2023-01-03T00:00:00Z", ("bug",))
+    fake_github.add_pull(3, "Change 3", "2023-01-04T00:00:00Z", ("skip_changelog",))
+    fake_github.add_pull(4, "Change 4", "2023-01-05T00:00:00Z")
+    group_config = [
+        {"title": "bugfixes", "labels": ["bug"]},
+        {"title": "skip_changelog", "labels": ["skip_changelog"]},
+    ]
+    ccb = ChangelogCIBase(fake_github.repository, "1.0.0", "", group_config, output="fragments")
+    ccb.github_api_url = fake_github.url
+
+    expected_count = 4
+    assert ccb.run() == expected_count
+
+    assert not (tmp_path / "changelogs/changelog.yaml").exists()
+    assert existing_numbers(fragments) == {1, 2, 4}
+    assert (fragments / "1-written-by-hand.yml").read_text() == "not: parsed: [\n"
+    assert YAML().load(fragments / "2.yml") == {
+        "bugfixes": ["Fix: the parser (https://github.com/owner/repo/pull/2)"],
+    }
+    assert YAML().load(fragments / "4.yml") == {
+        "trivial": ["Change 4 (https://github.com/owner/repo/pull/4)"],
+    }
+    assert not list(fragments.glob("*.tmp"))
+    assert [phase.name for phase in ccb.profiler.phases][-1] == "_write_fragments"
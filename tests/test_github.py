@@ -0,0 +1,106 @@
+"""Tests for the shared GitHub client."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from antsichaut.github import GitHubClient
+
+if TYPE_CHECKING:
+    from tests.fake_github import FakeGitHub
+
+
+def _client() -> tuple[GitHubClient, list[float]]:
+    """Create a client that records its waits instead of sleeping.
+
+    :return: The client and the list of waits
+    """
+    waits: list[float] = []
+    return GitHubClient(token="secret", sleep=waits.append), waits  # noqa: S106
+
+
+def test_retry_transient(fake_github: FakeGitHub) -> None:
+    """Ensure transient server errors are retried.
+
+    :param fake_github: The fake API
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.failures = [(502, {}), (503, {})]
+    client, waits = _client()
+
+    response = client.get(f"{fake_github.url}/repos/owner/repo/releases/tags/1.0.0")
+
+    assert response.ok
+    expected_retries = 2
+    assert client.stats.retries == expected_retries
+    assert client.stats.requests == expected_retries + 1
+    assert len(waits) == expected_retries
+
+
+def test_give_up(fake_github: FakeGitHub) -> None:
+    """Ensure the last response is returned once the retries are used up.
+
+    :param fake_github: The fake API
+    """
+    fake_github.failures = [(502, {})] * 5
+    client, _waits = _client()
+
+    response = client.get(f"{fake_github.url}/repos/owner/repo/releases/tags/1.0.0")
+
+    expected_status = 502
+    assert response.status_code == expected_status
+    assert client.stats.requests == client.retries + 1
+
+
+def test_rate_limit(fake_github: FakeGitHub) -> None:
+    """Ensure a rate limited request waits for the reset.
+
+    :param fake_github: The fake API
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    reset = int(time.time()) + 30
+    headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)}
+    fake_github.failures = [(403, headers), (429, {"Retry-After": "5"})]
+    client, waits = _client()
+
+    response = client.get(f"{fake_github.url}/repos/owner/repo/releases/tags/1.0.0")
+
+    assert response.ok
+    expected_waits = 2
+    assert client.stats.rate_limit_waits == expected_waits
+    assert client.stats.retries == 0
+    assert waits[0] > 25  # noqa: PLR2004
+
+
+def test_not_retried(fake_github: FakeGitHub) -> None:
+    """Ensure client errors are returned right away.
+
+    :param fake_github: The fake API
+    """
+    client, waits = _client()
+
+    response = client.get(f"{fake_github.url}/repos/owner/repo/releases/tags/1.0.0")
+
+    expected_status = 404
+    assert response.status_code == expected_status
+    assert not waits
+    assert client.session.headers["authorization"] == "Bearer secret"
+
+
+def test_rate_limit_reserve(fake_github: FakeGitHub) -> None:
+    """Ensure requests wait for the reset before the reserve is used.
+
+    :param fake_github: The fake API
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.rate_limit_remaining = 11
+    waits: list[float] = []
+    client = GitHubClient(sleep=waits.append, reserve=10)
+    url = f"{fake_github.url}/repos/owner/repo/releases/tags/1.0.0"
+
+    assert client.get(url).ok
+    assert not waits
+    assert client.get(url).ok
+    assert len(waits) == 1
+    assert waits[0] > 3000  # noqa: PLR2004
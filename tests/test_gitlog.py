@@ -0,0 +1,77 @@
+"""Tests for reading the merged PRs from a local clone."""
+
+from __future__ import annotations
+
+import subprocess
+from typing import TYPE_CHECKING
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.gitlog import pull_request_numbers
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fake_github import FakeGitHub
+
+
+def _git(clone: Path, *args: str) -> None:
+    """Run a git command in the fixture clone.
+
+    :param clone: The directory of the clone
+    :param args: The arguments of the git command
+    """
+    subprocess.run(  # noqa: S603
+        ["git", "-C", str(clone), "-c", "user.name=a", "-c", "user.email=a@b", *args],  # noqa: S607
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_pull_request_numbers() -> None:
+    """Ensure squash and merge subjects name PRs, other subjects do not."""
+    subjects = [
+        "Fix the parser (#12)",
+        "Merge pull request #7 from owner/branch",
+        "Mention #3 in the middle",
+        "Revert 'Fix the parser (#12)'",
+        "Merge branch 'main'",
+    ]
+    assert pull_request_numbers(subjects) == [12, 7]
+
+
+def test_git_backend(fake_github: FakeGitHub, tmp_path: Path) -> None:
+    """Ensure the PRs between two tags are looked up by number.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    clone = tmp_path / "clone"
+    clone.mkdir()
+    _git(clone, "init", "-q")
+    _git(clone, "commit", "-q", "--allow-empty", "-m", "Old change (#1)")
+    _git(clone, "tag", "1.0.0")
+    _git(clone, "commit", "-q", "--allow-empty", "-m", "Fix it (#2)")
+    _git(clone, "commit", "-q", "--allow-empty", "-m", "Merge pull request #3 from x/y")
+    _git(clone, "commit", "-q", "--allow-empty", "-m", "Direct push")
+    _git(clone, "commit", "-q", "--allow-empty", "-m", "Issue reference (#4)")
+    _git(clone, "tag", "2.0.0")
+    _git(clone, "commit", "-q", "--allow-empty", "-m", "Unreleased (#5)")
+    for number in (1, 2, 3, 5):
+        fake_github.add_pull(number, f"Change {number}", f"2023-01-0{number}T00:00:00Z")
+
+    ccb = ChangelogCIBase(
+        fake_github.repository,
+        "1.0.0",
+        "2.0.0",
+        [],
+        backend="git",
+        clone_dir=str(clone),
+    )
+    ccb.github_api_url = fake_github.url
+
+    changes = ccb.get_changes_after_last_release()
+
+    assert [change["number"] for change in changes] == [2, 3]
+    assert not any("/releases" in r or "/search" in r for r in fake_github.requests)
+    ccb.since_version, ccb.to_version = "latest", ""
+    assert [change["number"] for change in ccb.get_changes_after_last_release()] == [5]
@@ -0,0 +1,109 @@
+"""Tests for the GraphQL backend."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from antsichaut.antsichaut import ChangelogCIBase
+
+if TYPE_CHECKING:
+    import pytest
+
+    from tests.fake_github import FakeGitHub
+
+GROUP_CONFIG = [
+    {
+        "title": "skip_changelog",
+        "labels": ["skip_changelog", "skip-changelog", "skipchangelog"],
+    },
+]
+
+
+def _timestamp(hours: int) -> str:
+    """Build a timestamp some hours after the first release.
+
+    :param hours: The hours after the first release
+    :return: The timestamp
+    """
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    return (start + timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_graphql_backend(fake_github: FakeGitHub) -> None:
+    """Ensure the GraphQL backend returns the same PRs as the search API.
+
+    :param fake_github: The fake API
+    """
+    fake_github.add_release("1.0.0", _timestamp(0))
+    for number in range(1, 301):
+        fake_github.add_pull(number, f"Change {number}", _timestamp(number), ("bug",))
+    fake_github.add_release("2.0.0", _timestamp(250))
+
+    rest = ChangelogCIBase(fake_github.repository, "1.0.0", "2.0.0", GROUP_CONFIG)
+    rest.github_api_url = fake_github.url
+    graphql = ChangelogCIBase(
+        fake_github.repository,
+        "1.0.0",
+        "2.0.0",
+        GROUP_CONFIG,
+        token="token",  # noqa: S106
+        backend="graphql",
+    )
+    graphql.github_api_url = fake_github.url
+    fake_github.requests.clear()
+
+    changes = graphql.get_changes_after_last_release()
+
+    # the releases are resolved with the first page, no REST calls are made
+    expected_pages = 3
+    assert fake_github.requests == ["/graphql query"] * expected_pages
+    assert changes == rest.get_changes_after_last_release()
+    expected_count = 250
+    assert len(changes) == expected_count
+    assert changes[0]["labels"] == ("bug",)
+
+
+def test_graphql_missing_release(
+    fake_github: FakeGitHub,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Ensure a missing release is reported.
+
+    :param fake_github: The fake API
+    :param capsys: pytest fixture for capturing stdout and stderr
+    """
+    graphql = ChangelogCIBase(
+        fake_github.repository,
+        "0.0.0",
+        "",
+        GROUP_CONFIG,
+        backend="graphql",
+    )
+    graphql.github_api_url = fake_github.url
+
+    assert graphql.get_changes_after_last_release() == []
+    assert capsys.readouterr()[0].startswith("Could not find any release id")
+
+
+def test_graphql_without_data(
+    fake_github: FakeGitHub,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Ensure a response without data is reported instead of raising.
+
+    :param fake_github: The fake API
+    :param capsys: pytest fixture for capturing stdout and stderr
+    """
+    fake_github.failures = [(200, {})]
+    graphql = ChangelogCIBase(
+        fake_github.repository,
+        "1.0.0",
+        "",
+        GROUP_CONFIG,
+        backend="graphql",
+    )
+    graphql.github_api_url = fake_github.url
+
+    assert graphql.get_changes_after_last_release() == []
+    assert capsys.readouterr()[0].startswith("Could not get pull requests")
@@ -0,0 +1,98 @@
+"""Tests for incremental runs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from ruamel.yaml import YAML
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.state import Watermark
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tests.fake_github import FakeGitHub
+
+CHANGELOG = """\
+---
+ancestor:
+releases:
+  1.1.0:
+    release_date: '2023-02-01'
+"""
+
+
+def _run(fake_github: FakeGitHub) -> ChangelogCIBase:
+    """Run antsichaut incrementally against the fake API.
+
+    :param fake_github: The fake API
+    :return: The ChangelogCIBase that was run
+    """
+    group_config = [{"title": "skip_changelog", "labels": ["skip_changelog"]}]
+    ccb = ChangelogCIBase(fake_github.repository, "1.0.0", "", group_config, incremental=True)
+    ccb.github_api_url = fake_github.url
+    ccb.run()
+    return ccb
+
+
+def test_incremental(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure later runs only fetch PRs updated after the watermark.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "changelogs").mkdir()
+    (tmp_path / "changelogs/changelog.yaml").write_text(CHANGELOG)
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    for number in range(1, 4):
+        fake_github.add_pull(number, f"Change {number}", f"2023-01-0{number + 1}T00:00:00Z")
+
+    ccb = _run(fake_github)
+
+    watermark = Watermark.load(ccb.state_file)
+    assert watermark
+    assert (watermark.merged_at, watermark.number) == ("2023-01-04T00:00:00Z", 3)
+
+    fake_github.add_pull(4, "Change 4", "2023-01-05T00:00:00Z")
+    fake_github.pulls[1].update(title="Retitled 2", updated_at="2023-01-06T00:00:00Z")
+    fake_github.requests.clear()
+
+    _run(fake_github)
+
+    searches = [r for r in fake_github.requests if r.startswith("/search/")]
+    assert "updated:%3E=2023-01-04T00:00:00Z" in searches[0]
+    data = YAML().load(tmp_path / "changelogs/changelog.yaml")
+    trivial = data["releases"]["1.1.0"]["changes"]["trivial"]
+    assert sorted(trivial) == sorted(
+        f"{title} (https://github.com/owner/repo/pull/{number})"
+        for number, title in ((1, "Change 1"), (2, "Retitled 2"), (3, "Change 3"), (4, "Change 4"))
+    )
+
+
+def test_full_refresh(tmp_path: Path) -> None:
+    """Ensure a watermark of another release window is not used.
+
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    ccb = ChangelogCIBase(
+        "owner/repo",
+        "1.1.0",
+        "",
+        [],
+        filename=str(tmp_path / "changelog.yaml"),
+        incremental=True,
+    )
+    Watermark("owner/repo", "1.0.0", "", "2023-01-04T00:00:00Z", 3).save(ccb.state_file)
+
+    assert ccb._load_watermark() is None
+    ccb.since_version = "1.0.0"
+    assert ccb._load_watermark()
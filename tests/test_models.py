@@ -0,0 +1,67 @@
+"""Tests for the pull request record."""
+
+from __future__ import annotations
+
+import pytest
+
+from antsichaut.models import PullRequest
+from antsichaut.rules import Classifier
+
+
+def test_pull_request() -> None:
+    """Ensure records are compact, interned and read like the old dicts."""
+    data = {
+        "title": "Fix it",
+        "number": "12",
+        "url": "https://github.com/owner/repo/pull/12",
+        "labels": ["BUGFIX".lower()],
+        "merged_at": "2023-01-01T00:00:00Z",
+        "author": "octocat",
+    }
+    first = PullRequest.coerce(data)
+    second = PullRequest.coerce({**data, "labels": ["BUGFIX".lower()]})
+
+    expected_number = 12
+    assert first.number == expected_number
+    assert first.labels[0] is second.labels[0]
+    assert first == second
+    assert PullRequest.coerce(first) is first
+    assert first.line == "Fix it (https://github.com/owner/repo/pull/12)"
+    assert first.line is first.line
+    assert first["labels"] == ("bugfix",)
+    assert first.get("missing", "default") == "default"
+    assert first.to_dict() == {**data, "number": 12, "labels": ("bugfix",)}
+    assert not hasattr(first, "__dict__")
+    with pytest.raises(KeyError):
+        _ = first["missing"]
+
+
+def test_label_mask() -> None:
+    """Ensure records and dicts are classified alike, the mask is kept."""
+    classifier = Classifier(
+        [
+            {"title": "major_changes", "labels": ["major"]},
+            {"title": "bugfixes", "labels": ["bug"], "title_patterns": ["^fix"]},
+            {"title": "minor_changes", "labels": ["feature"], "authors": ["dependabot"]},
+            {"title": "skip_changelog", "labels": ["skip"]},
+        ],
+    )
+    cases = [
+        ("a", ["bug", "major"], None),
+        ("fix: b", ["feature"], None),
+        ("c", [], "dependabot"),
+        ("d", ["bug", "skip"], None),
+        ("e", ["docs"], None),
+    ]
+    records = [
+        PullRequest(number, title, "url", labels, author=author)
+        for number, (title, labels, author) in enumerate(cases)
+    ]
+    dicts = [
+        {"title": title, "labels": labels, "author": author} for title, labels, author in cases
+    ]
+
+    expected = ["major_changes", "bugfixes", "minor_changes", None, "trivial"]
+    assert classifier.classify(records) == expected
+    assert classifier.classify(dicts) == expected
+    assert records[0].label_mask == classifier.label_mask(["bug", "major"])
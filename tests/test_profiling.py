@@ -0,0 +1,72 @@
+"""Tests for the per-phase profile of a run."""
+
+from __future__ import annotations
+
+import json
+from argparse import Namespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+from antsichaut.antsichaut import ChangelogCIBase, _run, main
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fake_github import FakeGitHub
+
+
+def test_profile(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure every phase is measured and reported.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    :param monkeypatch: pytest fixture for monkey patching
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "changelogs").mkdir()
+    (tmp_path / "changelogs/changelog.yaml").write_text("releases:\n  1.1.0:\n    changes: {}\n")
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_pull(1, "Change 1", "2023-01-02T00:00:00Z")
+    ccb = ChangelogCIBase(fake_github.repository, "1.0.0", "", [])
+    ccb.github_api_url = fake_github.url
+
+    _run(ccb, Namespace(cprofile=str(tmp_path / "run.prof"), profile=str(tmp_path / "run.json")))
+
+    profile = json.loads((tmp_path / "run.json").read_text())
+    phases = {phase["name"]: phase for phase in profile["phases"]}
+    assert list(phases) == [
+        "release lookup",
+        "search fetch",
+        "changelog load",
+        "classification",
+        "_sort_by_pr",
+        "_write_changelog",
+    ]
+    assert phases["release lookup"]["requests"] == 1
+    assert phases["search fetch"]["bytes_received"] > 0
+    assert phases["search fetch"]["rate_limit_remaining"] is not None
+    assert profile["http"]["requests"] == len(fake_github.requests)
+    assert (tmp_path / "run.prof").stat().st_size
+    assert ccb.profiler.table().splitlines()[-1].startswith("total")
+
+
+def test_profile_target(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Ensure a profile target that is neither a table nor JSON is rejected.
+
+    :param monkeypatch: pytest fixture for monkey patching
+    :param capsys: pytest fixture for capturing stdout and stderr
+    """
+    argv = ["antsichaut", "--github_token=t", "--repository=o/r", "--since_version=1.0.0"]
+    monkeypatch.setattr("sys.argv", [*argv, "--profile=yes"])
+
+    with pytest.raises(SystemExit):
+        main()
+    assert "--profile must be" in capsys.readouterr()[1]
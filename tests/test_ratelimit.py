@@ -0,0 +1,85 @@
+"""Tests for spreading requests over several tokens."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from antsichaut.github import GitHubClient
+from antsichaut.ratelimit import TokenPool, resource_of
+
+if TYPE_CHECKING:
+    from tests.fake_github import FakeGitHub
+
+TOKENS = ["first", "second"]
+
+
+def test_token_pool() -> None:
+    """Ensure the token with the most headroom for the resource is picked."""
+    pool = TokenPool(TOKENS)
+    now = time.time()
+    reset = str(int(now) + 60)
+
+    token, delay = pool.acquire("search", now)
+    assert (token, delay) == ("first", 0)
+    pool.release(token, "search", {"X-RateLimit-Remaining": "1"}, limited=False, now=now)
+    assert pool.acquire("search", now)[0] == "second"
+    pool.release(
+        "second",
+        "search",
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset},
+        limited=False,
+        now=now,
+    )
+    # the core budget is tracked apart from the search budget
+    assert pool.acquire("core", now) == ("first", 0)
+    assert pool.acquire("search", now) == ("first", 0)
+    pool.release(
+        "first",
+        "search",
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(now) + 30)},
+        limited=False,
+        now=now,
+    )
+
+    # every token is used up, the one that resets first is picked
+    token, delay = pool.acquire("search", now)
+    assert token == TOKENS[0]
+    assert 25 < delay <= 31  # noqa: PLR2004
+    assert resource_of("https://api.github.com/search/issues?q=a") == "search"
+    assert resource_of("https://api.github.com/graphql") == "graphql"
+
+
+def test_token_rotation(fake_github: FakeGitHub) -> None:
+    """Ensure tokens add up their budgets and requests queue once all are used.
+
+    :param fake_github: The fake API
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.limits = {"search": 2}
+    waits: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        waits.append(seconds)
+        fake_github.reset_limits()
+
+    client = GitHubClient(tokens=TOKENS, sleep=sleep)
+    search = f"{fake_github.url}/search/issues?q=is:merged"
+
+    for _ in range(4):
+        assert client.get(search).ok
+    assert not waits
+    assert fake_github.used == {
+        ("Bearer first", "search"): 2,
+        ("Bearer second", "search"): 2,
+    }
+
+    # the core budget is not used up by searching
+    assert client.get(f"{fake_github.url}/repos/owner/repo/releases/tags/1.0.0").ok
+    assert not waits
+
+    assert client.get(search).ok
+    assert len(waits) == 1
+    assert waits[0] > 3000  # noqa: PLR2004
+    assert fake_github.limited == 0
+    assert client.session.headers["authorization"] == "Bearer first"
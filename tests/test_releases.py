@@ -0,0 +1,75 @@
+"""Tests for the release index."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from antsichaut.antsichaut import ChangelogCIBase
+from antsichaut.github import GitHubClient
+from antsichaut.releases import Release, ReleaseIndex
+
+if TYPE_CHECKING:
+    from tests.fake_github import FakeGitHub
+
+GROUP_CONFIG = [
+    {
+        "title": "skip_changelog",
+        "labels": ["skip_changelog", "skip-changelog", "skipchangelog"],
+    },
+]
+
+
+def test_fetch_index(fake_github: FakeGitHub) -> None:
+    """Ensure all pages of the release listing are indexed.
+
+    :param fake_github: The fake API
+    """
+    for number in range(150):
+        published_at = f"2023-01-01T00:{number // 60:02}:{number % 60:02}Z"
+        fake_github.add_release(f"1.{number}.0", published_at)
+
+    index = ReleaseIndex.fetch(GitHubClient(), fake_github.url, fake_github.repository)
+
+    expected_count = 150
+    assert len(index) == expected_count
+    assert index.get("1.42.0") == Release("1.42.0", 43, "2023-01-01T00:00:42Z")
+    expected_pages = 2
+    assert len(fake_github.requests) == expected_pages
+
+
+def test_lookups() -> None:
+    """Ensure the index answers lookups by tag and date."""
+    index = ReleaseIndex(
+        [
+            Release("2.0.0-rc1", 3, "2023-03-01T00:00:00Z", prerelease=True),
+            Release("1.1.0", 2, "2023-02-01T00:00:00Z"),
+            Release("1.0.0", 1, "2023-01-01T00:00:00Z"),
+        ],
+    )
+
+    latest = index.latest
+    assert latest
+    assert latest.tag == "1.1.0"
+    previous = index.previous("1.1.0")
+    assert previous
+    assert previous.tag == "1.0.0"
+    assert index.previous("1.0.0") is None
+    assert index.get("0.1.0") is None
+    between = index.between("2023-01-15T00:00:00Z", "2023-03-01T00:00:00Z")
+    assert [release.tag for release in between] == ["1.1.0", "2.0.0-rc1"]
+
+
+def test_release_dates(fake_github: FakeGitHub) -> None:
+    """Ensure both release dates are resolved with one listing request.
+
+    :param fake_github: The fake API
+    """
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    fake_github.add_release("1.1.0", "2023-02-01T00:00:00Z")
+    ccb = ChangelogCIBase(fake_github.repository, "1.0.0", "latest", GROUP_CONFIG)
+    ccb.github_api_url = fake_github.url
+
+    assert ccb._get_release_date(ccb.since_version) == "2023-01-01T00:00:00Z"
+    assert ccb._get_release_date(ccb.to_version) == "2023-02-01T00:00:00Z"
+    assert ccb._get_release_id("1.1.0") == "2"
+    assert fake_github.requests == ["/repos/owner/repo/releases?per_page=100"]
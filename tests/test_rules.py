@@ -0,0 +1,61 @@
+"""Tests for the classification rules."""
+
+from __future__ import annotations
+
+from antsichaut.rules import Classifier
+
+GROUP_CONFIG = [
+    {"title": "major_changes", "labels": ["major", "breaking"]},
+    {"title": "minor_changes", "labels": ["minor", "enhancement"]},
+    {"title": "breaking_changes", "labels": ["major", "breaking"]},
+    {"title": "bugfixes", "labels": ["bug", "bugfix"], "title_patterns": [r"^fix(\(.*\))?:"]},
+    {"title": "skip_changelog", "labels": ["skip_changelog"], "authors": ["renovate[bot]"]},
+]
+
+
+def _pr(title: str, labels: list[str], author: str = "octocat") -> dict[str, object]:
+    """Build a pull request.
+
+    :param title: The title
+    :param labels: The labels
+    :param author: The author
+    :return: The pull request
+    """
+    return {"title": title, "labels": labels, "author": author}
+
+
+def test_first_match_precedence() -> None:
+    """Ensure the first section in the group config wins."""
+    classifier = Classifier(GROUP_CONFIG)
+
+    assert classifier.classify(
+        [
+            _pr("a", ["bug", "breaking"]),
+            _pr("b", ["enhancement"]),
+            _pr("c", ["documentation"]),
+            _pr("fix: d", []),
+            _pr("fix: e", ["minor"]),
+        ],
+    ) == ["major_changes", "minor_changes", "trivial", "bugfixes", "minor_changes"]
+
+
+def test_skip_rules() -> None:
+    """Ensure skipped PRs do not stop the classification of later PRs."""
+    classifier = Classifier(GROUP_CONFIG)
+
+    assert classifier.classify(
+        [
+            _pr("a", ["skip_changelog", "major"]),
+            _pr("b", ["major"]),
+            _pr("c", ["bug"], author="renovate[bot]"),
+            _pr("d", ["bug"]),
+        ],
+    ) == [None, "major_changes", None, "bugfixes"]
+
+
+def test_group_config_unchanged() -> None:
+    """Ensure building the rules does not modify the group config."""
+    group_config = [dict(config) for config in GROUP_CONFIG]
+    Classifier(group_config)
+
+    assert group_config == GROUP_CONFIG
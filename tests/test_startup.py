@@ -0,0 +1,133 @@
+"""Tests for the fixed cost of starting antsichaut in a fresh interpreter."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from antsichaut.antsichaut import version
+
+if TYPE_CHECKING:
+    from tests.fake_github import FakeGitHub
+
+ROOT = Path(__file__).parent.parent
+
+# Generous budgets in seconds, a regression to eager imports still shows
+IMPORT_BUDGET = 1.0
+FIRST_REQUEST_BUDGET = 2.0
+
+# Dependencies only loaded by the phases that need them
+LAZY_MODULES = (
+    "configargparse",
+    "requests",
+    "ruamel.yaml",
+    "single_source",
+    "cProfile",
+    "antsichaut.daemon",
+    "antsichaut.fleet",
+    "antsichaut.fragments",
+    "antsichaut.gitlog",
+    "antsichaut.graphql",
+)
+
+CHANGELOG = """\
+releases:
+  1.0.0:
+    release_date: '2023-01-01'
+"""
+
+
+def _python(code: str, cwd: Path = ROOT) -> subprocess.Popen[str]:
+    """Start a fresh interpreter that runs some code.
+
+    :param code: The code to run
+    :param cwd: The working directory
+    :return: The process
+    """
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.Popen(  # noqa: S603
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def test_import_time() -> None:
+    """Ensure importing antsichaut is fast and loads no heavy dependency."""
+    code = f"""
+import json, sys, time
+start = time.perf_counter()
+import antsichaut.antsichaut
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in {LAZY_MODULES!r} if m in sys.modules]]))
+"""
+    stdout, _ = _python(code).communicate(timeout=30)
+    elapsed, loaded = json.loads(stdout)
+
+    assert not loaded
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_version() -> None:
+    """Ensure --version is answered without building the parser."""
+    code = f"""
+import sys
+sys.argv = ["antsichaut", "--version"]
+from antsichaut.antsichaut import main
+main()
+print([m for m in {LAZY_MODULES[:3]!r} if m in sys.modules])
+"""
+    stdout, _ = _python(code).communicate(timeout=30)
+
+    printed, loaded = stdout.splitlines()
+    assert printed == version()
+    assert loaded == "[]"
+
+
+def test_parser() -> None:
+    """Ensure the parser of a normal run does not work out the version."""
+    code = """
+import sys
+from antsichaut.antsichaut import _build_parser
+_build_parser().parse_args(["--github_token", "token", "--since_version", "1.0.0"])
+print("single_source" in sys.modules)
+"""
+    stdout, _ = _python(code).communicate(timeout=30)
+
+    assert stdout.strip() == "False"
+
+
+def test_first_request(fake_github: FakeGitHub, tmp_path: Path) -> None:
+    """Ensure a fresh run sends its first request within the budget.
+
+    :param fake_github: The fake API
+    :param tmp_path: pytest fixture for a temporary directory
+    """
+    (tmp_path / "changelogs").mkdir()
+    (tmp_path / "changelogs/changelog.yaml").write_text(CHANGELOG)
+    fake_github.add_release("1.0.0", "2023-01-01T00:00:00Z")
+    code = f"""
+from antsichaut.antsichaut import ChangelogCIBase
+ccb = ChangelogCIBase({fake_github.repository!r}, "1.0.0", "", [])
+ccb.github_api_url = {fake_github.url!r}
+ccb.run()
+"""
+    start = time.perf_counter()
+    process = _python(code, cwd=tmp_path)
+    try:
+        while not fake_github.requests and process.poll() is None:
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+    finally:
+        process.communicate(timeout=30)
+
+    assert process.returncode == 0
+    assert fake_github.requests
+    assert elapsed < FIRST_REQUEST_BUDGET